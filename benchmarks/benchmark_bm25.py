@@ -0,0 +1,106 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+from collections import namedtuple
+
+from benchmarks.stats import percentile
+from knowledge_base.lexical_index.bm25_index import BM25Index
+from knowledge_base.lexical_index.rank_fusion import reciprocal_rank_fusion
+
+# Documento simples com os mesmos campos usados pelos chunks da ingestão
+Document = namedtuple("Document", ["page_content", "metadata"])
+
+def build_corpus(size, words_per_chunk=150, vocabulary_size=20000, seed=42):
+    """
+    Gera chunks sintéticos: palavras comuns com frequência de Zipf (como em texto real)
+    e um termo exato único por chunk (como o nome de um campeão ou item).
+
+    Returns:
+        tuple: Chunks e o termo exato de cada chunk.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"termo{index}" for index in range(vocabulary_size)]
+    weights = [1 / rank for rank in range(1, vocabulary_size + 1)]
+
+    chunks = []
+    entities = []
+    for index in range(size):
+        entity = f"entidade{index}"
+        words = rng.choices(vocabulary, weights=weights, k=words_per_chunk)
+        words.insert(rng.randrange(len(words)), entity)
+
+        chunks.append(Document(page_content=" ".join(words), metadata={"source": f"synthetic_{index % 100}.pdf", "page_number": str(index)}))
+        entities.append(entity)
+
+    return chunks, entities
+
+def run_benchmark(corpus_size, query_count, k, batch_size, database_path):
+    """
+    Constrói o índice BM25 em lotes (como na ingestão) e mede a latência das consultas.
+
+    Returns:
+        dict: Tempo de construção, tamanho em disco, latências e taxa de acerto do termo exato.
+    """
+    chunks, entities = build_corpus(corpus_size)
+    lexical_index = BM25Index(os.path.join(database_path, f"bm25_{corpus_size}.sqlite3"))
+
+    start = time.perf_counter()
+    for batch_start in range(0, len(chunks), batch_size):
+        lexical_index.insert_chunks(chunks[batch_start:batch_start + batch_size])
+    build_seconds = time.perf_counter() - start
+
+    # Consultas com um termo exato e duas palavras comuns (o chunk do termo deve aparecer entre os k primeiros)
+    rng = random.Random(7)
+    latencies = []
+    hits = 0
+    for _ in range(query_count):
+        target = rng.randrange(corpus_size)
+        query = f"{entities[target]} termo{rng.randrange(50)} termo{rng.randrange(50)}"
+
+        query_start = time.perf_counter()
+        results = lexical_index.search(query, k)
+        latencies.append(time.perf_counter() - query_start)
+
+        hits += chunks[target].page_content in results["documents"]
+
+    # Custo da fusão de duas listas de candidatos (vetorial e BM25)
+    rankings = [[f"chunk{index}" for index in range(20)], [f"chunk{index}" for index in range(10, 30)]]
+    fusion_start = time.perf_counter()
+    for _ in range(1000):
+        reciprocal_rank_fusion(rankings)
+    fusion_seconds = (time.perf_counter() - fusion_start) / 1000
+
+    lexical_index.close()
+
+    return {
+        "corpus_size": corpus_size,
+        "build_seconds": build_seconds,
+        "chunks_per_second": corpus_size / build_seconds,
+        "index_size_mb": os.path.getsize(lexical_index.index_path) / 2**20,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "exact_term_hit_rate": hits / query_count,
+        "fusion_us": fusion_seconds * 1e6,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede a construção e as consultas do índice BM25 da busca híbrida.")
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[10000, 100000], help="Tamanhos de corpus avaliados.")
+    parser.add_argument("--queries", type=int, default=200, help="Consultas por corpus.")
+    parser.add_argument("--k", type=int, default=20, help="Resultados por consulta (candidatos da fusão).")
+    parser.add_argument("--batch-size", type=int, default=256, help="Chunks indexados por lote.")
+    args = parser.parse_args()
+
+    print(f"{'chunks':>8} {'construção (s)':>15} {'chunks/s':>10} {'disco (MB)':>11} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'acerto':>7} {'RRF (µs)':>9}")
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for corpus_size in args.corpus_sizes:
+            result = run_benchmark(corpus_size, args.queries, args.k, args.batch_size, temporary_directory)
+            print(
+                f"{result['corpus_size']:>8} {result['build_seconds']:>15.2f} {result['chunks_per_second']:>10.0f} "
+                f"{result['index_size_mb']:>11.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                f"{result['exact_term_hit_rate']:>7.0%} {result['fusion_us']:>9.1f}"
+            )
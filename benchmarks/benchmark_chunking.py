@@ -0,0 +1,70 @@
+import time
+import random
+import argparse
+
+from benchmarks.synthetic_pdf import generate_paragraph
+from knowledge_base.ingestion_data.chunking_langchain import ChunkSplitter
+from utils.tokenizer import count_tokens, EMBEDDING_TOKENIZER_NAME
+
+def build_pages(page_count, paragraphs_per_page=4, seed=42):
+    """
+    Gera páginas sintéticas no mesmo formato das páginas extraídas dos PDFs.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "page_content": "\n\n".join(generate_paragraph(rng, words=rng.randint(40, 120)) for _ in range(paragraphs_per_page)),
+            "metadata": {"page_number": str(page_number), "source": "synthetic.pdf"},
+        }
+        for page_number in range(1, page_count + 1)
+    ]
+
+def run_mode(label, chunk_splitter, pages, max_tokens, repeats):
+    """
+    Fragmenta as páginas com um splitter e mede vazão e tamanho dos chunks em tokens do modelo de embeddings.
+
+    Returns:
+        dict: Vazão, quantidade de chunks e distribuição de tokens por chunk.
+    """
+    best_seconds = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        chunks = list(chunk_splitter.split_document_pages(pages))
+        best_seconds = min(best_seconds, time.perf_counter() - start)
+
+    chunk_tokens = [count_tokens(chunk.page_content, EMBEDDING_TOKENIZER_NAME) for chunk in chunks]
+
+    return {
+        "label": label,
+        "pages_per_second": len(pages) / best_seconds,
+        "chunks": len(chunks),
+        "mean_tokens": sum(chunk_tokens) / len(chunk_tokens),
+        "max_tokens": max(chunk_tokens),
+        # Chunks maiores que a janela do modelo são truncados sem aviso na geração do embedding
+        "over_limit": sum(tokens > max_tokens for tokens in chunk_tokens),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara a fragmentação por caracteres e por tokens do modelo de embeddings.")
+    parser.add_argument("--pages", type=int, default=500, help="Páginas do documento sintético.")
+    parser.add_argument("--max-tokens", type=int, default=512, help="Janela de contexto do modelo de embeddings.")
+    parser.add_argument("--repeats", type=int, default=3, help="Repetições por modo (usa o menor tempo).")
+    args = parser.parse_args()
+
+    pages = build_pages(args.pages)
+
+    modes = [
+        ("caracteres (1000/200)", ChunkSplitter(length_mode="characters")),
+        ("tokens", ChunkSplitter(length_mode="tokens", chunk_size=args.max_tokens)),
+        ("tokens sem memoização", ChunkSplitter(length_mode="tokens", chunk_size=args.max_tokens, token_count_cache_size=0)),
+    ]
+
+    print(f"Tokenizer: {EMBEDDING_TOKENIZER_NAME or 'estimativa'} | janela do modelo: {args.max_tokens} tokens")
+    print(f"\n{'modo':<24} {'páginas/s':>10} {'chunks':>7} {'tokens médios':>14} {'tokens máx.':>12} {'acima da janela':>16}")
+
+    for label, chunk_splitter in modes:
+        result = run_mode(label, chunk_splitter, pages, args.max_tokens, args.repeats)
+        print(
+            f"{result['label']:<24} {result['pages_per_second']:>10.1f} {result['chunks']:>7} "
+            f"{result['mean_tokens']:>14.1f} {result['max_tokens']:>12} {result['over_limit']:>16}"
+        )
@@ -0,0 +1,67 @@
+import re
+import sys
+import argparse
+import subprocess
+
+# Dependências pesadas cuja importação é verificada em cada módulo
+HEAVY_MODULES = ["chromadb", "faiss", "langchain", "langchain_core", "langchain_ollama", "pdfplumber", "pandas", "fitz", "llama_parse"]
+
+# Linhas do `python -X importtime`: "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure_import(module, construct=None):
+    """
+    Importa um módulo em um processo Python novo com `-X importtime`.
+
+    Args:
+        module (str): Módulo importado (ex.: "controller.controller_rag").
+        construct (str): Expressão executada após a importação (ex.: "ControllerRAG()"), medida à parte.
+
+    Returns:
+        dict: Tempo cumulativo da importação, dependências pesadas carregadas e as importações mais lentas.
+    """
+    code = f"import time; start = time.perf_counter(); import {module}; imported = time.perf_counter()\n"
+    if construct:
+        code += f"from {module} import *; construct_start = time.perf_counter(); {construct}; print('construct', time.perf_counter() - construct_start)\n"
+    code += "print('wall', imported - start)\n"
+    code += f"import sys; print('loaded', ','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{completed.stderr[-2000:]}")
+
+    # Importações de nível superior (sem indentação) e seus tempos cumulativos
+    top_level = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            top_level.append((match.group(4), int(match.group(2)) / 1000))
+
+    output = dict(line.split(" ", 1) for line in completed.stdout.splitlines() if " " in line)
+
+    return {
+        "module": module,
+        "wall_ms": float(output["wall"]) * 1000,
+        "construct_ms": float(output["construct"]) * 1000 if "construct" in output else None,
+        "heavy_modules": [name for name in output.get("loaded", "").split(",") if name],
+        "slowest": sorted(top_level, key=lambda item: item[1], reverse=True)[:10],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tempo de importação (python -X importtime) dos pontos de entrada do projeto.")
+    parser.add_argument("--modules", nargs="+", default=["main", "controller.controller_rag", "controller.controller_ingestion_data"])
+    parser.add_argument("--construct-rag", action="store_true", help="Mede também a construção do ControllerRAG.")
+    parser.add_argument("--repeats", type=int, default=3, help="Repetições (usa o menor tempo).")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        construct = "ControllerRAG()" if args.construct_rag and module == "controller.controller_rag" else None
+        results = [measure_import(module, construct) for _ in range(args.repeats)]
+        best = min(results, key=lambda result: result["wall_ms"])
+
+        print(f"\n{module}: {best['wall_ms']:.1f}ms")
+        if best["construct_ms"] is not None:
+            print(f"  {construct}: {best['construct_ms']:.1f}ms")
+        print(f"  dependências pesadas carregadas: {', '.join(best['heavy_modules']) or 'nenhuma'}")
+        for name, cumulative_ms in best["slowest"]:
+            print(f"  {cumulative_ms:>9.1f}ms  {name}")
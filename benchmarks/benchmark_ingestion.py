@@ -0,0 +1,62 @@
+import os
+import argparse
+import tempfile
+
+from utils.ollama_stub_server import start_stub_server
+from benchmarks.synthetic_pdf import generate_synthetic_pdf
+from benchmarks.load_test_rag import configure_environment
+
+def print_report(report):
+    """
+    Exibe o total de cada etapa da ingestão, da mais lenta para a mais rápida.
+    """
+    totals = sorted(report["totals"].items(), key=lambda item: item[1]["wall_seconds"], reverse=True)
+    total_seconds = sum(stage_stats["wall_seconds"] for _, stage_stats in totals) or 1.0
+
+    print(f"\n{'etapa':<16} {'tempo (s)':>10} {'%':>6} {'CPU (s)':>9} {'itens':>8} {'itens/s':>10} {'pico mem. (MB)':>15}")
+    for stage_name, stage_stats in totals:
+        print(
+            f"{stage_name:<16} {stage_stats['wall_seconds']:>10.3f} {100 * stage_stats['wall_seconds'] / total_seconds:>6.1f} "
+            f"{stage_stats['cpu_seconds']:>9.3f} {stage_stats['items']:>8} {stage_stats['items_per_second']:>10.1f} "
+            f"{stage_stats['peak_memory_bytes'] / 2**20:>15.2f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede cada etapa da ingestão de PDFs sintéticos contra um servidor Ollama simulado.")
+    parser.add_argument("--files", type=int, default=5, help="Quantidade de PDFs gerados.")
+    parser.add_argument("--pages", type=int, default=50, help="Páginas de cada PDF.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Latência simulada por requisição de embedding (s).")
+    parser.add_argument("--vector-database", default="chroma", choices=["chroma", "faiss"], help="Backend do banco vetorial (o numpy não persiste a ingestão).")
+    parser.add_argument("--output", default="ingestion_profile.json", help="Caminho do relatório JSON.")
+    args = parser.parse_args()
+
+    stub_server = start_stub_server(latency=args.latency)
+    output_path = os.path.abspath(args.output)
+    current_directory = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        configure_environment(stub_server.url, temporary_directory, args.vector_database)
+
+        # Gera PDFs diferentes (sementes distintas) para que nenhum chunk seja deduplicado
+        pdf_directory = os.path.join(temporary_directory, "pdfs")
+        os.makedirs(pdf_directory)
+        for index in range(args.files):
+            generate_synthetic_pdf(os.path.join(pdf_directory, f"synthetic_{index}.pdf"), pages=args.pages, seed=index)
+
+        # Importa o controller somente depois de configurar o ambiente
+        from controller.controller_ingestion_data import ControllerIngestionData
+
+        controller_ingestion = ControllerIngestionData(profile=True)
+
+        # Os Markdown intermediários são gravados no diretório temporário
+        os.chdir(temporary_directory)
+        try:
+            report = controller_ingestion.ingestion_data_folder(pdf_directory, profile_report_path=output_path)
+        finally:
+            os.chdir(current_directory)
+
+    stub_server.shutdown()
+
+    print_report(report)
+    print(f"\nRequisições ao servidor de embeddings: {stub_server.request_count}")
+    print(f"Relatório por arquivo salvo em: {output_path}")
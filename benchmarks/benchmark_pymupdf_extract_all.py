@@ -0,0 +1,60 @@
+import os
+import time
+import argparse
+import tempfile
+
+from benchmarks.synthetic_pdf import generate_synthetic_pdf
+from scraping_data.scraping_pdf.ocr_text_pymupdf import PDFExtractor
+
+def run_multi_pass(pdf_extractor, pdf_file, output_directory):
+    """
+    Reproduz a extração anterior: cada artefato abre e percorre o PDF novamente.
+    """
+    pdf_extractor.extract_text_with_metadata(pdf_file)
+    pdf_extractor.extract_images_pdf(pdf_file, os.path.join(output_directory, "images"))
+    pdf_extractor.extract_links_pdf(pdf_file)
+    pdf_extractor.extract_tables_pdf(pdf_file)
+    pdf_extractor.convert_pdf_to_markdown(pdf_file, os.path.join(output_directory, "markdown"))
+    pdf_extractor.convert_pdf_to_image(pdf_file, os.path.join(output_directory, "pages"))
+
+def run_single_pass(pdf_extractor, pdf_file, output_directory):
+    """
+    Extração em passada única: o PDF é aberto uma vez e cada página é visitada uma vez.
+    """
+    pdf_extractor.extract_all(
+        pdf_file,
+        output_image_path=os.path.join(output_directory, "images"),
+        output_markdown_path=os.path.join(output_directory, "markdown"),
+        page_image_directory=os.path.join(output_directory, "pages"),
+    )
+
+def measure(function, repeats, *args):
+    """
+    Executa uma função `repeats` vezes e retorna o menor tempo observado.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara a extração PyMuPDF em várias passadas vs. passada única.")
+    parser.add_argument("--pdf", help="PDF a ser usado (se omitido, gera um PDF sintético).")
+    parser.add_argument("--pages", type=int, default=300, help="Páginas do PDF sintético.")
+    parser.add_argument("--repeats", type=int, default=3, help="Repetições de cada modo (usa o menor tempo).")
+    args = parser.parse_args()
+
+    pdf_extractor = PDFExtractor()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        pdf_file = args.pdf or generate_synthetic_pdf(os.path.join(temporary_directory, "synthetic.pdf"), pages=args.pages)
+
+        multi_pass_seconds = measure(run_multi_pass, args.repeats, pdf_extractor, pdf_file, os.path.join(temporary_directory, "multi"))
+        single_pass_seconds = measure(run_single_pass, args.repeats, pdf_extractor, pdf_file, os.path.join(temporary_directory, "single"))
+
+    print(f"PDF: {pdf_file if args.pdf else f'sintético ({args.pages} páginas)'}")
+    print(f"Várias passadas (6 aberturas): {multi_pass_seconds:.3f}s")
+    print(f"Passada única (extract_all):   {single_pass_seconds:.3f}s")
+    print(f"Speedup: {multi_pass_seconds / single_pass_seconds:.2f}x")
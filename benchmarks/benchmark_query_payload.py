@@ -0,0 +1,94 @@
+import os
+import time
+import pickle
+import random
+import argparse
+import tempfile
+from collections import namedtuple
+
+from benchmarks.stats import percentile
+from benchmarks.benchmark_retrieval import FakeEmbeddingModel
+from benchmarks.synthetic_pdf import generate_paragraph
+
+# Documento simples com os mesmos campos usados pelos chunks da ingestão
+Document = namedtuple("Document", ["page_content", "metadata"])
+
+# Projeções avaliadas: (nome exibido, campos pedidos além dos IDs)
+PROFILES = [
+    ("docs+meta+emb", ("documents", "metadatas", "embeddings")),  # Consulta antiga do query_chromadb
+    ("docs+meta+dist", ("documents", "metadatas", "distances")),  # Padrão (VECTOR_QUERY_INCLUDE)
+    ("docs+meta", ("documents", "metadatas")),
+    ("docs", ("documents",)),  # O que o ControllerRAG usa
+]
+
+def build_corpus(size, seed=42):
+    """
+    Gera chunks sintéticos com o tamanho e os metadados dos chunks da ingestão.
+    """
+    rng = random.Random(seed)
+    return [
+        Document(
+            page_content=generate_paragraph(rng, words=rng.randint(120, 180)),
+            metadata={"source": f"synthetic_{index % 100}.pdf", "page_number": str(index), "page_start": index, "page_end": index},
+        )
+        for index in range(size)
+    ]
+
+def run_profile(vector_database, query_embeddings, n_results, include):
+    """
+    Executa as consultas com uma projeção, lendo todos os campos pedidos (como um chamador que os usa).
+
+    Returns:
+        dict: Latências p50/p95 e tamanho médio do resultado serializado.
+    """
+    latencies = []
+    payload_bytes = 0
+
+    for query_embedding in query_embeddings:
+        start = time.perf_counter()
+        results = vector_database.query(query_embedding, n_results, include=include)
+        materialized = {field: results[field] for field in results}
+        latencies.append(time.perf_counter() - start)
+
+        payload_bytes += len(pickle.dumps(materialized, protocol=pickle.HIGHEST_PROTOCOL))
+
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "payload_kb": payload_bytes / len(query_embeddings) / 1024,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tamanho e a latência dos resultados de consulta para cada projeção de campos.")
+    parser.add_argument("--backends", nargs="+", default=["chroma", "faiss", "numpy"], choices=["chroma", "faiss", "numpy"], help="Backends avaliados.")
+    parser.add_argument("--corpus-size", type=int, default=5000, help="Chunks do corpus sintético.")
+    parser.add_argument("--dimension", type=int, default=768, help="Dimensão dos embeddings sintéticos.")
+    parser.add_argument("--n-results", type=int, nargs="+", default=[5, 20, 50, 100], help="Valores de n_results avaliados.")
+    parser.add_argument("--queries", type=int, default=100, help="Consultas por combinação.")
+    args = parser.parse_args()
+
+    embedding_model = FakeEmbeddingModel(dimension=args.dimension)
+    corpus = build_corpus(args.corpus_size)
+    corpus_embeddings = embedding_model.generate(args.corpus_size).tolist()
+    query_embeddings = embedding_model.generate(args.queries, seed_offset=1).tolist()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        # Configura o ambiente antes de importar os backends (as variáveis são lidas na importação)
+        os.environ["CHROMA_PATH"] = os.path.join(temporary_directory, "chroma")
+        os.environ["FAISS_PATH"] = os.path.join(temporary_directory, "faiss")
+
+        from knowledge_base.vector_database.vector_store import create_vector_database
+
+        for backend in args.backends:
+            vector_database = create_vector_database(backend)
+            for batch_start in range(0, args.corpus_size, 5000):
+                batch_end = batch_start + 5000
+                vector_database.insert_batch(corpus[batch_start:batch_end], corpus_embeddings[batch_start:batch_end])
+
+            print(f"\nBackend: {backend} | corpus: {args.corpus_size} chunks | dimensão: {args.dimension}")
+            print(f"{'n_results':>9} {'projeção':<15} {'p50 (ms)':>9} {'p95 (ms)':>9} {'resultado (KB)':>15}")
+
+            for n_results in args.n_results:
+                for label, include in PROFILES:
+                    result = run_profile(vector_database, query_embeddings, n_results, include)
+                    print(f"{n_results:>9} {label:<15} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['payload_kb']:>15.1f}")
@@ -0,0 +1,221 @@
+import os
+import time
+import argparse
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.stats import percentile
+from utils.chunk_identifier import create_chunk_id
+
+# Documento simples com os mesmos campos usados pelos chunks da ingestão
+Document = namedtuple("Document", ["page_content", "metadata"])
+
+# Backends avaliados: (nome exibido, VECTOR_DATABASE, tipo de índice FAISS)
+BACKENDS = {
+    "chroma": ("chroma", None),
+    "faiss-flat": ("faiss", "flat"),
+    "faiss-ivf": ("faiss", "ivf"),
+    "faiss-hnsw": ("faiss", "hnsw"),
+    "numpy": ("numpy", None),
+}
+
+class FakeEmbeddingModel:
+    """
+    Modelo de embeddings determinístico e offline: gera vetores agrupados em torno de
+    centros aleatórios (como textos de assuntos parecidos), sem chamar o Ollama.
+    """
+
+    def __init__(self, dimension=128, clusters=256, noise=0.35, seed=42):
+        """
+        Args:
+            dimension (int): Dimensão dos embeddings.
+            clusters (int): Quantidade de assuntos (centros) do corpus.
+            noise (float): Dispersão dos vetores em torno do centro.
+            seed (int): Semente para geração determinística.
+        """
+        self.dimension = dimension
+        self.noise = noise
+        self.seed = seed
+        self.centers = np.random.default_rng(seed).normal(size=(clusters, dimension)).astype(np.float32)
+
+    def generate(self, count, seed_offset=0):
+        """
+        Gera `count` embeddings (a mesma chamada sempre retorna os mesmos vetores).
+        """
+        rng = np.random.default_rng(self.seed + 1 + seed_offset)
+        assignments = rng.integers(0, len(self.centers), size=count)
+        noise = rng.normal(scale=self.noise, size=(count, self.dimension)).astype(np.float32)
+        return self.centers[assignments] + noise
+
+def build_corpus(size):
+    """
+    Gera os chunks sintéticos do corpus (o texto só serve para derivar o ID do chunk).
+    """
+    return [
+        Document(page_content=f"chunk sintético {index}", metadata={"source": f"synthetic_{index % 100}.pdf", "page_number": str(index)})
+        for index in range(size)
+    ]
+
+def exact_neighbors(corpus_embeddings, query_embeddings, k, max_block_cells=1 << 25):
+    """
+    Calcula os k vizinhos exatos (distância L2) de cada consulta por força bruta, em blocos de consultas
+    (cada bloco ocupa no máximo `max_block_cells` distâncias em memória).
+
+    Returns:
+        numpy.ndarray: Índices no corpus dos k vizinhos de cada consulta, do mais próximo ao mais distante.
+    """
+    corpus_norms = np.einsum("ij,ij->i", corpus_embeddings, corpus_embeddings)
+    block_size = max(1, max_block_cells // len(corpus_embeddings))
+    neighbors = []
+
+    for start in range(0, len(query_embeddings), block_size):
+        queries = query_embeddings[start:start + block_size]
+        distances = corpus_norms[None, :] - 2.0 * (queries @ corpus_embeddings.T)
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(distances, candidates, axis=1).argsort(axis=1)
+        neighbors.append(np.take_along_axis(candidates, order, axis=1))
+
+    return np.vstack(neighbors)
+
+def get_rss_bytes():
+    """
+    Retorna a memória residente (RSS) atual do processo.
+    """
+    try:
+        with open("/proc/self/statm", "r") as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def get_directory_size(path):
+    """
+    Soma o tamanho de todos os arquivos de um diretório.
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            total += os.path.getsize(os.path.join(root, file_name))
+    return total
+
+def run_backend(backend_name, corpus_size, query_count, k, dimension, write_batch_size, database_path):
+    """
+    Constrói o banco vetorial de um backend e executa as consultas (em um processo separado,
+    para que a memória medida seja apenas a desse backend).
+
+    Returns:
+        dict: Tempo de construção, tamanho em disco, memória, QPS, latências e IDs retornados.
+    """
+    vector_database_name, index_type = BACKENDS[backend_name]
+
+    # Configura o ambiente antes de importar os backends (as variáveis são lidas na importação)
+    os.environ["CHROMA_PATH"] = os.path.join(database_path, "chroma")
+    os.environ["FAISS_PATH"] = os.path.join(database_path, "faiss")
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+
+    from knowledge_base.vector_database.vector_store import create_vector_database
+
+    embedding_model = FakeEmbeddingModel(dimension=dimension)
+    corpus = build_corpus(corpus_size)
+    corpus_embeddings = embedding_model.generate(corpus_size)
+    query_embeddings = embedding_model.generate(query_count, seed_offset=1).tolist()
+
+    # O índice FAISS é gravado uma única vez, ao final da carga
+    kwargs = {"index_type": index_type, "autosave": False} if index_type else {}
+    rss_before = get_rss_bytes()
+
+    # Construção do índice em lotes com os embeddings já calculados
+    start = time.perf_counter()
+    vector_database = create_vector_database(vector_database_name, **kwargs)
+    for batch_start in range(0, corpus_size, write_batch_size):
+        batch_end = batch_start + write_batch_size
+        vector_database.insert_batch(corpus[batch_start:batch_end], corpus_embeddings[batch_start:batch_end].tolist())
+    if index_type:
+        vector_database.save_index()
+    build_seconds = time.perf_counter() - start
+
+    rss_after_build = get_rss_bytes()
+
+    # Consultas uma a uma (latência por pergunta, como no ControllerRAG)
+    latencies = []
+    retrieved_ids = []
+    for query_embedding in query_embeddings:
+        query_start = time.perf_counter()
+        results = vector_database.query(query_embedding, k)
+        latencies.append(time.perf_counter() - query_start)
+        retrieved_ids.append(results["ids"][0])
+
+    # Consultas em um único lote
+    start = time.perf_counter()
+    vector_database.query_batch(query_embeddings, k)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "backend": backend_name,
+        "build_seconds": build_seconds,
+        "disk_bytes": get_directory_size(database_path),
+        "memory_bytes": max(rss_after_build - rss_before, 0),
+        "qps": len(latencies) / sum(latencies),
+        "batch_qps": query_count / batch_seconds,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "retrieved_ids": retrieved_ids,
+    }
+
+def compute_recall(retrieved_ids, ground_truth_ids, k):
+    """
+    Calcula o recall@k médio: fração dos k vizinhos exatos presentes nos k resultados retornados.
+    """
+    hits = sum(len(set(retrieved[:k]) & set(truth[:k])) for retrieved, truth in zip(retrieved_ids, ground_truth_ids))
+    return hits / (k * len(ground_truth_ids))
+
+def print_report(corpus_size, k, results):
+    """
+    Exibe a tabela comparativa dos backends.
+    """
+    print(f"\nCorpus: {corpus_size} chunks | recall@{k} contra a busca exata por força bruta")
+    print(f"{'backend':<12} {'build (s)':>10} {'disco (MB)':>11} {'memória (MB)':>13} {'QPS':>9} {'QPS lote':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'recall':>7}")
+    for result in results:
+        print(
+            f"{result['backend']:<12} {result['build_seconds']:>10.2f} {result['disk_bytes'] / 2**20:>11.1f} "
+            f"{result['memory_bytes'] / 2**20:>13.1f} {result['qps']:>9.1f} {result['batch_qps']:>9.1f} "
+            f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['recall']:>7.3f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara construção, latência, memória e recall@k dos bancos vetoriais (offline).")
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[10000], help="Tamanhos de corpus avaliados (ex.: 10000 100000 1000000).")
+    parser.add_argument("--queries", type=int, default=500, help="Quantidade de consultas.")
+    parser.add_argument("--k", type=int, default=5, help="Resultados por consulta (n_results).")
+    parser.add_argument("--dimension", type=int, default=128, help="Dimensão dos embeddings sintéticos.")
+    parser.add_argument("--write-batch-size", type=int, default=5000, help="Chunks por inserção.")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS), help="Backends avaliados.")
+    args = parser.parse_args()
+
+    embedding_model = FakeEmbeddingModel(dimension=args.dimension)
+
+    for corpus_size in args.corpus_sizes:
+        # Vizinhos exatos (ground truth) calculados uma vez para todos os backends
+        corpus_ids = [document.page_content for document in build_corpus(corpus_size)]
+        ground_truth = exact_neighbors(
+            embedding_model.generate(corpus_size), embedding_model.generate(args.queries, seed_offset=1), args.k
+        )
+        ground_truth_ids = [[create_chunk_id(corpus_ids[index]) for index in row] for row in ground_truth]
+
+        results = []
+        for backend_name in args.backends:
+            with tempfile.TemporaryDirectory() as temporary_directory:
+                # Cada backend roda em um processo novo (memória e estado isolados)
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    result = executor.submit(
+                        run_backend, backend_name, corpus_size, args.queries, args.k,
+                        args.dimension, args.write_batch_size, temporary_directory,
+                    ).result()
+
+            result["recall"] = compute_recall(result.pop("retrieved_ids"), ground_truth_ids, args.k)
+            results.append(result)
+
+        print_report(corpus_size, args.k, results)
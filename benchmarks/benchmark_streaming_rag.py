@@ -0,0 +1,58 @@
+import time
+import argparse
+import tempfile
+
+from utils.ollama_stub_server import start_stub_server
+from benchmarks.synthetic_pdf import SYNTHETIC_WORDS
+from benchmarks.load_test_rag import configure_environment, build_documents
+from benchmarks.stats import percentile
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tempo até o primeiro token do stream_RAG vs. a latência do execute_RAG.")
+    parser.add_argument("--queries", type=int, default=20, help="Quantidade de perguntas.")
+    parser.add_argument("--documents", type=int, default=200, help="Documentos inseridos no banco vetorial.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência simulada por requisição ao modelo (s).")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Intervalo simulado entre tokens (s).")
+    parser.add_argument("--vector-database", default="chroma", choices=["chroma", "faiss", "numpy"], help="Backend do banco vetorial.")
+    args = parser.parse_args()
+
+    stub_server = start_stub_server(latency=args.latency, token_latency=args.token_latency)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        configure_environment(stub_server.url, temporary_directory, args.vector_database)
+
+        # Importa o controller somente depois de configurar o ambiente
+        from controller.controller_rag import ControllerRAG
+
+        controller_rag = ControllerRAG()
+        controller_rag.vector_database.insert_chunks(build_documents(args.documents))
+
+        queries = [
+            f"Explique {SYNTHETIC_WORDS[index % len(SYNTHETIC_WORDS)]} na pergunta {index}"
+            for index in range(args.queries)
+        ]
+
+        # Latência total da execução sem streaming (o usuário só vê a resposta no final)
+        blocking_latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            controller_rag.execute_RAG(query)
+            blocking_latencies.append(time.perf_counter() - start)
+
+        # Tempo até o primeiro token e tempo total da execução em streaming
+        first_token_latencies = []
+        streaming_latencies = []
+        for query in queries:
+            for event in controller_rag.stream_RAG(query):
+                if event["event"] == "done":
+                    first_token_latencies.append(event["metrics"]["time_to_first_token_seconds"])
+                    streaming_latencies.append(event["metrics"]["total_seconds"])
+
+    stub_server.shutdown()
+
+    for label, values in (
+        ("execute_RAG (resposta completa)", blocking_latencies),
+        ("stream_RAG (primeiro token)", first_token_latencies),
+        ("stream_RAG (resposta completa)", streaming_latencies),
+    ):
+        print(f"{label}: p50={percentile(values, 50) * 1000:.1f}ms p95={percentile(values, 95) * 1000:.1f}ms")
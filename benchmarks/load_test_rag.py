@@ -0,0 +1,121 @@
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+from collections import namedtuple
+
+from utils.ollama_stub_server import start_stub_server
+from benchmarks.synthetic_pdf import SYNTHETIC_WORDS
+from benchmarks.stats import percentile
+
+# Documento simples com os mesmos campos usados pelos chunks da ingestão
+Document = namedtuple("Document", ["page_content", "metadata"])
+
+def configure_environment(stub_url, database_path, vector_database="chroma"):
+    """
+    Aponta o projeto para o servidor de teste e para um banco vetorial temporário.
+    Deve ser chamada antes de importar os controllers (as variáveis são lidas na importação).
+    """
+    os.environ["LLAMA_URL"] = stub_url
+    os.environ["OLLAMA_HOST"] = stub_url
+    os.environ["VECTOR_DATABASE"] = vector_database
+    os.environ["CHROMA_PATH"] = os.path.join(database_path, "chroma")
+    os.environ["FAISS_PATH"] = os.path.join(database_path, "faiss")
+    os.environ["LLAMA_MODEL_EMBEDDING"] = "stub-embedding"
+    os.environ["LLAMA_MODEL_INFERENCE"] = "stub-llm"
+
+    # Desativa os caches para que toda pergunta pague o embedding, a recuperação e a geração
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    os.environ["ANSWER_CACHE_ENABLED"] = "false"
+
+def build_documents(count):
+    """
+    Gera documentos sintéticos para popular o banco vetorial.
+    """
+    return [
+        Document(
+            page_content=" ".join(SYNTHETIC_WORDS[(index + offset) % len(SYNTHETIC_WORDS)] for offset in range(40)) + f" #{index}",
+            metadata={"source": "load_test", "page_number": str(index + 1)},
+        )
+        for index in range(count)
+    ]
+
+async def run_async_load(controller_rag, queries, concurrency):
+    """
+    Dispara as perguntas em paralelo (até `concurrency` em andamento) e mede a latência de cada uma.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def answer(query):
+        async with semaphore:
+            start = time.perf_counter()
+            await controller_rag.aexecute_RAG(query)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(answer(query) for query in queries))
+    return latencies, time.perf_counter() - start
+
+def run_sync_load(controller_rag, queries):
+    """
+    Executa as perguntas sequencialmente com `execute_RAG` (referência).
+    """
+    latencies = []
+    start = time.perf_counter()
+
+    for query in queries:
+        query_start = time.perf_counter()
+        controller_rag.execute_RAG(query)
+        latencies.append(time.perf_counter() - query_start)
+
+    return latencies, time.perf_counter() - start
+
+def print_report(label, latencies, wall_seconds):
+    """
+    Exibe latências p50/p95 e vazão de uma execução.
+    """
+    print(
+        f"{label}: {len(latencies)} perguntas em {wall_seconds:.2f}s | "
+        f"p50={percentile(latencies, 50) * 1000:.1f}ms "
+        f"p95={percentile(latencies, 95) * 1000:.1f}ms "
+        f"max={max(latencies) * 1000:.1f}ms | "
+        f"{len(latencies) / wall_seconds:.1f} perguntas/s"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do ControllerRAG.aexecute_RAG contra um servidor Ollama simulado.")
+    parser.add_argument("--queries", type=int, default=100, help="Quantidade de perguntas disparadas.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Perguntas simultâneas em andamento.")
+    parser.add_argument("--documents", type=int, default=500, help="Documentos inseridos no banco vetorial.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência simulada por requisição ao modelo (s).")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="Intervalo simulado entre tokens (s).")
+    parser.add_argument("--compare-sync", action="store_true", help="Executa também o execute_RAG sequencial.")
+    parser.add_argument("--vector-database", default="chroma", choices=["chroma", "faiss", "numpy"], help="Backend do banco vetorial.")
+    args = parser.parse_args()
+
+    stub_server = start_stub_server(latency=args.latency, token_latency=args.token_latency)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        configure_environment(stub_server.url, temporary_directory, args.vector_database)
+
+        # Importa o controller somente depois de configurar o ambiente
+        from controller.controller_rag import ControllerRAG
+
+        controller_rag = ControllerRAG()
+        controller_rag.vector_database.insert_chunks(build_documents(args.documents))
+
+        queries = [
+            f"O que é {SYNTHETIC_WORDS[index % len(SYNTHETIC_WORDS)]} na pergunta {index}?"
+            for index in range(args.queries)
+        ]
+
+        latencies, wall_seconds = asyncio.run(run_async_load(controller_rag, queries, args.concurrency))
+        print_report(f"aexecute_RAG (concorrência {args.concurrency})", latencies, wall_seconds)
+
+        if args.compare_sync:
+            latencies, wall_seconds = run_sync_load(controller_rag, queries)
+            print_report("execute_RAG (sequencial)", latencies, wall_seconds)
+
+    stub_server.shutdown()
@@ -0,0 +1,9 @@
+import math
+
+def percentile(values, percent):
+    """
+    Calcula o percentil (método nearest-rank) de uma lista de valores.
+    """
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
@@ -0,0 +1,62 @@
+import random
+
+# Vocabulário usado para gerar parágrafos sintéticos
+SYNTHETIC_WORDS = (
+    "campeão lane topo selva meio atirador suporte minion torre inibidor nexus dragão barão "
+    "arauto ouro experiência item runa feitiço visão sentinela objetivo rota emboscada farm "
+    "rotação estratégia equipe partida ranqueada elo desafiante mapa jogador habilidade"
+).split()
+
+def generate_paragraph(rng, words=80):
+    """
+    Gera um parágrafo sintético com palavras aleatórias do vocabulário.
+    """
+    return " ".join(rng.choice(SYNTHETIC_WORDS) for _ in range(words)).capitalize() + "."
+
+def generate_synthetic_pdf(pdf_path, pages=100, paragraphs_per_page=4, with_images=True, with_links=True, seed=42):
+    """
+    Gera um PDF sintético com texto, imagens e links em cada página (para benchmarks).
+
+    Args:
+        pdf_path (str): Caminho do PDF a ser gerado.
+        pages (int): Quantidade de páginas.
+        paragraphs_per_page (int): Parágrafos de texto por página.
+        with_images (bool): Insere uma pequena imagem em cada página.
+        with_links (bool): Insere um link externo em cada página.
+        seed (int): Semente para geração determinística.
+
+    Returns:
+        str: Caminho do PDF gerado.
+    """
+    # PyMuPDF importado apenas aqui: os benchmarks que só usam os textos sintéticos não dependem dele
+    import fitz
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+
+    # Imagem pequena reutilizada em todas as páginas
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    pixmap.set_rect(pixmap.irect, (200, 120, 40))
+
+    for page_num in range(pages):
+        page = doc.new_page()
+        text = "\n\n".join(generate_paragraph(rng) for _ in range(paragraphs_per_page))
+
+        # Título e parágrafos da página
+        page.insert_text((72, 60), f"Capítulo {page_num + 1}", fontsize=16)
+        page.insert_textbox(fitz.Rect(72, 80, 520, 640), text, fontsize=10)
+
+        if with_images:
+            page.insert_image(fitz.Rect(72, 660, 136, 724), pixmap=pixmap)
+
+        if with_links:
+            page.insert_link({
+                "kind": fitz.LINK_URI,
+                "from": fitz.Rect(160, 660, 360, 680),
+                "uri": f"https://example.com/capitulo/{page_num + 1}",
+            })
+
+    doc.save(pdf_path)
+    doc.close()
+
+    return pdf_path
@@ -1,14 +1,19 @@
+import time
+
 # Importações de bibliotecas internas do projeto
-from knowledge_base.vector_database.faiss_database import VectorDatabaseFAISS
-from knowledge_base.vector_database.chroma_database import VectorDatabaseChroma
-from knowledge_base.ingestion_data.chunking_langchain import ChunkSplitter
+from knowledge_base.vector_database.vector_store import create_vector_database, VECTOR_DATABASE
+from knowledge_base.lexical_index.bm25_index import BM25Index, BM25_ENABLED
+from knowledge_base.ingestion_data.chunking_langchain import ChunkSplitter, PageStreamSplitter
+from knowledge_base.ingestion_data.ingestion_pipeline import IngestionPipeline
+from knowledge_base.ingestion_data.ingestion_manifest import IngestionManifest, FILE_UNCHANGED
 
-from scraping_data.scraping_pdf.ocr_text_llamaparser import PDFExtractorLLAMA 
 from scraping_data.scraping_pdf.ocr_text_pdfplumber import PDFExtractorPlumber
 
+from llama_models.embedding_model import get_embedding_signature
+
 from utils.send_each_pdf_file import list_all_pdf_in_folder
-from utils.convert_dict_to_object import dict_to_namedtuple
-from utils.list_manipulation import flatten_documents
+from utils.chunk_identifier import create_chunk_id
+from utils.stage_profiler import StageProfiler
 
 class ControllerIngestionData:
     """
@@ -16,64 +21,211 @@ class ControllerIngestionData:
     Responsável por gerenciar a extração de dados de arquivos PDF,
     a fragmentação do conteúdo e a integração com modelos de inferência e bancos de dados vetoriais.
     """
-    def __init__(self):
+    def __init__(self, profile=False):
+        """
+        Args:
+            profile (bool): Mede cada etapa da ingestão por arquivo (tempo real, CPU, itens e pico de memória).
+        """
         # Inicializa a extração de texto de PDFs usando diferentes métodos
         self.plumber_pdf_extractor = PDFExtractorPlumber()
 
-        # Inicializa o banco de dados vetorial (Chroma)
-        self.database_chroma = VectorDatabaseChroma()
+        # O banco NumPy vive apenas na memória deste processo: a ingestão se perderia ao final
+        if VECTOR_DATABASE == "numpy":
+            raise ValueError("VECTOR_DATABASE=numpy é apenas para benchmarks: use chroma ou faiss na ingestão.")
+
+        # Inicializa o banco de dados vetorial configurado (VECTOR_DATABASE)
+        self.vector_database = create_vector_database()
+
+        # Inicializa o índice léxico BM25 usado na busca híbrida (BM25_ENABLED)
+        self.lexical_index = BM25Index() if BM25_ENABLED else None
+
+        # Banco com embeddings de outro modelo ou formato (ex.: /api/embeddings, sem normalização): apagado e refeito
+        self.vector_database.ensure_embedding_signature(get_embedding_signature())
+
+        # Banco vetorial vazio (novo ou apagado): reprocessa também os arquivos inalterados no manifesto
+        self.vector_backfill = self.vector_database.count() == 0
+
+        # Índice BM25 vazio com banco vetorial populado: reprocessa também os arquivos inalterados para preenchê-lo
+        self.lexical_backfill = (
+            self.lexical_index is not None and self.lexical_index.count() == 0 and not self.vector_backfill
+        )
 
         # Inicializa a ferramenta de fragmentação de texto
         self.chunk_splitter = ChunkSplitter()
 
-    def ingestion_data(self, pdf_file_path="data\LOL-Rumo-ao-Challenger.pdf"):
+        # Manifesto com os arquivos já ingeridos (tamanho, data de modificação, hash e chunks)
+        self.ingestion_manifest = IngestionManifest(self.vector_database.get_store_key())
+
+        # Medições por etapa da ingestão (sem efeito quando o modo de profiling está desativado)
+        self.stage_profiler = StageProfiler(enabled=profile)
+
+    def ingestion_data(self, pdf_file_path="data\LOL-Rumo-ao-Challenger.pdf", extraction_workers=1):
         """
         Método de ingestão de dados:
         Permite a ingestão de um arquivo PDF e seu processamento futuro.
         
         Args:
             pdf_file_path (str): Caminho para o arquivo PDF a ser processado.
+            extraction_workers (int): Processos para extrair faixas de páginas do PDF em paralelo (1 = streaming sequencial).
         
         """
         
+        profiler = self.stage_profiler
+        file_start = time.perf_counter()
+
         try: 
-            # Extrai o conteúdo do PDF e o converte para Markdown
-            markdown_data = self.plumber_pdf_extractor.convert_pdf_to_markdown(pdf_file_path)
-
-            # Lista para armazenar os dados fragmentados
-            chunked_data = []
-
-            # Processa cada página do Markdown extraído
-            for content in markdown_data:
-                # Converte o dicionário para um objeto mais estruturado
-                formated_content = dict_to_namedtuple(content)
-
-                # Realiza a fragmentação do conteúdo em chunks
-                chunk_split = self.chunk_splitter.recursive_split_documents([formated_content])
-                
-                # Adiciona os chunks processados à lista
-                chunked_data.append(chunk_split)
-            
-            # Retorna os dados fragmentados
-            formated_chunks = flatten_documents(chunked_data)
-            
-            # Retorna os dados fragmentados
-            self.database_chroma.insert_into_chromadb(formated_chunks)
+            # Verifica no manifesto se o arquivo mudou desde a última ingestão
+            with profiler.stage("manifest_check", pdf_file_path) as stage:
+                file_status, file_hash = self.ingestion_manifest.check_file(pdf_file_path)
+                stage["items"] = 1
+
+            if file_status == FILE_UNCHANGED and not (self.vector_backfill or self.lexical_backfill):
+                print(f"⏭️ Arquivo inalterado, ingestão ignorada: {pdf_file_path}")
+                return
+
+            if extraction_workers > 1:
+                # Extrai faixas de páginas do PDF em paralelo (documentos grandes)
+                with profiler.stage("extraction", pdf_file_path) as stage:
+                    markdown_pages = self.plumber_pdf_extractor.convert_pdf_to_markdown(pdf_file_path, workers=extraction_workers)
+                    stage["items"] = len(markdown_pages)
+            else:
+                # Extrai o conteúdo do PDF página a página (gerador), gravando o Markdown incrementalmente
+                markdown_pages = profiler.iterate(
+                    self.plumber_pdf_extractor.iter_pages(pdf_file_path), "extraction", pdf_file_path
+                )
+
+            # Fragmenta cada página assim que ela é extraída
+            formated_chunks = self.chunk_markdown_data(markdown_pages, pdf_file_path)
+            chunk_ids = [create_chunk_id(chunk.page_content) for chunk in formated_chunks]
+
+            # Remove os chunks que o arquivo modificado não produz mais
+            stale_chunk_ids = self.ingestion_manifest.get_stale_chunk_ids(pdf_file_path, chunk_ids)
+            if stale_chunk_ids:
+                print(f"🧹 Removendo chunks obsoletos: {len(stale_chunk_ids)}")
+                with profiler.stage("delete_stale", pdf_file_path) as stage:
+                    self.vector_database.delete_chunks(stale_chunk_ids)
+                    if self.lexical_index is not None:
+                        self.lexical_index.delete_chunks(stale_chunk_ids)
+                    stage["items"] = len(stale_chunk_ids)
+
+            # Mantém apenas os chunks ainda não armazenados
+            with profiler.stage("deduplication", pdf_file_path) as stage:
+                new_chunks = self.vector_database.filter_new_chunks(formated_chunks)
+                stage["items"] = len(formated_chunks)
+
+            if new_chunks:
+                print(f"👉 Adicionando novos documentos: {len(new_chunks)}")
+
+                # Gera os embeddings e grava os chunks novos no banco vetorial
+                with profiler.stage("embedding", pdf_file_path) as stage:
+                    chunk_embeddings = self.vector_database.embed_chunks(new_chunks)
+                    stage["items"] = len(new_chunks)
+
+                with profiler.stage("write", pdf_file_path) as stage:
+                    self.vector_database.insert_batch(new_chunks, chunk_embeddings)
+                    stage["items"] = len(new_chunks)
+
+                print("✅ Documentos adicionados com sucesso.")
+            else:
+                print("✅ Nenhum novo documento para adicionar.")
+
+            # Indexa os chunks do arquivo no índice BM25 (chunks já indexados são ignorados)
+            if self.lexical_index is not None:
+                with profiler.stage("lexical_index", pdf_file_path) as stage:
+                    self.lexical_index.insert_chunks(formated_chunks)
+                    stage["items"] = len(formated_chunks)
+
+            # Registra o arquivo no manifesto após a ingestão bem-sucedida
+            with profiler.stage("manifest_update", pdf_file_path) as stage:
+                self.ingestion_manifest.update_file(pdf_file_path, chunk_ids, file_hash)
+                self.ingestion_manifest.save()
+                stage["items"] = 1
         
         except Exception as e:
             print(f"Erro ao fazer a Ingestão de Dados: {e}")
 
-    def ingestion_data_folder(self, folder_path="./data"):
+        finally:
+            profiler.set_file_wall_seconds(pdf_file_path, time.perf_counter() - file_start)
+
+    def chunk_markdown_data(self, markdown_data, pdf_file_path=None):
+        """
+        Fragmenta as páginas extraídas de um PDF em chunks. O documento é dividido como um todo
+        (os chunks atravessam as quebras de página e registram `page_start`/`page_end`),
+        evitando fragmentos pequenos no fim de cada página.
+
+        Args:
+            markdown_data (iterable of dict): Páginas extraídas com texto e metadados (lista ou gerador).
+            pdf_file_path (str): Arquivo de origem, usado apenas no modo de profiling.
+
+        Returns:
+            list: Lista de chunks com metadados.
+        """
+        # Lista para armazenar os dados fragmentados
+        chunked_data = []
+        page_stream = PageStreamSplitter(self.chunk_splitter)
+
+        # Processa cada página do Markdown extraído assim que ela chega
+        for content in markdown_data:
+            with self.stage_profiler.stage("chunking", pdf_file_path) as stage:
+                page_chunks = page_stream.add_page(content)
+                stage["items"] = len(page_chunks)
+
+            chunked_data.extend(page_chunks)
+
+        # Divide o restante do documento
+        with self.stage_profiler.stage("chunking", pdf_file_path) as stage:
+            page_chunks = page_stream.finish()
+            stage["items"] = len(page_chunks)
+
+        chunked_data.extend(page_chunks)
+
+        # Retorna os dados fragmentados
+        return chunked_data
+
+    def ingestion_data_folder(self, folder_path="./data", parallel=False, extraction_workers=None,
+                              embedding_workers=4, max_in_flight=8, profile_report_path=None):
         """
         Método de ingestão de dados:
         Permite a ingestão de um arquivo PDF e seu processamento futuro.
         
         Args:
             folder_path (str): Caminho para o diretório dos arquivos PDF a ser processado.
+            parallel (bool): Usa o pipeline paralelo (extração, embeddings e escrita simultâneos).
+            extraction_workers (int): Processos de extração de PDF no modo paralelo (padrão: número de CPUs).
+            embedding_workers (int): Threads de embedding no modo paralelo.
+            max_in_flight (int): Máximo de lotes de embedding simultâneos no modo paralelo.
+            profile_report_path (str): Caminho do relatório JSON do modo de profiling (opcional; não aceito com `parallel`).
+
+        Returns:
+            dict or None: Relatório de vazão por etapa no modo paralelo, ou relatório do profiling por arquivo.
         """
+        # O profiling mede as etapas de cada arquivo em sequência: no pipeline as etapas se sobrepõem entre
+        # threads e processos, e o relatório disponível é o de vazão retornado por `IngestionPipeline.run`
+        if parallel and (self.stage_profiler.enabled or profile_report_path):
+            raise ValueError("O modo de profiling não é suportado com parallel=True: use o relatório de vazão do pipeline.")
+
         # Lista todos os arquivos PDF no diretório
         pdf_file_paths = list_all_pdf_in_folder(folder_path)
+
+        # Processa os arquivos PDF em pipeline
+        if parallel:
+            pipeline = IngestionPipeline(
+                vector_database=self.vector_database,
+                lexical_index=self.lexical_index,
+                chunk_splitter=self.chunk_splitter,
+                ingestion_manifest=self.ingestion_manifest,
+                extraction_workers=extraction_workers,
+                embedding_workers=embedding_workers,
+                max_in_flight=max_in_flight,
+            )
+            return pipeline.run(pdf_file_paths)
         
         # Processa cada arquivo PDF
         for pdf_file_path in pdf_file_paths:
-            self.ingestion_data(pdf_file_path=pdf_file_path)
\ No newline at end of file
+            self.ingestion_data(pdf_file_path=pdf_file_path)
+
+        # Relatório estruturado das etapas de cada arquivo
+        if self.stage_profiler.enabled:
+            if profile_report_path:
+                self.stage_profiler.save_report(profile_report_path)
+            return self.stage_profiler.get_report()
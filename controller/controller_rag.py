@@ -1,11 +1,36 @@
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 # Importações de bibliotecas internas do projeto
-from knowledge_base.vector_database.faiss_database import VectorDatabaseFAISS
-from knowledge_base.vector_database.chroma_database import VectorDatabaseChroma
+from knowledge_base.vector_database.vector_store import create_vector_database
+from knowledge_base.lexical_index.bm25_index import BM25Index, BM25_ENABLED
+from knowledge_base.lexical_index.rank_fusion import reciprocal_rank_fusion
 
 from llama_models.inference_model import LLAMAInferenceModel
-from llama_models.embedding_model import LLAMAEmbeddingModel
+from llama_models.embedding_model import get_shared_embedding_model, get_embedding_signature
+
+from knowledge_base.answer_cache.semantic_answer_cache import SemanticAnswerCache, ANSWER_CACHE_ENABLED
 
 from prompt_template.prompts_template import create_prompt_template
+from prompt_template.context_builder import build_context
+
+from utils.metrics import metrics, TOKEN_BUCKETS
+from utils.tokenizer import count_tokens
+
+# Threads usadas para executar as consultas ao banco vetorial (bloqueantes) no modo assíncrono
+RAG_QUERY_WORKERS = int(os.getenv('RAG_QUERY_WORKERS', '8'))
+
+# Candidatos buscados em cada índice (vetorial e BM25) antes da fusão na busca híbrida
+HYBRID_CANDIDATES = int(os.getenv('HYBRID_CANDIDATES', '20'))
+
+# Constante do Reciprocal Rank Fusion (valores maiores reduzem o peso das primeiras posições)
+HYBRID_RRF_K = int(os.getenv('HYBRID_RRF_K', '60'))
+
+# Consultas enviadas ao banco vetorial em cada requisição da recuperação em lote
+RAG_QUERY_BATCH_SIZE = int(os.getenv('RAG_QUERY_BATCH_SIZE', '256'))
 
 class ControllerRAG:
     """
@@ -19,33 +44,217 @@ class ControllerRAG:
         e banco de dados vetorial.
         """
         # Inicializa os modelos de embedding e inferência
-        self.llama_embedding_model = LLAMAEmbeddingModel()
+        self.llama_embedding_model = get_shared_embedding_model()
         self.llama_inference_model = LLAMAInferenceModel()
 
-        # Inicializa o banco de dados vetorial (Chroma)
-        self.database_chroma = VectorDatabaseChroma()
+        # Banco de dados vetorial configurado (VECTOR_DATABASE), aberto apenas na primeira consulta
+        self._vector_database = None
+        self.vector_database_lock = threading.Lock()
+
+        # Índice léxico BM25 da busca híbrida (BM25_ENABLED), também aberto apenas na primeira consulta
+        self._lexical_index = None
+        self.lexical_index_lock = threading.Lock()
+
+        # Pool de threads para as consultas ao banco vetorial feitas pelo modo assíncrono
+        self.query_executor = ThreadPoolExecutor(max_workers=RAG_QUERY_WORKERS)
+
+        # Métricas da última execução em streaming (inclui o tempo até o primeiro token)
+        self.last_stream_metrics = None
+
+        # Tokens do último prompt montado (contexto, chunks usados, descartados e repetidos)
+        self.last_prompt_metrics = None
+
+        # Cache de respostas (exatas e semânticas), invalidado quando a coleção muda
+        self.answer_cache = None
+        if ANSWER_CACHE_ENABLED:
+            self.answer_cache = SemanticAnswerCache(version_function=lambda: self.vector_database.get_collection_version())
+
+    @property
+    def vector_database(self):
+        """
+        Banco de dados vetorial, criado no primeiro acesso (o import e a abertura do banco
+        não pesam na inicialização do controller).
+        """
+        with self.vector_database_lock:
+            if self._vector_database is None:
+                self._vector_database = create_vector_database()
+
+                # Vetores de outro modelo ou formato não se comparam às consultas: a ingestão precisa ser refeita
+                if (self._vector_database.count() > 0
+                        and self._vector_database.get_embedding_signature() != get_embedding_signature()):
+                    print("⚠️ Banco vetorial com embeddings de outro modelo ou formato: refaça a ingestão para atualizá-lo.")
+            return self._vector_database
+
+    @property
+    def lexical_index(self):
+        """
+        Índice léxico BM25, criado no primeiro acesso (None quando a busca híbrida está desativada).
+        """
+        if not BM25_ENABLED:
+            return None
+
+        with self.lexical_index_lock:
+            if self._lexical_index is None:
+                self._lexical_index = BM25Index()
+            return self._lexical_index
+
+    def search_documents(self, query_text, embedding_query, n_results=5):
+        """
+        Busca os documentos mais relevantes para a consulta. Com o índice BM25 ativo, combina
+        os resultados vetoriais e léxicos por Reciprocal Rank Fusion: chunks que citam os termos
+        exatos da pergunta (campeões, itens) sobem no ranking mesmo com embeddings pouco similares.
 
-    def retrieve_data(self, query_text, n_results=5):
+        Args:
+            query_text (str): Texto da consulta.
+            embedding_query (list): Embedding da consulta.
+            n_results (int): Número de documentos retornados.
+
+        Returns:
+            list: Documentos do mais relevante para o menos relevante.
+        """
+        return self.search_documents_batch([query_text], [embedding_query], n_results)[0]
+
+    def search_documents_batch(self, query_texts, embedding_queries, n_results=5):
+        """
+        Busca os documentos de várias consultas com uma única requisição ao banco vetorial
+        (e uma busca BM25 por consulta, na busca híbrida).
+
+        Args:
+            query_texts (list of str): Textos das consultas.
+            embedding_queries (list): Embeddings das consultas, na mesma ordem.
+            n_results (int): Número de documentos retornados por consulta.
+
+        Returns:
+            list: Para cada consulta, os documentos do mais relevante para o menos relevante.
+        """
+        lexical_index = self.lexical_index
+        if lexical_index is None:
+            return self.vector_database.query_batch(embedding_queries, n_results, include=("documents",))['documents']
+
+        # Busca mais candidatos em cada índice para que a fusão tenha de onde escolher
+        n_candidates = max(n_results, HYBRID_CANDIDATES)
+        vector_results = self.vector_database.query_batch(embedding_queries, n_candidates, include=("documents",))
+
+        results = []
+        for query_text, vector_ids, vector_documents in zip(query_texts, vector_results['ids'], vector_results['documents']):
+            lexical_results = lexical_index.search(query_text, n_candidates)
+
+            documents = dict(zip(vector_ids, vector_documents))
+            for chunk_id, document in zip(lexical_results['ids'], lexical_results['documents']):
+                documents.setdefault(chunk_id, document)
+
+            fused_ranking = reciprocal_rank_fusion([vector_ids, lexical_results['ids']], k=HYBRID_RRF_K)
+            results.append([documents[chunk_id] for chunk_id, _ in fused_ranking[:n_results]])
+
+        return results
+
+    def retrieve_data(self, query_text, n_results=5, embedding_query=None):
         """
         Recupera dados do banco vetorial com base em uma consulta textual.
 
         Args:
             query_text (str): Texto da consulta.
             n_results (int): Número de resultados desejados.
+            embedding_query (list): Embedding da consulta já calculado (opcional).
 
         Returns:
             dict: Dados recuperados do banco vetorial.
         """
         # Gera um vetor de embedding para a consulta textual
-        embedding_query = self.llama_embedding_model.generate_embedding(query_text)
-        
-        # Recupera dados do banco vetorial
-        retrieve_data = self.database_chroma.query_chromadb(embedding_query, n_results)
+        if embedding_query is None:
+            embedding_query = self.llama_embedding_model.generate_embedding(query_text)
         
-        # Retorna o primeiro documento recuperado
-        filter_data = retrieve_data['documents'][0]
+        # Recupera dados do banco vetorial (e do índice BM25, na busca híbrida)
+        with metrics.timer("rag_retrieve_seconds"):
+            filter_data = self.search_documents(query_text, embedding_query, n_results)
+
         return filter_data
 
+    def retrieve_data_batch(self, queries, n_results=5, embedding_queries=None, batch_size=RAG_QUERY_BATCH_SIZE):
+        """
+        Recupera dados do banco vetorial para várias consultas (avaliações offline, pré-cálculo de FAQs):
+        os embeddings são gerados em lote (pelo cache de embeddings) e cada lote de consultas
+        é enviado ao banco vetorial em uma única requisição.
+
+        Args:
+            queries (list of str): Textos das consultas.
+            n_results (int): Número de resultados desejados por consulta.
+            embedding_queries (list): Embeddings das consultas já calculados (opcional).
+            batch_size (int): Consultas enviadas ao banco vetorial por requisição.
+
+        Returns:
+            list: Dados recuperados para cada consulta, na ordem das consultas.
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+
+        # Gera os embeddings de todas as consultas em requisições em lote
+        if embedding_queries is None:
+            with metrics.timer("rag_embed_query_seconds"):
+                embedding_queries = self.llama_embedding_model.generate_embeddings(queries)
+
+        results = []
+        with metrics.timer("rag_retrieve_batch_seconds"):
+            for start in range(0, len(queries), batch_size):
+                results.extend(self.search_documents_batch(
+                    queries[start:start + batch_size], embedding_queries[start:start + batch_size], n_results
+                ))
+
+        return results
+
+    async def aretrieve_data(self, query_text, n_results=5, embedding_query=None):
+        """
+        Recupera dados do banco vetorial com base em uma consulta textual, de forma assíncrona.
+        A consulta ao banco vetorial (bloqueante) é executada no pool de threads.
+
+        Args:
+            query_text (str): Texto da consulta.
+            n_results (int): Número de resultados desejados.
+            embedding_query (list): Embedding da consulta já calculado (opcional).
+
+        Returns:
+            dict: Dados recuperados do banco vetorial.
+        """
+        # Gera um vetor de embedding para a consulta textual
+        if embedding_query is None:
+            embedding_query = await self.llama_embedding_model.agenerate_embedding(query_text, self.query_executor)
+
+        # Recupera dados do banco vetorial (e do índice BM25) sem bloquear o event loop
+        loop = asyncio.get_running_loop()
+        with metrics.timer("rag_retrieve_seconds"):
+            filter_data = await loop.run_in_executor(
+                self.query_executor, self.search_documents, query_text, embedding_query, n_results
+            )
+
+        return filter_data
+
+    def build_prompt(self, user_query, contexts):
+        """
+        Monta o prompt com o contexto deduplicado e limitado ao orçamento de tokens (CONTEXT_TOKEN_BUDGET),
+        registrando a quantidade de tokens de cada requisição.
+
+        Args:
+            user_query (str): Pergunta do usuário.
+            contexts (list): Documentos recuperados, do mais relevante para o menos relevante.
+
+        Returns:
+            tuple: Prompt e suas métricas (tokens do prompt e do contexto, chunks usados, descartados e repetidos).
+        """
+        context = build_context(contexts)
+        prompt = create_prompt_template(user_query, context["text"])
+
+        prompt_metrics = {key: value for key, value in context.items() if key != "text"}
+        prompt_metrics["prompt_tokens"] = count_tokens(prompt)
+        self.last_prompt_metrics = prompt_metrics
+
+        metrics.observe("rag_prompt_tokens", prompt_metrics["prompt_tokens"], buckets=TOKEN_BUCKETS)
+        metrics.observe("rag_context_tokens", prompt_metrics["context_tokens"], buckets=TOKEN_BUCKETS)
+        metrics.increment("rag_context_chunks_dropped_total", prompt_metrics["chunks_dropped"])
+        metrics.increment("rag_context_duplicates_removed_total", prompt_metrics["duplicates_removed"] + prompt_metrics["chunks_merged"])
+
+        return prompt, prompt_metrics
+
     def generate_response(self, user_query, contexts):
         """
         Constrói um prompt para o modelo de inferência com base no contexto e na pergunta do usuário.
@@ -58,10 +267,15 @@ class ControllerRAG:
             response_llm: Resposta gerada pelo modelo de inferência.
         """
         # Cria um prompt para o modelo de inferência
-        prompt = create_prompt_template(user_query, contexts)
+        prompt, prompt_metrics = self.build_prompt(user_query, contexts)
+        print(
+            f"[system] Prompt com {prompt_metrics['prompt_tokens']} tokens "
+            f"(contexto: {prompt_metrics['context_tokens']} tokens, {prompt_metrics['chunks_used']} blocos)."
+        )
         
         # Gera uma resposta com base no prompt
-        response_llm = self.llama_inference_model.invoke_llm_model(prompt)
+        with metrics.timer("rag_generate_seconds"):
+            response_llm = self.llama_inference_model.invoke_llm_model(prompt)
         
         return response_llm
     
@@ -76,15 +290,169 @@ class ControllerRAG:
             None: Indica a conclusão do processo.
         """
         
-        # Recupera dados relevantes do banco vetorial
-        print("[system] Recuperando dados do banco vetorial...")
-        context = self.retrieve_data(user_query, n_results=5)
+        metrics.increment("rag_requests_total")
+
+        with metrics.timer("rag_request_seconds"):
+            # Responde imediatamente perguntas idênticas já respondidas
+            if self.answer_cache is not None:
+                cached_response = self.answer_cache.get_exact(user_query)
+                if cached_response is not None:
+                    print("[system] Resposta recuperada do cache.")
+                    metrics.increment("rag_answer_cache_hits_total", labels={"kind": "exact"})
+                    return cached_response
+
+            # Gera o embedding da pergunta (reutilizado pelo cache semântico e pela recuperação)
+            with metrics.timer("rag_embed_query_seconds"):
+                embedding_query = self.llama_embedding_model.generate_embedding(user_query)
+
+            # Responde perguntas quase idênticas a partir do cache semântico
+            if self.answer_cache is not None:
+                cached_response = self.answer_cache.get_similar(embedding_query)
+                if cached_response is not None:
+                    print("[system] Resposta recuperada do cache semântico.")
+                    metrics.increment("rag_answer_cache_hits_total", labels={"kind": "semantic"})
+                    return cached_response
+
+            # Versão da coleção usada na recuperação (a resposta só é armazenada se ela não mudar)
+            if self.answer_cache is not None:
+                collection_version = self.answer_cache.get_version()
+
+            # Recupera dados relevantes do banco vetorial
+            print("[system] Recuperando dados do banco vetorial...")
+            context = self.retrieve_data(user_query, n_results=5, embedding_query=embedding_query)
+
+            # Gera resposta com base nos dados recuperados
+            print("[system] Gerando resposta...")
+            response = self.generate_response(user_query, context)
 
-        # Gera resposta com base nos dados recuperados
-        print("[system] Gerando resposta...")
-        response = self.generate_response(user_query, context)
+            # Armazena a resposta para perguntas futuras
+            if self.answer_cache is not None:
+                self.answer_cache.put(user_query, embedding_query, response, collection_version)
         
-        return response
+            return response
+
+    def stream_RAG(self, user_query, n_results=5):
+        """
+        Executa o RAG em streaming: emite um evento ao concluir a recuperação e
+        um evento para cada token gerado, medindo o tempo até o primeiro token.
+
+        Args:
+            user_query (str): Pergunta do usuário.
+            n_results (int): Número de documentos recuperados.
+
+        Yields:
+            dict: Eventos `retrieval_done`, `token` e, ao final, `done` com a resposta completa e as métricas.
+        """
+        start = time.perf_counter()
+
+        # Recupera dados relevantes do banco vetorial
+        context = self.retrieve_data(user_query, n_results=n_results)
+        retrieval_seconds = time.perf_counter() - start
+
+        yield {"event": "retrieval_done", "contexts": context, "elapsed_seconds": retrieval_seconds}
+
+        # Cria o prompt e repassa os tokens assim que o modelo os produz
+        prompt, prompt_metrics = self.build_prompt(user_query, context)
+        time_to_first_token = None
+        tokens = []
+
+        for token in self.llama_inference_model.stream_llm_model(prompt):
+            if time_to_first_token is None:
+                time_to_first_token = time.perf_counter() - start
+
+            tokens.append(token)
+            yield {"event": "token", "token": token}
+
+        # Registra as métricas da execução
+        self.last_stream_metrics = {
+            "retrieval_seconds": retrieval_seconds,
+            "time_to_first_token_seconds": time_to_first_token,
+            "total_seconds": time.perf_counter() - start,
+            "token_count": len(tokens),
+            "prompt_tokens": prompt_metrics["prompt_tokens"],
+            "context_tokens": prompt_metrics["context_tokens"],
+        }
+
+        if time_to_first_token is not None:
+            metrics.observe("rag_time_to_first_token_seconds", time_to_first_token)
+
+        yield {"event": "done", "response": "".join(tokens), "metrics": self.last_stream_metrics}
+
+    async def agenerate_response(self, user_query, contexts):
+        """
+        Constrói o prompt e gera a resposta do modelo de inferência de forma assíncrona.
+
+        Args:
+            user_query (str): Pergunta do usuário.
+            contexts (str): Contextos recuperados dos documentos relevantes.
+
+        Returns:
+            response_llm: Resposta gerada pelo modelo de inferência.
+        """
+        # Cria um prompt para o modelo de inferência
+        prompt, _ = self.build_prompt(user_query, contexts)
+
+        # Gera uma resposta com base no prompt
+        with metrics.timer("rag_generate_seconds"):
+            response_llm = await self.llama_inference_model.ainvoke_llm_model(prompt)
+
+        return response_llm
+
+    async def aexecute_RAG(self, user_query):
+        """
+        Executa o processo de recuperação de dados e geração de resposta de forma assíncrona,
+        permitindo que várias perguntas sejam atendidas simultaneamente no mesmo processo.
+
+        Args:
+            user_query (str): Pergunta do usuário.
+
+        Returns:
+            str: Resposta gerada pelo modelo de inferência.
+        """
+        metrics.increment("rag_requests_total")
+
+        # O cache de respostas lê a versão da coleção do disco (e abre o banco vetorial no primeiro uso):
+        # suas chamadas são executadas no pool de threads, sem bloquear o event loop
+        loop = asyncio.get_running_loop()
+
+        with metrics.timer("rag_request_seconds"):
+            # Responde imediatamente perguntas idênticas já respondidas
+            if self.answer_cache is not None:
+                cached_response = await loop.run_in_executor(self.query_executor, self.answer_cache.get_exact, user_query)
+                if cached_response is not None:
+                    metrics.increment("rag_answer_cache_hits_total", labels={"kind": "exact"})
+                    return cached_response
+
+            # Gera o embedding da pergunta (reutilizado pelo cache semântico e pela recuperação)
+            with metrics.timer("rag_embed_query_seconds"):
+                embedding_query = await self.llama_embedding_model.agenerate_embedding(user_query, self.query_executor)
+
+            # Responde perguntas quase idênticas a partir do cache semântico
+            if self.answer_cache is not None:
+                cached_response = await loop.run_in_executor(
+                    self.query_executor, self.answer_cache.get_similar, embedding_query
+                )
+                if cached_response is not None:
+                    metrics.increment("rag_answer_cache_hits_total", labels={"kind": "semantic"})
+                    return cached_response
+
+            # Versão da coleção usada na recuperação (a resposta só é armazenada se ela não mudar)
+            if self.answer_cache is not None:
+                collection_version = await loop.run_in_executor(self.query_executor, self.answer_cache.get_version)
+
+            # Recupera dados relevantes do banco vetorial
+            context = await self.aretrieve_data(user_query, n_results=5, embedding_query=embedding_query)
+
+            # Gera resposta com base nos dados recuperados
+            response = await self.agenerate_response(user_query, context)
+
+            # Armazena a resposta para perguntas futuras
+            if self.answer_cache is not None:
+                await loop.run_in_executor(
+                    self.query_executor, self.answer_cache.put, user_query, embedding_query, response, collection_version
+                )
+
+            return response
     
 if __name__ == "__main__":
     # Exemplo de uso da classe ControllerRAG
@@ -96,4 +464,15 @@ if __name__ == "__main__":
     # Recupera dados relevantes do banco vetorial
     retrieve_data = controller.execute_RAG(query)
     
-    print(retrieve_data)
\ No newline at end of file
+    print(retrieve_data)
+
+    # Exibe a resposta em streaming, token a token
+    for event in controller.stream_RAG(query):
+        if event["event"] == "token":
+            print(event["token"], end="", flush=True)
+        elif event["event"] == "done":
+            print(f"\n[system] Tempo até o primeiro token: {event['metrics']['time_to_first_token_seconds']:.2f}s")
+
+    # Exibe as métricas coletadas (METRICS_ENABLED=true) no formato do Prometheus
+    if metrics.enabled:
+        print(metrics.export_prometheus())
\ No newline at end of file
@@ -0,0 +1,254 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Carregamento das variáveis de ambiente
+load_dotenv()
+
+# Habilita o cache de respostas do RAG
+ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Similaridade de cosseno mínima para considerar duas perguntas equivalentes
+ANSWER_CACHE_SIMILARITY_THRESHOLD = float(os.getenv('ANSWER_CACHE_SIMILARITY_THRESHOLD', '0.95'))
+
+# Tempo de vida de cada resposta armazenada (segundos)
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv('ANSWER_CACHE_TTL_SECONDS', '3600'))
+
+# Quantidade máxima de respostas armazenadas (remoção LRU)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', '1000'))
+
+# Marcador de `put`: armazena a resposta sem conferir a versão da coleção usada para montá-la
+ANY_VERSION = object()
+
+def normalize_query(query):
+    """
+    Normaliza uma pergunta para comparação exata (caixa, espaços e pontuação final).
+
+    Args:
+        query (str): Pergunta do usuário.
+
+    Returns:
+        str: Pergunta normalizada.
+    """
+    return re.sub(r"\s+", " ", query).strip().casefold().rstrip("?!. ")
+
+class SemanticAnswerCache:
+    """
+    Cache de respostas do RAG em memória:
+    1. Acerto exato pela pergunta normalizada;
+    2. Acerto semântico quando o embedding da pergunta tem similaridade de cosseno
+       acima do limite com o de uma pergunta já respondida.
+    Possui tempo de vida, limite de tamanho com remoção LRU e é invalidado quando a coleção muda.
+    """
+
+    def __init__(self, similarity_threshold=ANSWER_CACHE_SIMILARITY_THRESHOLD, ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+                 max_entries=ANSWER_CACHE_MAX_ENTRIES, version_function=None):
+        """
+        Inicializa o cache.
+
+        Args:
+            similarity_threshold (float): Similaridade de cosseno mínima para um acerto semântico.
+            ttl_seconds (float): Tempo de vida de cada resposta.
+            max_entries (int): Quantidade máxima de respostas armazenadas.
+            version_function (callable): Retorna a versão atual da coleção; mudanças esvaziam o cache
+                (chamada apenas no primeiro uso do cache).
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version_function = version_function
+        self.version = None
+        self.version_loaded = False
+
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+        # Índice vetorial das perguntas armazenadas (reconstruído sob demanda)
+        self.index_keys = []
+        self.index_matrix = None
+        self.index_dirty = True
+
+        # Contadores de uso do cache
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def check_version(self):
+        """
+        Esvazia o cache se a coleção foi alterada (ex.: nova ingestão) desde a última verificação.
+        """
+        if self.version_function is None:
+            return
+
+        version = self.version_function()
+
+        # A primeira leitura apenas registra a versão atual
+        if not self.version_loaded:
+            self.version = version
+            self.version_loaded = True
+            return
+
+        if version != self.version:
+            self.entries.clear()
+            self.index_dirty = True
+            self.version = version
+            self.invalidations += 1
+
+    def get_version(self):
+        """
+        Lê a versão atual da coleção, a ser registrada antes da recuperação e repassada a `put`.
+
+        Returns:
+            str or None: Versão da coleção (None sem `version_function`).
+        """
+        return self.version_function() if self.version_function is not None else None
+
+    def remove_expired(self):
+        """
+        Remove as respostas cujo tempo de vida expirou.
+        """
+        now = time.monotonic()
+        expired_keys = [key for key, entry in self.entries.items() if now - entry["created_at"] > self.ttl_seconds]
+
+        for key in expired_keys:
+            del self.entries[key]
+
+        if expired_keys:
+            self.index_dirty = True
+
+    def get_exact(self, query):
+        """
+        Busca a resposta de uma pergunta idêntica (após normalização).
+
+        Args:
+            query (str): Pergunta do usuário.
+
+        Returns:
+            str or None: Resposta armazenada, ou None se não houver acerto exato.
+        """
+        key = normalize_query(query)
+
+        with self.lock:
+            self.check_version()
+            self.remove_expired()
+
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            self.entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry["answer"]
+
+    def get_similar(self, query_embedding):
+        """
+        Busca a resposta da pergunta armazenada mais parecida, se a similaridade superar o limite.
+        Deve ser chamada após `get_exact` (uma falha aqui é contabilizada como falha do cache).
+
+        Args:
+            query_embedding (list): Embedding da pergunta do usuário.
+
+        Returns:
+            str or None: Resposta armazenada, ou None se não houver pergunta suficientemente parecida.
+        """
+        with self.lock:
+            self.check_version()
+            self.remove_expired()
+
+            if not self.entries:
+                self.misses += 1
+                return None
+
+            # Reconstrói a matriz de embeddings normalizados quando o conteúdo mudou
+            if self.index_dirty:
+                self.index_keys = list(self.entries)
+                self.index_matrix = np.vstack([self.entries[key]["embedding"] for key in self.index_keys])
+                self.index_dirty = False
+
+            # Similaridade de cosseno com todas as perguntas em uma única operação vetorizada
+            similarities = self.index_matrix @ self.normalize_embedding(query_embedding)
+            best_index = int(np.argmax(similarities))
+
+            if similarities[best_index] < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            key = self.index_keys[best_index]
+            self.entries.move_to_end(key)
+            self.semantic_hits += 1
+            return self.entries[key]["answer"]
+
+    def put(self, query, query_embedding, answer, collection_version=ANY_VERSION):
+        """
+        Armazena a resposta de uma pergunta.
+
+        Args:
+            query (str): Pergunta do usuário.
+            query_embedding (list): Embedding da pergunta.
+            answer (str): Resposta gerada.
+            collection_version (str): Versão da coleção lida antes da recuperação (`get_version`);
+                se a coleção mudou desde então, a resposta não é armazenada.
+        """
+        key = normalize_query(query)
+
+        with self.lock:
+            self.check_version()
+
+            # Resposta montada a partir de uma versão anterior da coleção (ingestão durante a geração)
+            if collection_version is not ANY_VERSION and collection_version != self.version:
+                return
+
+            self.entries[key] = {
+                "answer": answer,
+                "embedding": self.normalize_embedding(query_embedding),
+                "created_at": time.monotonic(),
+            }
+            self.entries.move_to_end(key)
+
+            # Remove as respostas menos usadas recentemente quando o limite é excedido
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+            self.index_dirty = True
+
+    def normalize_embedding(self, embedding):
+        """
+        Converte um embedding em um vetor float32 de norma unitária.
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def clear(self):
+        """
+        Remove todas as respostas armazenadas.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.index_dirty = True
+
+    def get_stats(self):
+        """
+        Retorna os contadores de uso do cache.
+
+        Returns:
+            dict: Acertos exatos e semânticos, falhas, remoções, invalidações e entradas armazenadas.
+        """
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self.entries),
+            "hit_rate": (self.exact_hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
@@ -1,5 +1,37 @@
+import os
+import re
+from bisect import bisect_right
+from functools import partial
+import numpy as np
+from dotenv import load_dotenv
+
 from langchain.text_splitter import CharacterTextSplitter
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+from utils.tokenizer import count_tokens, get_token_counter, get_tokenizer, EMBEDDING_TOKENIZER_NAME, TOKEN_COUNT_CACHE_SIZE
+
+# Carregamento das variáveis de ambiente
+load_dotenv()
+
+# Unidade do tamanho dos chunks: "characters" (caracteres) ou "tokens" (tokenizer do modelo de embeddings)
+CHUNK_LENGTH_MODE = os.getenv('CHUNK_LENGTH_MODE', 'characters').lower()
+
+# Tamanho e sobreposição dos chunks no modo "tokens" (o tamanho não deve passar da janela do modelo de embeddings)
+CHUNK_TOKEN_SIZE = int(os.getenv('CHUNK_TOKEN_SIZE', '512'))
+CHUNK_TOKEN_OVERLAP = int(os.getenv('CHUNK_TOKEN_OVERLAP', '100'))
+
+# Estratégia de divisão: "recursive" (separadores e tamanho) ou "semantic" (mudanças de assunto entre frases)
+CHUNK_SPLIT_STRATEGY = os.getenv('CHUNK_SPLIT_STRATEGY', 'recursive').lower()
+
+# Percentil das distâncias entre frases vizinhas acima do qual há uma mudança de assunto
+SEMANTIC_BREAKPOINT_PERCENTILE = float(os.getenv('SEMANTIC_BREAKPOINT_PERCENTILE', '90'))
+
+# Frases vizinhas (de cada lado) incluídas no embedding de cada frase, para suavizar as distâncias
+SEMANTIC_SENTENCE_WINDOW = int(os.getenv('SEMANTIC_SENTENCE_WINDOW', '1'))
+
+# Fim de frase (pontuação seguida de espaço) ou de parágrafo (linha em branco)
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
 
 # Texto de exemplo usado para testar a funcionalidade de divisão em chunks
 large_test_text = """
@@ -68,17 +100,76 @@ No seu primeiro dia programando, João decidiu começar com algo simples. Ele ab
 
 class ChunkSplitter:
     """
-    Classe para dividir textos longos em chunks menores utilizando dois métodos:
+    Classe para dividir textos longos em chunks menores utilizando três métodos:
     1. `CharacterTextSplitter` - Divide com base em caracteres e separadores.
     2. `RecursiveCharacterTextSplitter` - Divide de forma recursiva, utilizando backup caso os limites sejam excedidos.
+    3. Semântico - Divide entre frases vizinhas cujos embeddings são distantes (mudança de assunto).
+    Os splitters são criados uma única vez e reutilizados em todas as chamadas.
     """
 
-    def __init__(self):
+    def __init__(self, chunk_size=None, chunk_overlap=None, separator="\n", length_mode=CHUNK_LENGTH_MODE,
+                 token_count_cache_size=TOKEN_COUNT_CACHE_SIZE, split_strategy=CHUNK_SPLIT_STRATEGY,
+                 embedding_model=None, breakpoint_percentile=SEMANTIC_BREAKPOINT_PERCENTILE,
+                 sentence_window=SEMANTIC_SENTENCE_WINDOW):
+        """
+        Args:
+            chunk_size (int): Tamanho máximo de cada chunk (padrão: 1000 caracteres ou CHUNK_TOKEN_SIZE tokens).
+            chunk_overlap (int): Sobreposição entre chunks consecutivos (padrão: 200 caracteres ou CHUNK_TOKEN_OVERLAP tokens).
+            separator (str): Separador usado pelo `CharacterTextSplitter`.
+            length_mode (str): Unidade dos tamanhos: "characters" ou "tokens".
+            token_count_cache_size (int): Textos com contagem de tokens memorizada no modo "tokens" (0 = sem memoização).
+            split_strategy (str): Estratégia de `split_text_with_offsets`: "recursive" ou "semantic".
+            embedding_model (LLAMAEmbeddingModel): Modelo de embeddings da divisão semântica (padrão: o modelo compartilhado).
+            breakpoint_percentile (float): Percentil das distâncias entre frases que marca uma mudança de assunto.
+            sentence_window (int): Frases vizinhas (de cada lado) incluídas no embedding de cada frase.
+        """
+        if split_strategy not in ("recursive", "semantic"):
+            raise ValueError(f"Estratégia de divisão inválida: {split_strategy} (use recursive ou semantic)")
+
+        if length_mode == "tokens":
+            default_chunk_size, default_chunk_overlap = CHUNK_TOKEN_SIZE, CHUNK_TOKEN_OVERLAP
+            length_function = get_token_counter(EMBEDDING_TOKENIZER_NAME, token_count_cache_size)
+            buffer_length_function = partial(count_tokens, tokenizer_name=EMBEDDING_TOKENIZER_NAME)
+
+            # Sem o tokenizer do modelo de embeddings, os tamanhos são apenas estimados
+            if get_tokenizer(EMBEDDING_TOKENIZER_NAME) is None:
+                print("⚠️ CHUNK_LENGTH_MODE=tokens sem tokenizer de embeddings (EMBEDDING_TOKENIZER_NAME): "
+                      "tamanho dos chunks estimado, podendo exceder a janela do modelo.")
+        elif length_mode == "characters":
+            default_chunk_size, default_chunk_overlap = 1000, 200
+            length_function = len
+            buffer_length_function = len
+        else:
+            raise ValueError(f"Modo de tamanho de chunk inválido: {length_mode} (use characters ou tokens)")
+
         # Configuração padrão para separador, tamanho de chunk e sobreposição
-        self.separator = "\n"  # Define o separador entre os chunks
-        self.chunk_size = 1000  # Tamanho máximo de cada chunk
-        self.chunk_overlap = 200  # Sobreposição entre chunks
-        self.length_function = len  # Função de cálculo do tamanho do texto
+        self.length_mode = length_mode
+        self.separator = separator  # Define o separador entre os chunks
+        self.chunk_size = chunk_size or default_chunk_size  # Tamanho máximo de cada chunk
+        self.chunk_overlap = default_chunk_overlap if chunk_overlap is None else chunk_overlap  # Sobreposição entre chunks
+        self.length_function = length_function  # Função de cálculo do tamanho do texto
+        self.buffer_length_function = buffer_length_function  # Mesma medida sem cache, para os buffers de páginas
+        self.split_strategy = split_strategy
+        self.embedding_model = embedding_model
+        self.breakpoint_percentile = breakpoint_percentile
+        self.sentence_window = sentence_window
+
+        # Fragmentos finais menores que isso são unidos ao chunk anterior
+        self.min_chunk_size = self.chunk_size // 4
+
+        self.character_text_splitter = CharacterTextSplitter(
+            separator=self.separator,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+            length_function=self.length_function
+        )
+
+        self.recursive_text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+            length_function=self.length_function,
+            is_separator_regex=False,  # Define que o separador não é um regex
+        )
 
     def character_split_documents(self, text):
         """
@@ -90,15 +181,8 @@ class ChunkSplitter:
         Returns:
             list: Lista de chunks resultantes da divisão.
         """
-        text_splitter = CharacterTextSplitter(
-            separator=self.separator,
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=self.length_function
-        )
-
         # Executa a divisão do texto em chunks
-        text_chunks = text_splitter.split_text(text)
+        text_chunks = self.character_text_splitter.split_text(text)
         return text_chunks
 
     def recursive_split_documents(self, text):
@@ -111,16 +195,306 @@ class ChunkSplitter:
         Returns:
             list: Lista de chunks resultantes da divisão recursiva.
         """
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=self.length_function,
-            is_separator_regex=False,  # Define que o separador não é um regex
-        )
-
         # Executa a divisão recursiva do texto em chunks
-        text_chunks = text_splitter.split_documents(text)
+        text_chunks = self.recursive_text_splitter.split_documents(text)
         return text_chunks
+
+    def split_text_with_offsets(self, text):
+        """
+        Divide o texto com a estratégia configurada e localiza o início de cada chunk no texto.
+
+        Args:
+            text (str): Texto a ser dividido.
+
+        Returns:
+            list: Tuplas (chunk, posição inicial no texto).
+        """
+        if self.split_strategy == "semantic":
+            return self.semantic_split_text_with_offsets(text)
+
+        return self.recursive_split_text_with_offsets(text)
+
+    def recursive_split_text_with_offsets(self, text):
+        """
+        Divide o texto com o `RecursiveCharacterTextSplitter` e localiza o início de cada chunk no texto.
+
+        Args:
+            text (str): Texto a ser dividido.
+
+        Returns:
+            list: Tuplas (chunk, posição inicial no texto).
+        """
+        chunks_with_offsets = []
+        search_start = 0
+
+        for chunk in self.recursive_text_splitter.split_text(text):
+            # Os chunks aparecem em ordem; a busca parte do chunk anterior (que pode se sobrepor a este)
+            start = text.find(chunk, search_start)
+            if start == -1:
+                start = search_start
+
+            chunks_with_offsets.append((chunk, start))
+            search_start = start + 1
+
+        return chunks_with_offsets
+
+    def semantic_split_documents(self, documents):
+        """
+        Divide documentos em chunks nas mudanças de assunto entre frases vizinhas.
+
+        Args:
+            documents (list of Document): Documentos a serem divididos.
+
+        Returns:
+            list: Lista de chunks (documentos com os metadados do documento de origem).
+        """
+        return [
+            Document(page_content=chunk, metadata=dict(document.metadata))
+            for document in documents
+            for chunk, _ in self.semantic_split_text_with_offsets(document.page_content)
+        ]
+
+    def split_sentences(self, text):
+        """
+        Divide o texto em frases.
+
+        Returns:
+            list: Tuplas (frase, posição inicial no texto).
+        """
+        sentences = []
+        start = 0
+
+        for match in SENTENCE_BOUNDARY.finditer(text):
+            if text[start:match.start()].strip():
+                sentences.append((text[start:match.start()], start))
+            start = match.end()
+
+        if text[start:].strip():
+            sentences.append((text[start:], start))
+
+        return sentences
+
+    def find_breakpoints(self, sentences):
+        """
+        Gera os embeddings das frases em lote (pelo cache de embeddings) e calcula, de uma só vez,
+        a distância de cosseno entre cada frase e a seguinte.
+
+        Args:
+            sentences (list of str): Frases do texto, em ordem.
+
+        Returns:
+            numpy.ndarray: Para cada frase exceto a última, True se o assunto muda depois dela.
+        """
+        if self.embedding_model is None:
+            from llama_models.embedding_model import get_shared_embedding_model
+            self.embedding_model = get_shared_embedding_model()
+
+        # Cada frase é representada junto das vizinhas: frases curtas isoladas geram distâncias ruidosas
+        window = self.sentence_window
+        sentence_windows = [
+            " ".join(sentences[max(0, index - window):index + window + 1]) for index in range(len(sentences))
+        ]
+
+        embeddings = np.asarray(self.embedding_model.generate_embeddings(sentence_windows), dtype=np.float32)
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+        distances = 1.0 - np.einsum("ij,ij->i", embeddings[:-1], embeddings[1:])
+        return distances > np.percentile(distances, self.breakpoint_percentile)
+
+    def semantic_split_text_with_offsets(self, text):
+        """
+        Divide o texto entre frases vizinhas de assuntos diferentes. Grupos menores que `min_chunk_size`
+        continuam no próximo assunto, grupos maiores que `chunk_size` são fechados antes de ultrapassá-lo
+        e frases que sozinhas excedem o tamanho são divididas pelo `RecursiveCharacterTextSplitter`.
+
+        Args:
+            text (str): Texto a ser dividido.
+
+        Returns:
+            list: Tuplas (chunk, posição inicial no texto).
+        """
+        sentences = self.split_sentences(text)
+        if len(sentences) < 2:
+            return self.recursive_split_text_with_offsets(text)
+
+        is_breakpoint = self.find_breakpoints([sentence for sentence, _ in sentences])
+        sentence_lengths = [self.length_function(sentence) for sentence, _ in sentences]
+
+        chunks_with_offsets = []
+        group_start = 0
+        group_length = 0
+
+        for index, sentence_length in enumerate(sentence_lengths):
+            # Fecha o grupo antes de ultrapassar o tamanho máximo
+            if index > group_start and group_length + sentence_length > self.chunk_size:
+                chunks_with_offsets.extend(self.create_sentence_group(text, sentences, group_start, index))
+                group_start, group_length = index, 0
+
+            group_length += sentence_length
+
+            # Fecha o grupo na mudança de assunto, se ele já tem o tamanho mínimo
+            if index < len(is_breakpoint) and is_breakpoint[index] and group_length >= self.min_chunk_size:
+                chunks_with_offsets.extend(self.create_sentence_group(text, sentences, group_start, index + 1))
+                group_start, group_length = index + 1, 0
+
+        if group_start < len(sentences):
+            chunks_with_offsets.extend(self.create_sentence_group(text, sentences, group_start, len(sentences)))
+
+        return chunks_with_offsets
+
+    def create_sentence_group(self, text, sentences, first, last):
+        """
+        Retorna o trecho do texto entre as frases `first` e `last` (exclusiva) como chunks com posição inicial.
+        """
+        last_sentence, last_start = sentences[last - 1]
+        group_start = sentences[first][1]
+        group_text = text[group_start:last_start + len(last_sentence)]
+
+        # Uma frase maior que o chunk (tabelas, listas sem pontuação) é dividida pelo splitter recursivo
+        if first == last - 1 and self.length_function(group_text) > self.chunk_size:
+            return [(chunk, group_start + start) for chunk, start in self.recursive_split_text_with_offsets(group_text)]
+
+        stripped_text = group_text.strip()
+        return [(stripped_text, group_start + len(group_text) - len(group_text.lstrip()))]
+
+    def split_document_pages(self, pages):
+        """
+        Divide as páginas de um documento inteiro em chunks, atravessando as quebras de página.
+        Cada chunk recebe os metadados da página onde começa e o intervalo `page_start`/`page_end`.
+
+        Args:
+            pages (iterable): Páginas do documento (dicionários ou objetos com `page_content` e `metadata`), lista ou gerador.
+
+        Yields:
+            Document: Chunks do documento, à medida que ficam prontos.
+        """
+        page_stream = PageStreamSplitter(self)
+        for page in pages:
+            yield from page_stream.add_page(page)
+        yield from page_stream.finish()
+
+class PageStreamSplitter:
+    """
+    Fragmentação incremental de um documento recebido página a página.
+    O texto das páginas é acumulado em um buffer e dividido quando há chunks suficientes;
+    os dois últimos chunks ficam no buffer, pois ainda podem continuar na próxima página
+    (ou, no fim do documento, receber o último fragmento se ele for pequeno demais).
+    """
+
+    def __init__(self, chunk_splitter):
+        """
+        Args:
+            chunk_splitter (ChunkSplitter): Splitter reutilizado (configuração e estratégia de divisão).
+        """
+        self.chunk_splitter = chunk_splitter
+        self.buffer = ""
+        self.page_starts = []  # Posição no buffer onde cada página começa
+        self.pages = []  # (número da página, metadados da página)
+        self.page_count = 0
+
+    def add_page(self, page):
+        """
+        Acrescenta uma página ao documento.
+
+        Args:
+            page (dict or Document): Página com `page_content` e `metadata`.
+
+        Returns:
+            list: Chunks concluídos (que não podem mais ser alterados pelas próximas páginas).
+        """
+        if isinstance(page, dict):
+            page_content, page_metadata = page["page_content"], page["metadata"]
+        else:
+            page_content, page_metadata = page.page_content, page.metadata
+
+        self.page_count += 1
+        if not page_content.strip():
+            return []
+
+        # Páginas separadas por uma linha em branco, o separador preferido pelo splitter
+        if self.buffer:
+            self.buffer += "\n\n"
+
+        page_number = int(page_metadata.get("page_number", self.page_count))
+        self.page_starts.append(len(self.buffer))
+        self.pages.append((page_number, page_metadata))
+        self.buffer += page_content
+
+        # Divide apenas quando o buffer rende chunks além dos dois mantidos
+        # (um token tem ao menos um caractere: o tamanho em caracteres descarta buffers curtos sem tokenizar)
+        minimum_length = 4 * self.chunk_splitter.chunk_size
+        if len(self.buffer) < minimum_length or self.chunk_splitter.buffer_length_function(self.buffer) < minimum_length:
+            return []
+
+        chunks_with_offsets = self.chunk_splitter.split_text_with_offsets(self.buffer)
+        if len(chunks_with_offsets) <= 2:
+            return []
+
+        completed = [
+            self.create_chunk(chunk, start) for chunk, start in chunks_with_offsets[:-2]
+        ]
+
+        # Reinicia o buffer no início do penúltimo chunk (preserva a sobreposição com o último chunk emitido)
+        self.rebase(chunks_with_offsets[-2][1])
+        return completed
+
+    def finish(self):
+        """
+        Divide o restante do documento, unindo o último fragmento ao chunk anterior quando ele é pequeno demais
+        e a união não ultrapassa `chunk_size`.
+
+        Returns:
+            list: Chunks restantes do documento.
+        """
+        if not self.buffer.strip():
+            return []
+
+        chunks_with_offsets = self.chunk_splitter.split_text_with_offsets(self.buffer)
+        length_function = self.chunk_splitter.length_function
+
+        if len(chunks_with_offsets) >= 2 and length_function(chunks_with_offsets[-1][0]) < self.chunk_splitter.min_chunk_size:
+            last_chunk, last_start = chunks_with_offsets[-1]
+            previous_start = chunks_with_offsets[-2][1]
+            merged_chunk = self.buffer[previous_start:last_start + len(last_chunk)].strip()
+
+            # Mantém os dois chunks quando a união excederia o tamanho máximo (ex.: a janela do modelo de embeddings)
+            if length_function(merged_chunk) <= self.chunk_splitter.chunk_size:
+                chunks_with_offsets[-2:] = [(merged_chunk, previous_start)]
+
+        remaining = [self.create_chunk(chunk, start) for chunk, start in chunks_with_offsets]
+
+        self.buffer = ""
+        self.page_starts = []
+        self.pages = []
+        return remaining
+
+    def find_page(self, offset):
+        """
+        Retorna o índice (em `self.pages`) da página que contém uma posição do buffer.
+        """
+        return max(bisect_right(self.page_starts, offset) - 1, 0)
+
+    def create_chunk(self, chunk, start):
+        """
+        Cria o documento de um chunk com os metadados da página inicial e o intervalo de páginas.
+        """
+        page_start, page_metadata = self.pages[self.find_page(start)]
+        page_end, _ = self.pages[self.find_page(start + len(chunk) - 1)]
+
+        metadata = dict(page_metadata)
+        metadata["page_start"] = page_start
+        metadata["page_end"] = page_end
+
+        return Document(page_content=chunk, metadata=metadata)
+
+    def rebase(self, start):
+        """
+        Descarta o início do buffer (já emitido em chunks), mantendo a página que contém a nova posição inicial.
+        """
+        first_page = self.find_page(start)
+        self.page_starts = [0] + [page_start - start for page_start in self.page_starts[first_page + 1:]]
+        self.pages = self.pages[first_page:]
+        self.buffer = self.buffer[start:]
     
     
 # Testando a funcionalidade com o texto exemplo
@@ -0,0 +1,177 @@
+import os
+import json
+import hashlib
+from dotenv import load_dotenv
+from utils.file_manipulation import create_directory
+
+# Carregamento das variáveis de ambiente
+load_dotenv()
+
+# Caminho do manifesto de ingestão (por padrão, ao lado do banco vetorial Chroma).
+# Um mesmo arquivo guarda um manifesto para cada banco vetorial (backend e caminho)
+INGESTION_MANIFEST_PATH = (
+    os.getenv('INGESTION_MANIFEST_PATH')
+    or os.path.join(os.getenv('CHROMA_PATH') or '.', 'ingestion_manifest.json')
+)
+
+# Situações possíveis de um arquivo em relação ao manifesto
+FILE_NEW = "new"
+FILE_MODIFIED = "modified"
+FILE_UNCHANGED = "unchanged"
+
+def compute_file_hash(file_path, block_size=1024 * 1024):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+
+    Args:
+        file_path (str): Caminho do arquivo.
+        block_size (int): Tamanho de cada bloco lido.
+
+    Returns:
+        str: Hash hexadecimal do conteúdo.
+    """
+    file_hash = hashlib.sha256()
+
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+class IngestionManifest:
+    """
+    Manifesto de ingestão: registra, para cada PDF ingerido, tamanho, data de modificação,
+    hash do conteúdo e os IDs dos chunks gerados. Permite pular arquivos inalterados e
+    remover apenas os chunks obsoletos de arquivos modificados.
+    Os registros pertencem a um banco vetorial (`store_key`): trocar de backend ou de caminho
+    não aproveita as ingestões feitas em outro banco.
+    """
+
+    def __init__(self, store_key, manifest_path=INGESTION_MANIFEST_PATH):
+        """
+        Carrega o manifesto do disco (ou inicia um manifesto vazio).
+
+        Args:
+            store_key (str): Identificador do banco vetorial (ver `VectorStore.get_store_key`).
+            manifest_path (str): Caminho do arquivo JSON do manifesto.
+        """
+        self.store_key = store_key
+        self.manifest_path = manifest_path
+        self.files = self.load_stores().get(store_key, {}).get("files", {})
+
+    def load_stores(self):
+        """
+        Lê os manifestos de todos os bancos vetoriais gravados no arquivo.
+
+        Returns:
+            dict: Mapeamento identificador do banco -> manifesto.
+        """
+        if not os.path.exists(self.manifest_path):
+            return {}
+
+        with open(self.manifest_path, "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+
+        # Formato anterior (um único manifesto): sempre se referia ao banco Chroma
+        if "stores" not in manifest:
+            return {self.store_key: {"files": manifest.get("files", {})}} if self.store_key.startswith("chroma:") else {}
+
+        return manifest["stores"]
+
+    def get_file_key(self, file_path):
+        """
+        Normaliza o caminho do arquivo usado como chave do manifesto.
+        """
+        return os.path.abspath(file_path)
+
+    def check_file(self, file_path):
+        """
+        Verifica se um arquivo é novo, foi modificado ou está inalterado.
+        O hash só é calculado quando tamanho ou data de modificação diferem do registro.
+
+        Args:
+            file_path (str): Caminho do arquivo PDF.
+
+        Returns:
+            tuple: Situação do arquivo (FILE_NEW, FILE_MODIFIED ou FILE_UNCHANGED) e o hash do conteúdo (ou None).
+        """
+        file_key = self.get_file_key(file_path)
+        record = self.files.get(file_key)
+        file_stat = os.stat(file_path)
+
+        if record is None:
+            return FILE_NEW, compute_file_hash(file_path)
+
+        # Tamanho e data de modificação iguais: arquivo considerado inalterado sem ler o conteúdo
+        if record["size"] == file_stat.st_size and record["mtime_ns"] == file_stat.st_mtime_ns:
+            return FILE_UNCHANGED, record["sha256"]
+
+        # Metadados diferentes, mas mesmo conteúdo (ex.: arquivo copiado ou "tocado")
+        file_hash = compute_file_hash(file_path)
+        if record["sha256"] == file_hash:
+            record["size"] = file_stat.st_size
+            record["mtime_ns"] = file_stat.st_mtime_ns
+            return FILE_UNCHANGED, file_hash
+
+        return FILE_MODIFIED, file_hash
+
+    def get_stale_chunk_ids(self, file_path, chunk_ids):
+        """
+        Retorna os IDs de chunks que o arquivo produzia antes e não produz mais.
+        IDs ainda referenciados por outros arquivos do manifesto são preservados.
+
+        Args:
+            file_path (str): Caminho do arquivo PDF.
+            chunk_ids (list of str): IDs dos chunks gerados na ingestão atual.
+
+        Returns:
+            list: IDs que devem ser removidos do banco vetorial.
+        """
+        file_key = self.get_file_key(file_path)
+        record = self.files.get(file_key)
+
+        if record is None:
+            return []
+
+        stale_ids = set(record["chunk_ids"]) - set(chunk_ids)
+
+        # Não remove chunks compartilhados com outros arquivos (mesmo conteúdo, mesmo ID)
+        for other_key, other_record in self.files.items():
+            if stale_ids and other_key != file_key:
+                stale_ids -= set(other_record["chunk_ids"])
+
+        return sorted(stale_ids)
+
+    def update_file(self, file_path, chunk_ids, file_hash):
+        """
+        Registra (ou atualiza) um arquivo ingerido no manifesto.
+
+        Args:
+            file_path (str): Caminho do arquivo PDF.
+            chunk_ids (list of str): IDs dos chunks gerados pelo arquivo.
+            file_hash (str): Hash SHA-256 do conteúdo do arquivo.
+        """
+        file_stat = os.stat(file_path)
+
+        self.files[self.get_file_key(file_path)] = {
+            "size": file_stat.st_size,
+            "mtime_ns": file_stat.st_mtime_ns,
+            "sha256": file_hash,
+            "chunk_ids": list(dict.fromkeys(chunk_ids)),
+        }
+
+    def save(self):
+        """
+        Salva o manifesto no disco de forma atômica (arquivo temporário + substituição),
+        preservando os manifestos dos outros bancos vetoriais.
+        """
+        create_directory(os.path.dirname(os.path.abspath(self.manifest_path)))
+
+        stores = self.load_stores()
+        stores[self.store_key] = {"files": self.files}
+
+        temporary_path = f"{self.manifest_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+            json.dump({"stores": stores}, manifest_file, ensure_ascii=False, indent=2)
+
+        os.replace(temporary_path, self.manifest_path)
@@ -0,0 +1,369 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from scraping_data.scraping_pdf.ocr_text_pdfplumber import extract_page_range, get_page_count
+from knowledge_base.ingestion_data.chunking_langchain import PageStreamSplitter
+from knowledge_base.ingestion_data.ingestion_manifest import FILE_UNCHANGED
+from utils.chunk_identifier import create_chunk_id
+from utils.file_manipulation import create_directory, create_markdown_path
+from utils.page_sharding import submit_page_ranges, MIN_PAGES_PER_SHARD
+
+# Marcador que sinaliza o fim da fila de escrita
+WRITER_STOP = object()
+
+def extract_pdf_page_range(pdf_file_path, start, end):
+    """
+    Extrai uma faixa de páginas de um PDF em um processo separado (o pdfplumber é limitado por CPU).
+
+    Args:
+        pdf_file_path (str): Caminho do arquivo PDF.
+        start (int): Índice da primeira página (a partir de 0).
+        end (int): Índice final (exclusivo).
+
+    Returns:
+        tuple: Páginas extraídas e o tempo de extração em segundos.
+    """
+    extraction_start = time.perf_counter()
+    markdown_data = extract_page_range(pdf_file_path, start, end)
+    return markdown_data, time.perf_counter() - extraction_start
+
+class IngestionPipeline:
+    """
+    Pipeline de ingestão paralela de vários PDFs:
+    1. Extração por faixas de páginas em um pool de processos;
+    2. Fragmentação à medida que as faixas de cada documento chegam, em ordem (PageStreamSplitter);
+    3. Embeddings dos chunks concluídos em um pool de threads, com limite de requisições simultâneas;
+    4. Escrita em lotes no banco vetorial por uma única thread;
+    5. Indexação dos chunks no índice léxico BM25 (opcional), ao final de cada documento.
+    """
+
+    def __init__(self, vector_database, chunk_splitter, extraction_workers=None, embedding_workers=4,
+                 max_in_flight=8, embedding_batch_size=None, write_batch_size=256, ingestion_manifest=None,
+                 lexical_index=None, pages_per_shard=MIN_PAGES_PER_SHARD,
+                 output_markdown_path='./outputs/ocr_documents/markdown'):
+        """
+        Inicializa o pipeline.
+
+        Args:
+            vector_database (VectorStore): Banco vetorial de destino.
+            chunk_splitter (ChunkSplitter): Splitter usado para fragmentar cada documento como um todo.
+            extraction_workers (int): Processos de extração de PDF (padrão: número de CPUs).
+            embedding_workers (int): Threads que enviam requisições de embedding.
+            max_in_flight (int): Máximo de lotes de embedding em andamento ao mesmo tempo.
+            embedding_batch_size (int): Quantidade de chunks por requisição de embedding
+                (padrão: `batch_size` do modelo de embeddings, definido por EMBEDDING_BATCH_SIZE).
+            write_batch_size (int): Quantidade de chunks por escrita no banco vetorial.
+            ingestion_manifest (IngestionManifest): Manifesto usado para pular arquivos inalterados (opcional).
+            lexical_index (BM25Index): Índice léxico atualizado junto com o banco vetorial (opcional).
+            pages_per_shard (int): Páginas por faixa de extração (faixas menores começam a fragmentação mais cedo).
+            output_markdown_path (str): Diretório onde o Markdown de cada documento é gravado.
+        """
+        self.vector_database = vector_database
+        self.chunk_splitter = chunk_splitter
+        self.extraction_workers = extraction_workers or os.cpu_count() or 1
+        self.embedding_workers = embedding_workers
+        self.max_in_flight = max_in_flight
+        self.embedding_batch_size = embedding_batch_size
+        self.write_batch_size = write_batch_size
+        self.ingestion_manifest = ingestion_manifest
+        self.lexical_index = lexical_index
+        self.pages_per_shard = pages_per_shard
+        self.output_markdown_path = output_markdown_path
+
+        self.stats_lock = threading.Lock()
+        self.stats = {}
+
+    def record_stage(self, stage, items, seconds):
+        """
+        Acumula a quantidade de itens e o tempo gasto em uma etapa.
+        """
+        with self.stats_lock:
+            stage_stats = self.stats.setdefault(stage, {"items": 0, "seconds": 0.0})
+            stage_stats["items"] += items
+            stage_stats["seconds"] += seconds
+
+    def run(self, pdf_file_paths):
+        """
+        Executa o pipeline sobre uma lista de arquivos PDF.
+
+        Args:
+            pdf_file_paths (list of str): Caminhos dos arquivos PDF.
+
+        Returns:
+            dict: Estatísticas por etapa (itens, tempo ocupado e vazão).
+        """
+        self.stats = {}
+        pipeline_start = time.perf_counter()
+
+        # Fila consumida pela thread escritora e controle de lotes em andamento
+        write_queue = queue.Queue(maxsize=self.max_in_flight * 2)
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        writer_errors = []
+        embedding_errors = []
+
+        # Tamanho dos lotes de embedding (padrão: o mesmo do modelo de embeddings compartilhado)
+        embedding_batch_size = self.embedding_batch_size
+        if embedding_batch_size is None:
+            from llama_models.embedding_model import get_shared_embedding_model
+            embedding_batch_size = get_shared_embedding_model().batch_size
+
+        writer = threading.Thread(target=self.write_worker, args=(write_queue, writer_errors), daemon=True)
+        writer.start()
+
+        # IDs já enviados para embedding nesta execução (evita trabalho duplicado entre arquivos)
+        scheduled_ids = set()
+        embedding_futures = []
+
+        # Chunks novos aguardando completar um lote de embedding
+        pending_chunks = []
+
+        # Hash e IDs dos chunks de cada arquivo processado, registrados no manifesto ao final
+        file_hashes = {}
+        file_chunk_ids = {}
+        run_chunk_ids = set()
+
+        # Banco vetorial vazio (novo ou apagado): reprocessa também os arquivos inalterados no manifesto
+        vector_backfill = self.vector_database.count() == 0
+
+        # Índice BM25 vazio com banco vetorial populado: reprocessa também os arquivos inalterados para preenchê-lo
+        lexical_backfill = (
+            self.lexical_index is not None and self.lexical_index.count() == 0 and not vector_backfill
+        )
+
+        # Ignora os arquivos que não mudaram desde a última ingestão
+        if self.ingestion_manifest is not None:
+            changed_file_paths = []
+            for pdf_file_path in pdf_file_paths:
+                file_status, file_hash = self.ingestion_manifest.check_file(pdf_file_path)
+
+                if file_status == FILE_UNCHANGED and not (vector_backfill or lexical_backfill):
+                    print(f"⏭️ Arquivo inalterado, ingestão ignorada: {pdf_file_path}")
+                    continue
+
+                file_hashes[pdf_file_path] = file_hash
+                changed_file_paths.append(pdf_file_path)
+
+            pdf_file_paths = changed_file_paths
+
+        with ThreadPoolExecutor(max_workers=self.embedding_workers) as embedding_pool, \
+                ProcessPoolExecutor(max_workers=self.extraction_workers) as extraction_pool:
+
+            def schedule_embeddings(chunks, flush=False):
+                """
+                Envia os chunks ainda não armazenados nem agendados em lotes de embedding completos
+                (o restante aguarda os próximos chunks, ou é enviado com `flush`).
+                """
+                for chunk in self.vector_database.filter_new_chunks(chunks):
+                    chunk_id = create_chunk_id(chunk.page_content)
+                    if chunk_id not in scheduled_ids:
+                        scheduled_ids.add(chunk_id)
+                        pending_chunks.append(chunk)
+
+                # Respeita o limite de requisições simultâneas
+                while len(pending_chunks) >= embedding_batch_size or (flush and pending_chunks):
+                    batch = pending_chunks[:embedding_batch_size]
+                    del pending_chunks[:embedding_batch_size]
+                    in_flight.acquire()
+                    embedding_futures.append(
+                        embedding_pool.submit(self.embed_batch, batch, write_queue, in_flight)
+                    )
+
+            # Envia as faixas de páginas de todos os documentos; os processos as extraem na ordem de envio
+            file_shards = []
+            for pdf_file_path in pdf_file_paths:
+                try:
+                    page_count = get_page_count(pdf_file_path)
+                except Exception as e:
+                    print(f"Erro ao extrair o arquivo {pdf_file_path}: {e}")
+                    continue
+
+                file_shards.append((pdf_file_path, submit_page_ranges(
+                    extraction_pool, extract_pdf_page_range, pdf_file_path, page_count, self.pages_per_shard
+                )))
+
+            create_directory(self.output_markdown_path)
+
+            # Fragmenta cada documento à medida que suas faixas de páginas chegam (em ordem)
+            for pdf_file_path, shard_futures in file_shards:
+                page_stream = PageStreamSplitter(self.chunk_splitter)
+                chunks = []
+
+                try:
+                    markdown_path = create_markdown_path(pdf_file_path, self.output_markdown_path)
+                    with open(markdown_path, "w", encoding="utf-8") as markdown_file:
+                        for shard_future in shard_futures:
+                            markdown_data, extraction_seconds = shard_future.result()
+                            self.record_stage("extraction", len(markdown_data), extraction_seconds)
+
+                            # Grava o Markdown da faixa (páginas separadas por uma linha em branco)
+                            for page in markdown_data:
+                                if markdown_file.tell() > 0:
+                                    markdown_file.write("\n\n")
+                                markdown_file.write(page["page_content"])
+
+                            # Chunks concluídos pela faixa seguem para o embedding sem esperar o fim do documento
+                            chunking_start = time.perf_counter()
+                            shard_chunks = [chunk for page in markdown_data for chunk in page_stream.add_page(page)]
+                            self.record_stage("chunking", len(shard_chunks), time.perf_counter() - chunking_start)
+
+                            chunks.extend(shard_chunks)
+                            schedule_embeddings(shard_chunks)
+
+                except Exception as e:
+                    # Descarta as faixas restantes; o documento não é registrado no manifesto
+                    for shard_future in shard_futures:
+                        shard_future.cancel()
+                    print(f"Erro ao extrair o arquivo {pdf_file_path}: {e}")
+                    continue
+
+                chunking_start = time.perf_counter()
+                final_chunks = page_stream.finish()
+                self.record_stage("chunking", len(final_chunks), time.perf_counter() - chunking_start)
+
+                chunks.extend(final_chunks)
+                schedule_embeddings(final_chunks, flush=True)
+
+                # Remove os chunks que o arquivo modificado não produz mais
+                if self.ingestion_manifest is not None:
+                    chunk_ids = [create_chunk_id(chunk.page_content) for chunk in chunks]
+                    file_chunk_ids[pdf_file_path] = chunk_ids
+
+                    # Preserva chunks produzidos por outros arquivos nesta mesma execução
+                    stale_chunk_ids = [
+                        chunk_id for chunk_id in self.ingestion_manifest.get_stale_chunk_ids(pdf_file_path, chunk_ids)
+                        if chunk_id not in run_chunk_ids
+                    ]
+                    if stale_chunk_ids:
+                        self.vector_database.delete_chunks(stale_chunk_ids)
+                        if self.lexical_index is not None:
+                            self.lexical_index.delete_chunks(stale_chunk_ids)
+
+                    run_chunk_ids.update(chunk_ids)
+
+                # Indexa os chunks no índice BM25 (chunks já indexados são ignorados)
+                if self.lexical_index is not None:
+                    lexical_start = time.perf_counter()
+                    self.lexical_index.insert_chunks(chunks)
+                    self.record_stage("lexical_index", len(chunks), time.perf_counter() - lexical_start)
+
+            # Aguarda todos os lotes de embedding e propaga eventuais erros
+            for future in embedding_futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    embedding_errors.append(e)
+                    print(f"Erro ao gerar embeddings: {e}")
+
+        # Encerra a thread escritora depois que todos os lotes foram enfileirados
+        write_queue.put(WRITER_STOP)
+        writer.join()
+
+        for error in writer_errors:
+            print(f"Erro ao escrever no banco vetorial: {error}")
+
+        # Atualiza o manifesto somente se todos os chunks foram gravados
+        if self.ingestion_manifest is not None and file_chunk_ids:
+            if embedding_errors or writer_errors:
+                print("⚠️ Manifesto não atualizado devido a erros na ingestão.")
+            else:
+                for pdf_file_path, chunk_ids in file_chunk_ids.items():
+                    self.ingestion_manifest.update_file(pdf_file_path, chunk_ids, file_hashes[pdf_file_path])
+                self.ingestion_manifest.save()
+
+        report = self.build_report(time.perf_counter() - pipeline_start)
+        self.print_report(report)
+
+        return report
+
+    def embed_batch(self, chunks, write_queue, in_flight):
+        """
+        Gera os embeddings de um lote de chunks e envia o resultado para a fila de escrita.
+        """
+        try:
+            start = time.perf_counter()
+            embeddings = self.vector_database.embed_chunks(chunks)
+            self.record_stage("embedding", len(chunks), time.perf_counter() - start)
+
+            write_queue.put((chunks, embeddings))
+        finally:
+            in_flight.release()
+
+    def write_worker(self, write_queue, writer_errors):
+        """
+        Thread única de escrita: agrupa os lotes recebidos e grava no banco vetorial.
+        """
+        pending_chunks = []
+        pending_embeddings = []
+
+        def flush():
+            if not pending_chunks:
+                return
+
+            start = time.perf_counter()
+            try:
+                self.vector_database.insert_batch(pending_chunks, pending_embeddings)
+                self.record_stage("write", len(pending_chunks), time.perf_counter() - start)
+            except Exception as e:
+                writer_errors.append(e)
+
+            pending_chunks.clear()
+            pending_embeddings.clear()
+
+        while True:
+            item = write_queue.get()
+
+            if item is WRITER_STOP:
+                flush()
+                break
+
+            chunks, embeddings = item
+            pending_chunks.extend(chunks)
+            pending_embeddings.extend(embeddings)
+
+            if len(pending_chunks) >= self.write_batch_size:
+                flush()
+
+    def build_report(self, wall_seconds):
+        """
+        Monta o relatório de vazão por etapa.
+
+        Args:
+            wall_seconds (float): Tempo total de execução do pipeline.
+
+        Returns:
+            dict: Estatísticas de cada etapa e o tempo total.
+        """
+        stages = {}
+        for stage in ("extraction", "chunking", "embedding", "write", "lexical_index"):
+            stage_stats = self.stats.get(stage, {"items": 0, "seconds": 0.0})
+
+            # Vazão de cada etapa em relação ao tempo em que esteve ocupada
+            stages[stage] = {
+                "items": stage_stats["items"],
+                "busy_seconds": round(stage_stats["seconds"], 3),
+                "items_per_second": round(stage_stats["items"] / stage_stats["seconds"], 2) if stage_stats["seconds"] else 0.0,
+            }
+
+        # Vazão de ponta a ponta: chunks gravados por segundo de execução
+        written_chunks = stages["write"]["items"]
+
+        return {
+            "wall_seconds": round(wall_seconds, 3),
+            "chunks_per_second": round(written_chunks / wall_seconds, 2) if wall_seconds else 0.0,
+            "stages": stages,
+        }
+
+    def print_report(self, report):
+        """
+        Exibe o relatório de vazão por etapa.
+        """
+        print(f"📊 Ingestão paralela concluída em {report['wall_seconds']}s ({report['chunks_per_second']} chunks/s)")
+        for stage, stage_stats in report["stages"].items():
+            print(
+                f"   - {stage}: {stage_stats['items']} itens, "
+                f"{stage_stats['busy_seconds']}s ocupados, "
+                f"{stage_stats['items_per_second']} itens/s"
+            )
@@ -0,0 +1,363 @@
+import os
+import re
+import json
+import math
+import heapq
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+
+from dotenv import load_dotenv
+from utils.file_manipulation import create_directory
+from utils.chunk_identifier import create_chunk_id
+from utils.metrics import metrics
+
+# Carregamento das variáveis de ambiente
+load_dotenv()
+
+# Ativa o índice léxico BM25 (construído na ingestão e combinado à busca vetorial)
+BM25_ENABLED = os.getenv('BM25_ENABLED', 'true').lower() == 'true'
+
+# Caminho do índice invertido (por padrão, ao lado do banco vetorial Chroma)
+BM25_PATH = (
+    os.getenv('BM25_PATH')
+    or os.path.join(os.getenv('CHROMA_PATH') or '.', 'bm25_index.sqlite3')
+)
+
+# Parâmetros do BM25: saturação da frequência do termo (k1) e normalização pelo tamanho do chunk (b)
+BM25_K1 = float(os.getenv('BM25_K1', '1.5'))
+BM25_B = float(os.getenv('BM25_B', '0.75'))
+
+# Quantidade de IDs por operação no SQLite (limite de parâmetros por consulta)
+BM25_BATCH_SIZE = 500
+
+# Palavras muito frequentes (sem acentos) que não ajudam a ordenar os chunks e gerariam listas enormes
+STOPWORDS = frozenset("""
+a o e as os um uma uns umas de do da dos das em no na nos nas ao aos por pelo pela pelos pelas para
+pra com sem que se nao mais mas ou como ja tambem so ate entre sobre isso isto esse essa esses essas
+este esta estes estas aquele aquela aquilo ele ela eles elas eu tu voce voces nos me te lhe seu sua
+seus suas meu minha meus minhas qual quais quem onde quando muito muita sao ser foi era tem ha
+the of and to in is are for on with what how
+""".split())
+
+# Acentos e demais marcas combinantes (removidos após a normalização NFKD)
+COMBINING_MARKS = re.compile(r"[\u0300-\u036f]")
+
+# Sequências de letras e dígitos
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text):
+    """
+    Converte um texto em termos do índice: minúsculas, sem acentos e sem stopwords.
+    Nomes de campeões, itens e termos do jogo são mantidos como aparecem no texto.
+
+    Args:
+        text (str): Texto de um chunk ou de uma consulta.
+
+    Returns:
+        list: Termos na ordem em que aparecem.
+    """
+    normalized = COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", text.lower()))
+    return [term for term in TOKEN_PATTERN.findall(normalized) if term not in STOPWORDS]
+
+class BM25Index:
+    """
+    Índice léxico BM25 persistido em SQLite como índice invertido (termo -> chunks e frequências).
+    Complementa a busca vetorial em termos exatos (nomes de campeões, itens, siglas),
+    que os embeddings nem sempre recuperam.
+    """
+
+    def __init__(self, index_path=BM25_PATH, k1=BM25_K1, b=BM25_B):
+        """
+        Abre (ou cria) o índice.
+
+        Args:
+            index_path (str): Caminho do arquivo SQLite do índice.
+            k1 (float): Saturação da frequência do termo.
+            b (float): Peso da normalização pelo tamanho do chunk.
+        """
+        self.index_path = index_path
+        self.k1 = k1
+        self.b = b
+
+        create_directory(os.path.dirname(os.path.abspath(index_path)))
+
+        # A conexão é compartilhada entre threads e protegida por um lock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(index_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_id INTEGER PRIMARY KEY,
+                    chunk_id TEXT NOT NULL UNIQUE,
+                    document TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    source TEXT,
+                    length INTEGER NOT NULL
+                )
+                """
+            )
+
+            # Listas invertidas agrupadas por termo (o tamanho do chunk é repetido para evitar um JOIN por consulta)
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    frequency INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID
+                """
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS postings_doc_id ON postings (doc_id)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS documents_source ON documents (source)")
+
+            # Quantidade de chunks e soma dos tamanhos, mantidas a cada alteração (evita varrer a tabela por consulta)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS corpus (id INTEGER PRIMARY KEY CHECK (id = 0), document_count INTEGER, total_length INTEGER)"
+            )
+            self.connection.execute("INSERT OR IGNORE INTO corpus (id, document_count, total_length) VALUES (0, 0, 0)")
+
+    def update_corpus(self, document_count, total_length):
+        """
+        Soma (ou subtrai) chunks e termos às estatísticas do corpus. Deve ser chamado dentro da transação da alteração.
+        """
+        self.connection.execute(
+            "UPDATE corpus SET document_count = document_count + ?, total_length = total_length + ? WHERE id = 0",
+            (document_count, total_length),
+        )
+
+    def insert_chunks(self, chunks):
+        """
+        Indexa os chunks ainda não presentes no índice.
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+
+        Returns:
+            int: Quantidade de chunks indexados.
+        """
+        candidates = {}
+        for chunk in chunks:
+            candidates.setdefault(create_chunk_id(chunk.page_content), chunk)
+
+        candidate_ids = list(candidates)
+
+        with self.lock, self.connection:
+            existing_ids = set()
+            for start in range(0, len(candidate_ids), BM25_BATCH_SIZE):
+                batch_ids = candidate_ids[start:start + BM25_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch_ids))
+                existing_ids.update(
+                    row[0] for row in self.connection.execute(
+                        f"SELECT chunk_id FROM documents WHERE chunk_id IN ({placeholders})", batch_ids
+                    )
+                )
+
+            postings = []
+            added_count = 0
+            added_length = 0
+
+            for chunk_id, chunk in candidates.items():
+                if chunk_id in existing_ids:
+                    continue
+
+                terms = tokenize(chunk.page_content)
+                cursor = self.connection.execute(
+                    "INSERT INTO documents (chunk_id, document, metadata, source, length) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        chunk_id,
+                        chunk.page_content,
+                        json.dumps(chunk.metadata, ensure_ascii=False),
+                        chunk.metadata.get("source"),
+                        len(terms),
+                    ),
+                )
+                postings.extend(
+                    (term, cursor.lastrowid, frequency, len(terms)) for term, frequency in Counter(terms).items()
+                )
+                added_count += 1
+                added_length += len(terms)
+
+            self.connection.executemany("INSERT INTO postings (term, doc_id, frequency, length) VALUES (?, ?, ?, ?)", postings)
+            self.update_corpus(added_count, added_length)
+
+        return added_count
+
+    def delete_chunks(self, chunk_ids):
+        """
+        Remove chunks do índice a partir de seus IDs.
+
+        Args:
+            chunk_ids (list of str): IDs dos chunks a serem removidos.
+        """
+        chunk_ids = list(chunk_ids)
+
+        with self.lock, self.connection:
+            for start in range(0, len(chunk_ids), BM25_BATCH_SIZE):
+                batch_ids = chunk_ids[start:start + BM25_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch_ids))
+                rows = self.connection.execute(
+                    f"SELECT doc_id, length FROM documents WHERE chunk_id IN ({placeholders})", batch_ids
+                ).fetchall()
+
+                if not rows:
+                    continue
+
+                doc_ids = [doc_id for doc_id, _ in rows]
+                placeholders = ",".join("?" * len(doc_ids))
+                self.connection.execute(f"DELETE FROM postings WHERE doc_id IN ({placeholders})", doc_ids)
+                self.connection.execute(f"DELETE FROM documents WHERE doc_id IN ({placeholders})", doc_ids)
+                self.update_corpus(-len(rows), -sum(length for _, length in rows))
+
+    def delete_by_source(self, source):
+        """
+        Remove todos os chunks de um documento (metadado `source`).
+
+        Args:
+            source (str): Caminho do documento de origem.
+        """
+        with self.lock:
+            chunk_ids = [
+                row[0] for row in self.connection.execute("SELECT chunk_id FROM documents WHERE source = ?", (source,))
+            ]
+
+        if chunk_ids:
+            self.delete_chunks(chunk_ids)
+
+    def search(self, query_text, n_results=5):
+        """
+        Busca os chunks com maior pontuação BM25 para a consulta.
+        Os termos são avaliados dos mais raros para os mais comuns (MaxScore): quando nenhum chunk
+        ainda não pontuado consegue alcançar os n melhores, as listas dos termos comuns restantes
+        são lidas apenas para os candidatos já encontrados. O resultado é o mesmo da avaliação completa.
+
+        Args:
+            query_text (str): Texto da consulta.
+            n_results (int): Número de resultados desejados.
+
+        Returns:
+            dict: IDs, documentos, metadados e pontuações, do mais relevante para o menos relevante.
+        """
+        results = {"ids": [], "documents": [], "metadatas": [], "scores": []}
+        query_terms = Counter(tokenize(query_text))
+
+        with self.lock, metrics.timer("lexical_query_seconds"):
+            document_count, total_length = self.connection.execute(
+                "SELECT document_count, total_length FROM corpus WHERE id = 0"
+            ).fetchone()
+
+            if not document_count or not query_terms or n_results <= 0:
+                return results
+
+            average_length = total_length / document_count
+
+            # IDF e pontuação máxima possível de cada termo (frequência do termo tendendo ao infinito)
+            term_weights = []
+            for term, query_frequency in query_terms.items():
+                document_frequency = self.connection.execute(
+                    "SELECT COUNT(*) FROM postings WHERE term = ?", (term,)
+                ).fetchone()[0]
+
+                if document_frequency:
+                    # IDF do BM25 (sempre positivo): termos raros pesam mais
+                    idf = math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+                    term_weights.append((term, document_frequency, query_frequency * idf, query_frequency * idf * (self.k1 + 1)))
+
+            term_weights.sort(key=lambda item: item[3], reverse=True)
+            remaining_bound = sum(upper_bound for _, _, _, upper_bound in term_weights)
+            scores = {}
+
+            for term, document_frequency, weight, upper_bound in term_weights:
+                # Pontuação do n-ésimo melhor chunk até aqui (as pontuações só aumentam)
+                threshold = heapq.nlargest(n_results, scores.values())[-1] if len(scores) >= n_results else 0.0
+
+                if threshold and threshold >= remaining_bound:
+                    # Nenhum chunk novo alcança os n melhores: descarta candidatos sem chance e pontua apenas os restantes
+                    scores = {doc_id: score for doc_id, score in scores.items() if score + remaining_bound >= threshold}
+
+                    # Poucos candidatos: busca indexada por chunk; muitos: leitura sequencial da lista, ignorando os demais
+                    if len(scores) * 4 < document_frequency:
+                        postings = self.get_postings(term, list(scores))
+                    else:
+                        postings = [
+                            posting for posting in self.connection.execute(
+                                "SELECT doc_id, frequency, length FROM postings WHERE term = ?", (term,)
+                            )
+                            if posting[0] in scores
+                        ]
+                else:
+                    postings = self.connection.execute(
+                        "SELECT doc_id, frequency, length FROM postings WHERE term = ?", (term,)
+                    ).fetchall()
+
+                for doc_id, frequency, length in postings:
+                    normalization = self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * frequency * (self.k1 + 1) / (frequency + normalization)
+
+                remaining_bound -= upper_bound
+
+            best = heapq.nlargest(n_results, scores.items(), key=lambda item: item[1])
+            if not best:
+                return results
+
+            placeholders = ",".join("?" * len(best))
+            rows = {
+                doc_id: (chunk_id, document, metadata)
+                for doc_id, chunk_id, document, metadata in self.connection.execute(
+                    f"SELECT doc_id, chunk_id, document, metadata FROM documents WHERE doc_id IN ({placeholders})",
+                    [doc_id for doc_id, _ in best],
+                )
+            }
+
+        for doc_id, score in best:
+            chunk_id, document, metadata = rows[doc_id]
+            results["ids"].append(chunk_id)
+            results["documents"].append(document)
+            results["metadatas"].append(json.loads(metadata))
+            results["scores"].append(score)
+
+        return results
+
+    def get_postings(self, term, doc_ids):
+        """
+        Lê a lista invertida de um termo restrita a um conjunto de chunks.
+
+        Args:
+            term (str): Termo do índice.
+            doc_ids (list of int): IDs internos dos chunks candidatos.
+
+        Returns:
+            list: Tuplas (doc_id, frequência do termo, tamanho do chunk).
+        """
+        postings = []
+
+        for start in range(0, len(doc_ids), BM25_BATCH_SIZE):
+            batch_ids = doc_ids[start:start + BM25_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch_ids))
+            postings.extend(self.connection.execute(
+                f"SELECT doc_id, frequency, length FROM postings WHERE term = ? AND doc_id IN ({placeholders})",
+                [term, *batch_ids],
+            ))
+
+        return postings
+
+    def count(self):
+        """
+        Retorna a quantidade de chunks indexados.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT document_count FROM corpus WHERE id = 0").fetchone()[0]
+
+    def close(self):
+        """
+        Fecha a conexão com o índice.
+        """
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,21 @@
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Combina várias listas ordenadas de IDs com Reciprocal Rank Fusion (RRF):
+    cada ID recebe a soma de 1 / (k + posição) em todas as listas em que aparece.
+    Usa apenas as posições, dispensando a normalização de pontuações de escalas
+    diferentes (distâncias vetoriais e pontuações BM25).
+
+    Args:
+        rankings (list of list): Listas de IDs, cada uma do mais relevante para o menos relevante.
+        k (int): Constante que suaviza o peso das primeiras posições.
+
+    Returns:
+        list: Pares (ID, pontuação) do mais relevante para o menos relevante.
+    """
+    scores = {}
+
+    for ranking in rankings:
+        for position, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + position)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -1,9 +1,11 @@
 import os
+import time
 import chromadb
-import uuid
 from dotenv import load_dotenv
-from llama_models.embedding_model import LLAMAEmbeddingModel
+from knowledge_base.vector_database.vector_store import VectorStore, QueryResult, VECTOR_QUERY_INCLUDE, validate_include
 from utils.file_manipulation import create_directory
+from utils.chunk_identifier import create_chunk_id
+from utils.metrics import metrics
 
 # Carregamento das variáveis de ambiente
 load_dotenv()
@@ -11,10 +13,13 @@ load_dotenv()
 # Caminho para o diretório de persistência do banco de vetores Chroma
 CHROMA_PATH = os.getenv('CHROMA_PATH')
 
-# Inicializa o modelo de embeddings LLAMA
-llamaEmbeddingModel = LLAMAEmbeddingModel()
+# Quantidade de IDs consultados por requisição durante a deduplicação
+CHROMA_DEDUP_BATCH_SIZE = int(os.getenv('CHROMA_DEDUP_BATCH_SIZE', '500'))
 
-class VectorDatabaseChroma:
+# Chave dos metadados da coleção com o modelo e o formato dos embeddings armazenados
+EMBEDDING_SIGNATURE_KEY = "embedding_signature"
+
+class VectorDatabaseChroma(VectorStore):
     """
     Classe para gerenciar operações com o banco de vetores Chroma.
     Inclui métodos para criação, salvamento e carregamento de vetores.
@@ -31,27 +36,116 @@ class VectorDatabaseChroma:
         self.chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
         
         # Cria ou recupera uma coleção
+        self.database_name = database_name
         self.collection = self.chroma_client.get_or_create_collection(name=database_name)
+
+        # Arquivo com a versão da coleção, alterada a cada inserção ou remoção (usado para invalidar caches)
+        self.version_path = os.path.join(CHROMA_PATH, f"{database_name}.version")
+
+    def get_store_key(self):
+        """
+        Retorna o identificador da coleção (backend, diretório de persistência e nome da coleção).
+        """
+        return f"chroma:{os.path.abspath(CHROMA_PATH)}:{self.database_name}"
+
+    def get_embedding_signature(self):
+        """
+        Retorna o modelo e o formato dos embeddings armazenados (metadados da coleção).
+        """
+        return (self.collection.metadata or {}).get(EMBEDDING_SIGNATURE_KEY)
+
+    def set_embedding_signature(self, embedding_signature):
+        """
+        Registra o modelo e o formato dos embeddings nos metadados da coleção.
+        """
+        # Configurações do índice (hnsw:*) não podem ser alteradas depois da criação
+        metadata = {
+            key: value for key, value in (self.collection.metadata or {}).items() if not key.startswith("hnsw:")
+        }
+        metadata[EMBEDDING_SIGNATURE_KEY] = embedding_signature
+        self.collection.modify(metadata=metadata)
+
+    def clear(self):
+        """
+        Apaga a coleção e a recria vazia.
+        """
+        self.chroma_client.delete_collection(name=self.database_name)
+        self.collection = self.chroma_client.get_or_create_collection(name=self.database_name)
+        self.bump_collection_version()
+
+    def get_collection_version(self):
+        """
+        Retorna a versão atual da coleção (alterada sempre que chunks são inseridos ou removidos).
+        A versão é lida do disco, refletindo também ingestões feitas por outros processos.
+
+        Returns:
+            str or None: Identificador da versão, ou None se a coleção nunca foi alterada.
+        """
+        try:
+            with open(self.version_path, "r", encoding="utf-8") as version_file:
+                return version_file.read()
+        except FileNotFoundError:
+            return None
+
+    def bump_collection_version(self):
+        """
+        Registra uma nova versão da coleção após uma alteração.
+        """
+        with open(self.version_path, "w", encoding="utf-8") as version_file:
+            version_file.write(str(time.time_ns()))
                      
-    def query_chromadb(self, query_text, n_results=5):
+    def query_chromadb(self, query_text, n_results=5, include=VECTOR_QUERY_INCLUDE):
         """
-        Realiza uma consulta no banco vetorial Chroma usando texto de entrada.
+        Realiza uma consulta no banco vetorial Chroma a partir do embedding da consulta.
 
         Args:
-            query_text (str): Texto da consulta.
+            query_text (list): Embedding da consulta.
             n_results (int): Número de resultados desejados.
+            include (iterable of str): Campos retornados além dos IDs (os embeddings armazenados só quando pedidos).
 
         Returns:
-            dict: Resultados contendo documentos e metadados correspondentes.
+            QueryResult: Resultados contendo os IDs e os campos pedidos.
         """
-        # Gera embeddings para a consulta e encontra os chunks mais similares
-        results = self.collection.query(
-            query_embeddings=[query_text],                      # Chroma gerará embeddings para isso
-            n_results=n_results,
-            include=["documents", "metadatas", "embeddings"]    # Inclui documentos e metadados nos resultados
-        )
-        return results
-    
+        return self.query_batch([query_text], n_results, include)
+
+    def query_batch(self, query_embeddings, n_results=5, include=VECTOR_QUERY_INCLUDE):
+        """
+        Consulta vários embeddings em uma única requisição ao Chroma.
+        Apenas os campos pedidos são lidos e desserializados pelo Chroma.
+
+        Args:
+            query_embeddings (list): Embeddings das consultas.
+            n_results (int): Número de resultados desejados por consulta.
+            include (iterable of str): Campos retornados além dos IDs (ver QUERY_FIELDS).
+
+        Returns:
+            QueryResult: IDs e campos pedidos (uma lista por consulta).
+        """
+        include = validate_include(include)
+
+        with metrics.timer("vector_query_seconds", {"backend": "chroma"}):
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                include=list(include)
+            )
+
+        return QueryResult(results["ids"], {field: (lambda field=field: results[field]) for field in include})
+
+    def query_chromadb_batch(self, query_embeddings, n_results=5, include=VECTOR_QUERY_INCLUDE):
+        """
+        Realiza várias consultas no banco vetorial Chroma em uma única requisição.
+
+        Args:
+            query_embeddings (list): Embeddings das consultas.
+            n_results (int): Número de resultados desejados por consulta.
+            include (iterable of str): Campos retornados além dos IDs (ver QUERY_FIELDS).
+
+        Returns:
+            QueryResult: IDs e campos pedidos (uma lista por consulta, na ordem dos embeddings).
+        """
+        return self.query_batch(query_embeddings, n_results, include)
+
     def insert_into_chromadb(self, chunks):
         """
         Insere apenas chunks únicos no banco de dados vetorial Chroma.
@@ -59,41 +153,97 @@ class VectorDatabaseChroma:
         Args:
             chunks (list): Lista de chunks de texto com metadados.
         """
-        # Recupera IDs existentes no banco de dados
-        existing_ids = set(self.collection.get().get("ids", []))
-
-        # Filtra chunks que ainda não estão no banco de dados
-        new_chunks = [
-            chunk for chunk in chunks 
-            if str(uuid.uuid5(uuid.NAMESPACE_DNS, chunk.page_content)) not in existing_ids
-        ]
-        if new_chunks:
-            print(f"👉 Adicionando novos documentos: {len(new_chunks)}")
-            self.add_chunks_to_collection(new_chunks)
-            return print("✅ Documentos adicionados com sucesso.")
-        
-        return print("✅ Nenhum novo documento para adicionar.")
+        return self.insert_chunks(chunks)
+
+    def filter_new_chunks(self, chunks, batch_size=CHROMA_DEDUP_BATCH_SIZE):
+        """
+        Retorna apenas os chunks cujo ID ainda não existe na coleção.
+        Consulta somente os IDs candidatos, em lotes, sem carregar a coleção inteira.
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+            batch_size (int): Quantidade de IDs consultados por requisição.
+
+        Returns:
+            list: Chunks ainda não armazenados (sem repetição dentro do próprio lote).
+        """
+        # Agrupa os chunks por ID, descartando repetições dentro da entrada
+        candidates = {}
+        for chunk in chunks:
+            candidates.setdefault(create_chunk_id(chunk.page_content), chunk)
+
+        candidate_ids = list(candidates)
+        existing_ids = set()
+
+        # Consulta apenas os IDs candidatos (sem documentos, metadados ou embeddings)
+        for start in range(0, len(candidate_ids), batch_size):
+            batch_ids = candidate_ids[start:start + batch_size]
+            existing = self.collection.get(ids=batch_ids, include=[])
+            existing_ids.update(existing.get("ids", []))
+
+        return [chunk for chunk_id, chunk in candidates.items() if chunk_id not in existing_ids]
     
-    def add_chunks_to_collection(self, chunks):
+    def delete_chunks(self, chunk_ids, batch_size=CHROMA_DEDUP_BATCH_SIZE):
+        """
+        Remove chunks da coleção a partir de seus IDs.
+
+        Args:
+            chunk_ids (list of str): IDs dos chunks a serem removidos.
+            batch_size (int): Quantidade de IDs removidos por requisição.
+        """
+        for start in range(0, len(chunk_ids), batch_size):
+            self.collection.delete(ids=chunk_ids[start:start + batch_size])
+
+        self.bump_collection_version()
+
+    def delete_by_source(self, source):
+        """
+        Remove todos os chunks de um documento (metadado `source`).
+
+        Args:
+            source (str): Caminho do documento de origem.
+        """
+        self.collection.delete(where={"source": source})
+        self.bump_collection_version()
+
+    def count(self):
+        """
+        Retorna a quantidade de chunks armazenados na coleção.
+        """
+        return self.collection.count()
+
+    def add_chunks_to_collection(self, chunks, chunk_embeddings=None):
         """
         Adiciona chunks de texto e metadados à coleção.
 
         Args:
             chunks (list): Lista de chunks de texto com metadados.
+            chunk_embeddings (list): Embeddings já calculados para os chunks (opcional).
         """
         # Extrai conteúdos e metadados dos chunks
         chunk_content = [chunk.page_content for chunk in chunks]
         chunk_metadata = [chunk.metadata for chunk in chunks]
-        chunk_embeddings = [llamaEmbeddingModel.generate_embedding(chunk.page_content) for chunk in chunks]
+
+        # Gera os embeddings quando não foram fornecidos
+        if chunk_embeddings is None:
+            chunk_embeddings = self.embed_chunks(chunks)
         
         # Adiciona os documentos e metadados ao banco vetorial
         self.collection.add(
             documents=chunk_content,
             metadatas=chunk_metadata,
             embeddings=chunk_embeddings,
-            ids=[str(uuid.uuid5(uuid.NAMESPACE_DNS, chunk.page_content)) for chunk in chunks]
+            ids=[create_chunk_id(chunk.page_content) for chunk in chunks]
         )
 
+        self.bump_collection_version()
+
+    def insert_batch(self, chunks, chunk_embeddings=None):
+        """
+        Adiciona um lote de chunks ainda não armazenados (interface VectorStore).
+        """
+        self.add_chunks_to_collection(chunks, chunk_embeddings)
+
 if __name__ == '__main__':
     # Inicializa a classe VectorDatabaseChroma
     vector_database = VectorDatabaseChroma()
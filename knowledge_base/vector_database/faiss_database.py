@@ -1,99 +1,700 @@
 import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+
+import faiss
+import numpy as np
 from dotenv import load_dotenv
-from langchain_community.vectorstores import FAISS
-from llama_models.embedding_model import LLAMAEmbeddingModel
+from utils.file_manipulation import create_directory
+from utils.chunk_identifier import create_chunk_id
+from utils.metrics import metrics
+from knowledge_base.vector_database.vector_store import VectorStore, QueryResult, VECTOR_QUERY_INCLUDE, validate_include
 
 # Carregamento das variáveis de ambiente
 load_dotenv()
 
-# Caminho para o diretório de persistência do banco de vetores Chroma
+# Caminho para o diretório de persistência do índice FAISS
 FAISS_PATH = os.getenv('FAISS_PATH')
 
-# Inicializa o modelo de embeddings LLAMA
-llamaEmbeddingModel = LLAMAEmbeddingModel()
-embedding_model = llamaEmbeddingModel.get_embedding_model()
+# Tipo de índice: "flat" (busca exata), "ivf" (listas invertidas) ou "hnsw" (grafo)
+FAISS_INDEX_TYPE = os.getenv('FAISS_INDEX_TYPE', 'flat').lower()
+
+# Quantidade de listas invertidas do índice IVF e listas visitadas por consulta
+FAISS_NLIST = int(os.getenv('FAISS_NLIST', '100'))
+FAISS_NPROBE = int(os.getenv('FAISS_NPROBE', '8'))
+
+# Vetores por lista invertida necessários para treinar o IVF (abaixo disso o k-means do FAISS é pouco confiável)
+FAISS_IVF_MIN_POINTS_PER_LIST = 39
+
+# Máximo de vetores por lista invertida usados no treinamento (amostra dos vetores armazenados)
+FAISS_IVF_MAX_POINTS_PER_LIST = 256
+
+# Vizinhos por nó do grafo HNSW e tamanho da lista de candidatos na construção e na consulta
+FAISS_HNSW_M = int(os.getenv('FAISS_HNSW_M', '32'))
+FAISS_HNSW_EF_CONSTRUCTION = int(os.getenv('FAISS_HNSW_EF_CONSTRUCTION', '200'))
+FAISS_HNSW_EF_SEARCH = int(os.getenv('FAISS_HNSW_EF_SEARCH', '64'))
+
+# Carrega o índice em modo somente leitura, mapeado em memória (compartilhado entre processos)
+FAISS_MMAP = os.getenv('FAISS_MMAP', 'false').lower() == 'true'
+
+# IO_FLAG_MMAP_IFC (faiss 1.15) mapeia os vetores de qualquer tipo de índice; sem ele, o IO_FLAG_MMAP
+# mapeia apenas as listas invertidas do IVF, e os índices flat e HNSW são copiados para a memória de cada processo
+FAISS_MMAP_IFC = hasattr(faiss, "IO_FLAG_MMAP_IFC")
+FAISS_MMAP_FLAGS = (faiss.IO_FLAG_MMAP_IFC if FAISS_MMAP_IFC else faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+# Candidatos buscados por consulta no HNSW com IDs removidos: no máximo n_results vezes este fator
+FAISS_TOMBSTONE_OVERFETCH = int(os.getenv('FAISS_TOMBSTONE_OVERFETCH', '4'))
+
+# Fração de IDs removidos (em relação ao total do grafo HNSW) a partir da qual o grafo é reconstruído sem eles
+FAISS_TOMBSTONE_COMPACT_RATIO = float(os.getenv('FAISS_TOMBSTONE_COMPACT_RATIO', '0.1'))
+
+# Quantidade de IDs consultados por requisição durante a deduplicação
+FAISS_DEDUP_BATCH_SIZE = int(os.getenv('FAISS_DEDUP_BATCH_SIZE', '500'))
+
+def chunk_id_to_faiss_id(chunk_id):
+    """
+    Converte o identificador uuid5 de um chunk no ID inteiro (int64 positivo) usado pelo FAISS.
+
+    Args:
+        chunk_id (str): Identificador do chunk.
 
-class VectorDatabaseFAISS:
+    Returns:
+        int: ID do vetor no índice.
     """
-    Classe para gerenciar o banco de dados vetorial FAISS, 
-    com métodos para criar, salvar e carregar vetores.
+    return uuid.UUID(chunk_id).int & ((1 << 63) - 1)
+
+class VectorDatabaseFAISS(VectorStore):
+    """
+    Classe para gerenciar o banco de dados vetorial FAISS (índice nativo),
+    com a mesma interface de inserção e consulta do VectorDatabaseChroma.
+    Os vetores ficam no índice FAISS e os documentos e metadados em um SQLite ao lado dele.
     """
-    
-    def __init__(self):
+
+    def __init__(self, database_name="my_database", index_type=FAISS_INDEX_TYPE, read_only=FAISS_MMAP, autosave=True):
+        """
+        Inicializa a instância do VectorDatabaseFAISS, carregando o índice persistido se existir.
+
+        Args:
+            database_name (str): Nome do índice (prefixo dos arquivos em FAISS_PATH).
+            index_type (str): Tipo do índice criado: "flat", "ivf" ou "hnsw".
+            read_only (bool): Carrega o índice mapeado em memória, sem permitir inserções
+                (todos os tipos com IO_FLAG_MMAP_IFC; apenas o IVF nas versões do faiss sem ele).
+            autosave (bool): Grava o índice após cada alteração (False: chame `save_index` ao final da carga).
+        """
+        if index_type not in ("flat", "ivf", "hnsw"):
+            raise ValueError(f"Tipo de índice FAISS inválido: {index_type}")
+
+        self.index_type = index_type
+        self.read_only = read_only
+        self.autosave = autosave
+
+        # Cria o diretório de persistência se não existir
+        create_directory(FAISS_PATH)
+
+        self.index_path = os.path.join(FAISS_PATH, f"{database_name}.faiss")
+        self.docstore_path = os.path.join(FAISS_PATH, f"{database_name}.sqlite3")
+        self.version_path = os.path.join(FAISS_PATH, f"{database_name}.version")
+
+        # O índice e a conexão são compartilhados entre threads e protegidos por um lock
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.docstore_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    faiss_id INTEGER PRIMARY KEY,
+                    chunk_id TEXT NOT NULL,
+                    document TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                )
+                """
+            )
+
+            # IDs removidos que continuam no grafo HNSW (que não suporta remoção)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS tombstones (faiss_id INTEGER PRIMARY KEY)")
+
+            # Configurações do índice (ex.: modelo e formato dos embeddings armazenados)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        # Carrega o índice persistido (criado sob demanda na primeira inserção)
+        self.index = None
+        self.loaded_version = None
+        self.load_index()
+
+    def load_index(self):
+        """
+        Carrega o índice do disco. No modo somente leitura, o arquivo é mapeado em memória,
+        de modo que vários processos de consulta compartilham as mesmas páginas. Sem
+        IO_FLAG_MMAP_IFC, apenas as listas invertidas do IVF são mapeadas.
+        """
+        with self.lock:
+            self.loaded_version = self.get_collection_version()
+
+            if not os.path.exists(self.index_path):
+                self.index = None
+                return
+
+            io_flags = FAISS_MMAP_FLAGS if self.read_only else 0
+            self.index = faiss.read_index(self.index_path, io_flags)
+            self.configure_search_parameters()
+
+            if self.read_only and not FAISS_MMAP_IFC and not isinstance(self.get_base_index(), faiss.IndexIVF):
+                print(f"⚠️ faiss sem IO_FLAG_MMAP_IFC: o índice {self.index_path} foi copiado para a memória deste processo.")
+
+            # IVF gravado dentro de um IndexIDMap2 (versões anteriores): IDs incorretos após remoções
+            if isinstance(self.index, faiss.IndexIDMap) and isinstance(self.get_base_index(), faiss.IndexIVF):
+                print(f"⚠️ Índice IVF em formato antigo ({self.index_path}): apague o índice e refaça a ingestão.")
+
+    def reload_if_changed(self):
+        """
+        No modo somente leitura, recarrega o índice quando outro processo o alterou.
+        """
+        if self.read_only and self.get_collection_version() != self.loaded_version:
+            self.load_index()
+
+    def create_index(self, dimension):
+        """
+        Cria o índice do tipo configurado. O flat e o HNSW são envolvidos em um IndexIDMap2
+        (IDs derivados do uuid5 do chunk). O IVF precisa de ao menos FAISS_IVF_MIN_POINTS_PER_LIST
+        vetores por lista para ser treinado: até lá os vetores ficam em um índice exato (flat),
+        substituído pelo IVF em `build_ivf_index` quando há vetores suficientes.
+
+        Args:
+            dimension (int): Dimensão dos embeddings.
+
+        Returns:
+            faiss.Index: Índice vazio.
+        """
+        if self.index_type == "hnsw":
+            base_index = faiss.IndexHNSWFlat(dimension, FAISS_HNSW_M)
+            base_index.hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
+        else:
+            base_index = faiss.IndexFlatL2(dimension)
+
+        index = faiss.IndexIDMap2(base_index)
+        self.index = index
+        self.configure_search_parameters()
+        return index
+
+    def build_ivf_index(self):
+        """
+        Substitui o índice exato provisório pelo IVF quando há vetores suficientes para treiná-lo.
+        O IVF recebe os IDs diretamente (sem IndexIDMap2, cujos rótulos sequenciais deixam de
+        corresponder às listas invertidas após uma remoção) e um mapa direto em tabela hash,
+        que permite remover vetores e reconstruí-los a partir do ID.
+        """
+        if self.index_type != "ivf" or not isinstance(self.get_base_index(), faiss.IndexFlat):
+            return
+
+        if self.index.ntotal < FAISS_IVF_MIN_POINTS_PER_LIST * FAISS_NLIST:
+            return
+
+        flat_index = faiss.downcast_index(self.index.index)
+        vectors = flat_index.reconstruct_n(0, flat_index.ntotal)
+        faiss_ids = faiss.vector_to_array(self.index.id_map)
+
+        # Treina com uma amostra dos vetores armazenados
+        training_size = min(len(vectors), FAISS_IVF_MAX_POINTS_PER_LIST * FAISS_NLIST)
+        training_rows = np.random.default_rng(0).choice(len(vectors), size=training_size, replace=False)
+
+        quantizer = faiss.IndexFlatL2(flat_index.d)
+        ivf_index = faiss.IndexIVFFlat(quantizer, flat_index.d, FAISS_NLIST)
+        ivf_index.train(vectors[training_rows])
+        ivf_index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        ivf_index.add_with_ids(vectors, faiss_ids)
+
+        print(f"[system] Índice IVF treinado com {training_size} vetores (nlist={FAISS_NLIST}).")
+        self.index = ivf_index
+        self.configure_search_parameters()
+
+    def get_base_index(self):
+        """
+        Retorna o índice que faz a busca (dentro do IndexIDMap2, quando há um).
+        """
+        if isinstance(self.index, faiss.IndexIDMap):
+            return faiss.downcast_index(self.index.index)
+        return faiss.downcast_index(self.index)
+
+    def configure_search_parameters(self):
+        """
+        Aplica os parâmetros de consulta (nprobe do IVF, efSearch do HNSW) ao índice carregado.
+        """
+        base_index = self.get_base_index()
+
+        if isinstance(base_index, faiss.IndexIVF):
+            base_index.nprobe = FAISS_NPROBE
+        elif isinstance(base_index, faiss.IndexHNSW):
+            base_index.hnsw.efSearch = FAISS_HNSW_EF_SEARCH
+
+    def save_index(self):
+        """
+        Salva o índice no disco (escrita atômica) e registra uma nova versão.
+        """
+        self.compact_hnsw_index()
+
+        temporary_path = f"{self.index_path}.tmp"
+        faiss.write_index(self.index, temporary_path)
+        os.replace(temporary_path, self.index_path)
+
+        self.bump_collection_version()
+        self.loaded_version = self.get_collection_version()
+
+    def compact_hnsw_index(self):
+        """
+        Reconstrói o grafo HNSW sem os IDs removidos quando eles passam de FAISS_TOMBSTONE_COMPACT_RATIO
+        do total, e limpa as marcações. Sem isso, cada consulta buscaria cada vez mais candidatos descartados.
+        """
+        if self.index is None or not isinstance(self.get_base_index(), faiss.IndexHNSW):
+            return
+
+        with self.lock, self.connection:
+            tombstone_ids = {row[0] for row in self.connection.execute("SELECT faiss_id FROM tombstones")}
+            if len(tombstone_ids) <= FAISS_TOMBSTONE_COMPACT_RATIO * self.index.ntotal:
+                return
+
+            hnsw_index = self.get_base_index()
+            vectors = hnsw_index.reconstruct_n(0, hnsw_index.ntotal)
+            faiss_ids = faiss.vector_to_array(self.index.id_map)
+
+            # Posição mais recente de cada ID mantido (um chunk reinserido aparece de novo no grafo)
+            positions = {}
+            for position, faiss_id in enumerate(faiss_ids.tolist()):
+                if faiss_id not in tombstone_ids:
+                    positions[faiss_id] = position
+
+            kept_ids = np.fromiter(positions.keys(), dtype=np.int64, count=len(positions))
+            kept_positions = np.fromiter(positions.values(), dtype=np.int64, count=len(positions))
+
+            compact_index = faiss.IndexHNSWFlat(hnsw_index.d, FAISS_HNSW_M)
+            compact_index.hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
+            self.index = faiss.IndexIDMap2(compact_index)
+            self.index.add_with_ids(vectors[kept_positions], kept_ids)
+            self.configure_search_parameters()
+
+            self.connection.execute("DELETE FROM tombstones")
+            print(f"[system] Grafo HNSW reconstruído sem {len(tombstone_ids)} IDs removidos ({len(kept_ids)} vetores).")
+
+    def get_store_key(self):
+        """
+        Retorna o identificador do índice (backend e caminho do arquivo do índice).
+        """
+        return f"faiss:{os.path.abspath(self.index_path)}"
+
+    def get_embedding_signature(self):
+        """
+        Retorna o modelo e o formato dos embeddings armazenados (tabela `settings`).
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM settings WHERE key = 'embedding_signature'").fetchone()
+        return row[0] if row else None
+
+    def set_embedding_signature(self, embedding_signature):
+        """
+        Registra o modelo e o formato dos embeddings armazenados.
+        """
+        self.check_writable()
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES ('embedding_signature', ?)", (embedding_signature,)
+            )
+
+    def clear(self):
+        """
+        Remove o índice e todos os chunks armazenados.
+        """
+        self.check_writable()
+
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM chunks")
+            self.connection.execute("DELETE FROM tombstones")
+
+            self.index = None
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+
+            self.bump_collection_version()
+            self.loaded_version = self.get_collection_version()
+
+    def get_collection_version(self):
+        """
+        Retorna a versão atual do índice (alterada sempre que chunks são inseridos ou removidos).
+
+        Returns:
+            str or None: Identificador da versão, ou None se o índice nunca foi alterado.
+        """
+        try:
+            with open(self.version_path, "r", encoding="utf-8") as version_file:
+                return version_file.read()
+        except FileNotFoundError:
+            return None
+
+    def bump_collection_version(self):
+        """
+        Registra uma nova versão do índice após uma alteração.
+        """
+        with open(self.version_path, "w", encoding="utf-8") as version_file:
+            version_file.write(str(time.time_ns()))
+
+    def check_writable(self):
+        """
+        Impede alterações em um índice carregado em modo somente leitura.
+        """
+        if self.read_only:
+            raise RuntimeError("O índice FAISS foi carregado em modo somente leitura (FAISS_MMAP).")
+
+    def query_faiss(self, query_embedding, n_results=5, include=VECTOR_QUERY_INCLUDE):
         """
-        Inicializa a instância do VectorDatabaseFAISS.
+        Realiza uma consulta no índice FAISS a partir do embedding da consulta.
+
+        Args:
+            query_embedding (list): Embedding da consulta.
+            n_results (int): Número de resultados desejados.
+            include (iterable of str): Campos retornados além dos IDs (ver QUERY_FIELDS).
+
+        Returns:
+            QueryResult: Resultados no mesmo formato do Chroma (ids e campos pedidos).
         """
-        pass
-    
-    def get_vectorstore(self, text_chunks):
+        return self.query_batch([query_embedding], n_results, include)
+
+    def query_batch(self, query_embeddings, n_results=5, include=VECTOR_QUERY_INCLUDE):
         """
-        Cria e retorna um banco de dados vetorial FAISS a partir de fragmentos de texto.
-        
+        Consulta vários embeddings em uma única busca no índice. Do SQLite são lidas apenas
+        as colunas dos campos pedidos; os embeddings são reconstruídos do índice só quando pedidos.
+
         Args:
-            text_chunks (list of str): Lista de textos para criar os vetores.
-        
+            query_embeddings (list): Embeddings das consultas.
+            n_results (int): Número de resultados desejados por consulta.
+            include (iterable of str): Campos retornados além dos IDs (ver QUERY_FIELDS).
+
+        Returns:
+            QueryResult: IDs e campos pedidos (uma lista por consulta).
+        """
+        include = validate_include(include)
+        columns = [column for column in ("document", "metadata") if f"{column}s" in include]
+
+        hits = [[] for _ in query_embeddings]  # (ID do índice, distância) de cada resultado
+        rows = {}
+        embeddings = {}
+
+        with self.lock, metrics.timer("vector_query_seconds", {"backend": "faiss"}):
+            self.reload_if_changed()
+
+            # Recusa os embeddings antes da busca quando o índice não consegue reconstruí-los
+            if "embeddings" in include and not self.can_reconstruct_embeddings():
+                raise ValueError("O índice IVF não guarda o mapa direto dos vetores: embeddings indisponíveis na consulta.")
+
+            if self.index is not None and self.index.ntotal > 0 and query_embeddings:
+                # Busca candidatos extras para compensar os IDs removidos que ainda estão no grafo HNSW
+                # (limitados: o grafo é compactado em `save_index` quando as remoções se acumulam)
+                tombstone_count = self.connection.execute("SELECT COUNT(*) FROM tombstones").fetchone()[0]
+                k = min(n_results + tombstone_count, n_results * FAISS_TOMBSTONE_OVERFETCH, self.index.ntotal)
+
+                query_vectors = np.asarray(query_embeddings, dtype=np.float32)
+                distances, faiss_ids = self.index.search(query_vectors, k)
+
+                found_ids = list({int(faiss_id) for faiss_id in faiss_ids.ravel() if faiss_id != -1})
+                rows = self.get_rows(found_ids, columns)
+
+                # Monta o resultado na ordem de similaridade, ignorando IDs removidos ou repetidos
+                for query_hits, query_ids, query_distances in zip(hits, faiss_ids, distances):
+                    seen_ids = set()
+                    for faiss_id, distance in zip(query_ids, query_distances):
+                        faiss_id = int(faiss_id)
+                        if faiss_id not in rows or faiss_id in seen_ids:
+                            continue
+
+                        seen_ids.add(faiss_id)
+                        query_hits.append((faiss_id, distance))
+
+                        if len(seen_ids) == n_results:
+                            break
+
+                if "embeddings" in include:
+                    embeddings = self.reconstruct_embeddings({faiss_id for query_hits in hits for faiss_id, _ in query_hits})
+
+        # Cada coluna lida do SQLite fica na posição seguinte ao chunk_id
+        column_positions = {f"{column}s": position for position, column in enumerate(columns, start=1)}
+
+        def load_documents():
+            position = column_positions["documents"]
+            return [[rows[faiss_id][position] for faiss_id, _ in query_hits] for query_hits in hits]
+
+        def load_metadatas():
+            position = column_positions["metadatas"]
+            return [[json.loads(rows[faiss_id][position]) for faiss_id, _ in query_hits] for query_hits in hits]
+
+        def load_distances():
+            return [[float(distance) for _, distance in query_hits] for query_hits in hits]
+
+        def load_embeddings():
+            return [[embeddings[faiss_id] for faiss_id, _ in query_hits] for query_hits in hits]
+
+        loaders = {
+            "documents": load_documents,
+            "metadatas": load_metadatas,
+            "distances": load_distances,
+            "embeddings": load_embeddings,
+        }
+
+        ids = [[rows[faiss_id][0] for faiss_id, _ in query_hits] for query_hits in hits]
+        return QueryResult(ids, {field: loaders[field] for field in include})
+
+    def can_reconstruct_embeddings(self):
+        """
+        Indica se os vetores armazenados podem ser reconstruídos a partir do ID. O IVF só os
+        reconstrói com mapa direto, que falta no formato antigo (IVF dentro de um IndexIDMap2).
+
         Returns:
-            vectorstore (FAISS): O banco de dados vetorial FAISS gerado.
-        """        
-        # Cria o banco de dados vetorial FAISS a partir dos textos
-        self.faiss_db = FAISS.from_texts(texts=text_chunks, embedding=embedding_model)
-        
-        return self.faiss_db
-    
-    def save_vectorstore(self):
-        """
-        Salva o banco de dados vetorial FAISS em um diretório local.
-        
+            bool: True quando `reconstruct_embeddings` está disponível.
+        """
+        if self.index is None:
+            return True
+
+        if isinstance(self.index, faiss.IndexIDMap):
+            return not isinstance(self.get_base_index(), faiss.IndexIVF)
+
+        base_index = self.get_base_index()
+        if isinstance(base_index, faiss.IndexIVF):
+            return base_index.direct_map.type != faiss.DirectMap.NoMap
+
+        return True
+
+    def reconstruct_embeddings(self, faiss_ids):
+        """
+        Reconstrói do índice os vetores armazenados de um conjunto de IDs
+        (ver `can_reconstruct_embeddings`).
+
         Args:
-            vectorstore (FAISS): O banco de dados vetorial a ser salvo.
-            output_path (str): O caminho onde o banco de dados vetorial será salvo.
-        
-        Raises:
-            Exception: Se ocorrer algum erro ao salvar o banco de dados.
-        """
-        try:            
-            # Salva o banco de dados vetorial localmente
-            self.faiss_db.save_local(FAISS_PATH)
-        
-        except Exception as e:
-            # Caso ocorra algum erro, imprime e relança a exceção
-            print(f'Error saving vectorstore: {e}')
-            raise e
-    
-    def retrieve_vectorstore(self):
-        """
-        Carrega um banco de dados vetorial FAISS a partir de um diretório local.
-        
+            faiss_ids (set of int): IDs do índice.
+
+        Returns:
+            dict: Mapeamento ID -> embedding (lista de floats).
+        """
+        faiss_ids = list(faiss_ids)
+        if not faiss_ids:
+            return {}
+
+        vectors = self.index.reconstruct_batch(np.asarray(faiss_ids, dtype=np.int64))
+        return dict(zip(faiss_ids, vectors.tolist()))
+
+    def get_rows(self, faiss_ids, columns=("document", "metadata")):
+        """
+        Busca no SQLite o chunk_id e as colunas pedidas de um conjunto de IDs do índice.
+
         Args:
-            input_path (str): O caminho onde o banco de dados vetorial está localizado.
-        
+            faiss_ids (list of int): IDs do índice.
+            columns (iterable of str): Colunas lidas além do chunk_id ("document", "metadata").
+
         Returns:
-            vectorstore (FAISS): O banco de dados vetorial carregado.
-        
-        Raises:
-            Exception: Se ocorrer algum erro ao carregar o banco de dados.
+            dict: Mapeamento ID -> (chunk_id, colunas pedidas na ordem recebida).
         """
-        try:
-            # Carrega o banco de dados vetorial a partir do diretório
-            self.faiss_db = FAISS.load_local(FAISS_PATH)
-            return self.faiss_db
-        
-        except Exception as e:
-            # Caso ocorra algum erro, imprime e relança a exceção
-            print(f'Error loading vectorstore: {e}')
-            raise e
-
-# Exemplo de uso com o FAISS e o Chroma
+        rows = {}
+        selected_columns = ", ".join(["faiss_id", "chunk_id", *columns])
+
+        for start in range(0, len(faiss_ids), FAISS_DEDUP_BATCH_SIZE):
+            batch_ids = faiss_ids[start:start + FAISS_DEDUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch_ids))
+            for faiss_id, *row in self.connection.execute(
+                f"SELECT {selected_columns} FROM chunks WHERE faiss_id IN ({placeholders})",
+                batch_ids,
+            ):
+                rows[faiss_id] = tuple(row)
+
+        return rows
+
+    def insert_into_faiss(self, chunks):
+        """
+        Insere apenas chunks únicos no índice FAISS.
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+        """
+        return self.insert_chunks(chunks)
+
+    def filter_new_chunks(self, chunks, batch_size=FAISS_DEDUP_BATCH_SIZE):
+        """
+        Retorna apenas os chunks cujo ID ainda não existe no índice.
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+            batch_size (int): Quantidade de IDs consultados por requisição.
+
+        Returns:
+            list: Chunks ainda não armazenados (sem repetição dentro do próprio lote).
+        """
+        # Agrupa os chunks por ID, descartando repetições dentro da entrada
+        candidates = {}
+        for chunk in chunks:
+            candidates.setdefault(chunk_id_to_faiss_id(create_chunk_id(chunk.page_content)), chunk)
+
+        candidate_ids = list(candidates)
+        existing_ids = set()
+
+        # Consulta apenas os IDs candidatos no SQLite
+        with self.lock:
+            for start in range(0, len(candidate_ids), batch_size):
+                batch_ids = candidate_ids[start:start + batch_size]
+                placeholders = ",".join("?" * len(batch_ids))
+                existing_ids.update(
+                    row[0] for row in self.connection.execute(
+                        f"SELECT faiss_id FROM chunks WHERE faiss_id IN ({placeholders})", batch_ids
+                    )
+                )
+
+        return [chunk for faiss_id, chunk in candidates.items() if faiss_id not in existing_ids]
+
+    def delete_chunks(self, chunk_ids, batch_size=FAISS_DEDUP_BATCH_SIZE):
+        """
+        Remove chunks do índice a partir de seus IDs.
+
+        Args:
+            chunk_ids (list of str): IDs dos chunks a serem removidos.
+            batch_size (int): Quantidade de IDs removidos por operação.
+        """
+        self.check_writable()
+        faiss_ids = [chunk_id_to_faiss_id(chunk_id) for chunk_id in chunk_ids]
+
+        with self.lock, self.connection:
+            for start in range(0, len(faiss_ids), batch_size):
+                batch_ids = faiss_ids[start:start + batch_size]
+                placeholders = ",".join("?" * len(batch_ids))
+                self.connection.execute(f"DELETE FROM chunks WHERE faiss_id IN ({placeholders})", batch_ids)
+
+                if self.index is None:
+                    continue
+
+                if self.index_type == "hnsw":
+                    # O HNSW não remove vetores: os IDs viram marcações ignoradas nas consultas
+                    self.connection.executemany(
+                        "INSERT OR IGNORE INTO tombstones (faiss_id) VALUES (?)", [(faiss_id,) for faiss_id in batch_ids]
+                    )
+                elif isinstance(self.index, faiss.IndexIVF):
+                    # O mapa direto em tabela hash só remove a partir de uma lista explícita de IDs
+                    remove_ids = np.asarray(batch_ids, dtype=np.int64)
+                    self.index.remove_ids(faiss.IDSelectorArray(len(remove_ids), faiss.swig_ptr(remove_ids)))
+                else:
+                    self.index.remove_ids(np.asarray(batch_ids, dtype=np.int64))
+
+            if self.index is not None and self.autosave:
+                self.save_index()
+
+    def delete_by_source(self, source):
+        """
+        Remove todos os chunks de um documento (metadado `source`).
+
+        Args:
+            source (str): Caminho do documento de origem.
+        """
+        with self.lock:
+            chunk_ids = [
+                row[0] for row in self.connection.execute(
+                    "SELECT chunk_id FROM chunks WHERE json_extract(metadata, '$.source') = ?", (source,)
+                )
+            ]
+
+        if chunk_ids:
+            self.delete_chunks(chunk_ids)
+
+    def add_chunks_to_index(self, chunks, chunk_embeddings=None):
+        """
+        Adiciona chunks de texto e metadados ao índice (inserção incremental).
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+            chunk_embeddings (list): Embeddings já calculados para os chunks (opcional).
+        """
+        self.check_writable()
+
+        # Gera os embeddings quando não foram fornecidos
+        if chunk_embeddings is None:
+            chunk_embeddings = self.embed_chunks(chunks)
+
+        with self.lock, self.connection:
+            # Ignora chunks já armazenados (o índice aceitaria vetores repetidos com o mesmo ID)
+            new_chunks = self.filter_new_chunks(chunks)
+            if not new_chunks:
+                return
+
+            if len(new_chunks) < len(chunks):
+                embeddings_by_content = {chunk.page_content: embedding for chunk, embedding in zip(chunks, chunk_embeddings)}
+                chunk_embeddings = [embeddings_by_content[chunk.page_content] for chunk in new_chunks]
+                chunks = new_chunks
+
+            chunk_ids = [create_chunk_id(chunk.page_content) for chunk in chunks]
+            faiss_ids = [chunk_id_to_faiss_id(chunk_id) for chunk_id in chunk_ids]
+            vectors = np.asarray(chunk_embeddings, dtype=np.float32)
+
+            # Cria o índice na primeira inserção, quando a dimensão dos embeddings é conhecida
+            if self.index is None:
+                self.create_index(vectors.shape[1])
+
+            self.index.add_with_ids(vectors, np.asarray(faiss_ids, dtype=np.int64))
+
+            # Troca o índice exato provisório pelo IVF assim que há vetores suficientes para treiná-lo
+            self.build_ivf_index()
+
+            # Armazena os documentos e metadados no SQLite
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO chunks (faiss_id, chunk_id, document, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (faiss_id, chunk_id, chunk.page_content, json.dumps(chunk.metadata, ensure_ascii=False))
+                    for faiss_id, chunk_id, chunk in zip(faiss_ids, chunk_ids, chunks)
+                ],
+            )
+            self.connection.executemany(
+                "DELETE FROM tombstones WHERE faiss_id = ?", [(faiss_id,) for faiss_id in faiss_ids]
+            )
+
+            if self.autosave:
+                self.save_index()
+
+    def insert_batch(self, chunks, chunk_embeddings=None):
+        """
+        Adiciona um lote de chunks ainda não armazenados (interface VectorStore).
+        """
+        self.add_chunks_to_index(chunks, chunk_embeddings)
+
+    def count(self):
+        """
+        Retorna a quantidade de chunks armazenados.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+# Exemplo de uso com o FAISS
 if __name__ == '__main__':
-    # Exemplo de criação e salvamento de vetores usando FAISS
+    from collections import namedtuple
+    from llama_models.embedding_model import get_shared_embedding_model
+
+    Document = namedtuple("Document", ["page_content", "metadata"])
+
+    # Inicializa a classe VectorDatabaseFAISS
+    vector_database = VectorDatabaseFAISS()
+
+    # Exemplo de texto dividido em chunks
     text_chunks = [
-        'Este é um exemplo de texto para teste.',
-        'Vamos dividir este texto em chunks menores.',
-        'Cada chunk terá um tamanho máximo de 10 palavras.'
+        Document('Este é um exemplo de texto para teste.', {"source": "exemplo_1", "page": 1}),
+        Document('Vamos dividir este texto em chunks menores.', {"source": "exemplo_2", "page": 2}),
+        Document('Cada chunk terá um tamanho máximo de 10 palavras.', {"source": "exemplo_3", "page": 3}),
     ]
-    
-    
-    # Instância da classe FAISS para criar e salvar vetores
-    faiss_db = VectorDatabaseFAISS()
-    vectorstore_faiss = faiss_db.get_vectorstore(text_chunks)
-    faiss_db.save_vectorstore(vectorstore_faiss)
\ No newline at end of file
+
+    # Insere os chunks no índice
+    print("Adicionando chunks ao índice FAISS...")
+    vector_database.insert_into_faiss(text_chunks)
+
+    # Realiza uma consulta no índice
+    print("\nConsultando no índice FAISS...")
+    query_embedding = get_shared_embedding_model().generate_embedding("texto para teste")
+    results = vector_database.query_faiss(query_embedding, n_results=2)
+
+    # Exibe os resultados da consulta
+    print("\nResultados da consulta:")
+    for doc, meta in zip(results['documents'][0], results['metadatas'][0]):
+        print(f"- Documento: {doc}")
+        print(f"  Metadados: {meta}")
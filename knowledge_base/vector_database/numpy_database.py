@@ -0,0 +1,265 @@
+import time
+import threading
+
+import numpy as np
+from utils.chunk_identifier import create_chunk_id
+from utils.metrics import metrics
+from knowledge_base.vector_database.vector_store import VectorStore, QueryResult, VECTOR_QUERY_INCLUDE, validate_include
+
+class VectorDatabaseNumpy(VectorStore):
+    """
+    Banco vetorial em memória com busca exata por força bruta (NumPy).
+    Serve como implementação de referência: resultados exatos, sem persistência,
+    e competitivo em coleções pequenas, onde o custo de um índice não se paga.
+    """
+
+    def __init__(self, database_name="my_database", initial_capacity=1024):
+        """
+        Inicializa o banco vazio.
+
+        Args:
+            database_name (str): Nome da coleção (apenas informativo).
+            initial_capacity (int): Quantidade de vetores reservada inicialmente (a matriz dobra quando enche).
+        """
+        self.database_name = database_name
+        self.initial_capacity = initial_capacity
+        self.lock = threading.Lock()
+
+        # Linhas da matriz de vetores e seus documentos, metadados e IDs
+        self.vectors = None
+        self.squared_norms = None
+        self.size = 0
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self.positions = {}
+
+        self.version = None
+        self.embedding_signature = None
+
+    def get_store_key(self):
+        """
+        Retorna o identificador da coleção (em memória, válido apenas neste processo).
+        """
+        return f"numpy:memory:{self.database_name}"
+
+    def get_embedding_signature(self):
+        """
+        Retorna o modelo e o formato dos embeddings armazenados.
+        """
+        return self.embedding_signature
+
+    def set_embedding_signature(self, embedding_signature):
+        """
+        Registra o modelo e o formato dos embeddings armazenados.
+        """
+        self.embedding_signature = embedding_signature
+
+    def clear(self):
+        """
+        Remove todos os chunks da coleção.
+        """
+        with self.lock:
+            self.vectors = None
+            self.squared_norms = None
+            self.size = 0
+            self.ids = []
+            self.documents = []
+            self.metadatas = []
+            self.positions = {}
+            self.bump_collection_version()
+
+    def get_collection_version(self):
+        """
+        Retorna a versão atual da coleção (alterada sempre que chunks são inseridos ou removidos).
+        """
+        return self.version
+
+    def bump_collection_version(self):
+        """
+        Registra uma nova versão da coleção após uma alteração.
+        """
+        self.version = str(time.time_ns())
+
+    def reserve(self, dimension, extra_rows):
+        """
+        Garante espaço na matriz para `extra_rows` novos vetores, dobrando a capacidade quando necessário.
+        """
+        if self.vectors is None:
+            capacity = max(self.initial_capacity, extra_rows)
+            self.vectors = np.empty((capacity, dimension), dtype=np.float32)
+            self.squared_norms = np.empty(capacity, dtype=np.float32)
+            return
+
+        required = self.size + extra_rows
+        if required <= len(self.vectors):
+            return
+
+        capacity = max(required, 2 * len(self.vectors))
+        vectors = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+        squared_norms = np.empty(capacity, dtype=np.float32)
+        vectors[:self.size] = self.vectors[:self.size]
+        squared_norms[:self.size] = self.squared_norms[:self.size]
+        self.vectors, self.squared_norms = vectors, squared_norms
+
+    def query_batch(self, query_embeddings, n_results=5, include=VECTOR_QUERY_INCLUDE):
+        """
+        Consulta vários embeddings com distância L2 ao quadrado (mesma métrica do Chroma e do FAISS).
+
+        Args:
+            query_embeddings (list): Embeddings das consultas.
+            n_results (int): Número de resultados desejados por consulta.
+            include (iterable of str): Campos retornados além dos IDs (ver QUERY_FIELDS).
+
+        Returns:
+            QueryResult: IDs e campos pedidos (uma lista por consulta).
+        """
+        include = validate_include(include)
+        results = {field: [] for field in ("ids",) + include}
+
+        with self.lock, metrics.timer("vector_query_seconds", {"backend": "numpy"}):
+            if self.size == 0 or not query_embeddings:
+                for field in results.values():
+                    field.extend([] for _ in query_embeddings)
+                return QueryResult(results.pop("ids"), {field: (lambda value=value: value) for field, value in results.items()})
+
+            queries = np.asarray(query_embeddings, dtype=np.float32)
+            vectors = self.vectors[:self.size]
+
+            # ||v - q||² = ||v||² - 2 v·q + ||q||², calculado para todas as consultas de uma vez
+            distances = (
+                self.squared_norms[:self.size][None, :]
+                - 2.0 * (queries @ vectors.T)
+                + np.einsum("ij,ij->i", queries, queries)[:, None]
+            )
+
+            # Seleciona os k menores sem ordenar a coleção inteira
+            k = min(n_results, self.size)
+            if k < self.size:
+                candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.tile(np.arange(self.size), (len(queries), 1))
+
+            # Os campos pedidos são copiados sob o lock (uma remoção posterior reordena as linhas)
+            for row, row_candidates in enumerate(candidates):
+                ordered = row_candidates[np.argsort(distances[row, row_candidates])]
+                results["ids"].append([self.ids[position] for position in ordered])
+                if "documents" in include:
+                    results["documents"].append([self.documents[position] for position in ordered])
+                if "metadatas" in include:
+                    results["metadatas"].append([self.metadatas[position] for position in ordered])
+                if "distances" in include:
+                    results["distances"].append(distances[row, ordered])
+                if "embeddings" in include:
+                    results["embeddings"].append(vectors[ordered])
+
+        # Distâncias e embeddings ficam em arrays do NumPy até o primeiro acesso
+        loaders = {field: (lambda value=results[field]: value) for field in ("documents", "metadatas") if field in include}
+        if "distances" in include:
+            loaders["distances"] = lambda: [row_distances.tolist() for row_distances in results["distances"]]
+        if "embeddings" in include:
+            loaders["embeddings"] = lambda: [row_embeddings.tolist() for row_embeddings in results["embeddings"]]
+
+        return QueryResult(results["ids"], {field: loaders[field] for field in include})
+
+    def filter_new_chunks(self, chunks):
+        """
+        Retorna apenas os chunks cujo ID ainda não existe na coleção.
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+
+        Returns:
+            list: Chunks ainda não armazenados (sem repetição dentro do próprio lote).
+        """
+        candidates = {}
+        for chunk in chunks:
+            candidates.setdefault(create_chunk_id(chunk.page_content), chunk)
+
+        with self.lock:
+            return [chunk for chunk_id, chunk in candidates.items() if chunk_id not in self.positions]
+
+    def insert_batch(self, chunks, chunk_embeddings=None):
+        """
+        Adiciona um lote de chunks ainda não armazenados.
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+            chunk_embeddings (list): Embeddings já calculados para os chunks (opcional).
+        """
+        if not chunks:
+            return
+
+        # Gera os embeddings quando não foram fornecidos
+        if chunk_embeddings is None:
+            chunk_embeddings = self.embed_chunks(chunks)
+
+        vectors = np.asarray(chunk_embeddings, dtype=np.float32)
+
+        with self.lock:
+            self.reserve(vectors.shape[1], len(chunks))
+
+            for chunk, vector in zip(chunks, vectors):
+                chunk_id = create_chunk_id(chunk.page_content)
+                if chunk_id in self.positions:
+                    continue
+
+                self.vectors[self.size] = vector
+                self.squared_norms[self.size] = vector @ vector
+                self.positions[chunk_id] = self.size
+                self.ids.append(chunk_id)
+                self.documents.append(chunk.page_content)
+                self.metadatas.append(chunk.metadata)
+                self.size += 1
+
+            self.bump_collection_version()
+
+    def delete_chunks(self, chunk_ids):
+        """
+        Remove chunks a partir de seus IDs (a última linha ocupa o lugar da removida).
+
+        Args:
+            chunk_ids (list of str): IDs dos chunks a serem removidos.
+        """
+        with self.lock:
+            for chunk_id in chunk_ids:
+                position = self.positions.pop(chunk_id, None)
+                if position is None:
+                    continue
+
+                last = self.size - 1
+                if position != last:
+                    self.vectors[position] = self.vectors[last]
+                    self.squared_norms[position] = self.squared_norms[last]
+                    self.ids[position] = self.ids[last]
+                    self.documents[position] = self.documents[last]
+                    self.metadatas[position] = self.metadatas[last]
+                    self.positions[self.ids[position]] = position
+
+                self.ids.pop()
+                self.documents.pop()
+                self.metadatas.pop()
+                self.size -= 1
+
+            self.bump_collection_version()
+
+    def delete_by_source(self, source):
+        """
+        Remove todos os chunks de um documento (metadado `source`).
+
+        Args:
+            source (str): Caminho do documento de origem.
+        """
+        with self.lock:
+            chunk_ids = [
+                chunk_id for chunk_id, metadata in zip(self.ids, self.metadatas)
+                if metadata.get("source") == source
+            ]
+
+        self.delete_chunks(chunk_ids)
+
+    def count(self):
+        """
+        Retorna a quantidade de chunks armazenados.
+        """
+        return self.size
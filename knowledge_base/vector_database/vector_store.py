@@ -0,0 +1,253 @@
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dotenv import load_dotenv
+
+# Carregamento das variáveis de ambiente
+load_dotenv()
+
+# Backend do banco vetorial usado pelos controllers: "chroma", "faiss" ou "numpy"
+# (o "numpy" vive apenas na memória do processo: serve para benchmarks, não para a ingestão)
+VECTOR_DATABASE = os.getenv('VECTOR_DATABASE', 'chroma').lower()
+
+# Campos que podem ser pedidos nas consultas (os IDs sempre são retornados)
+QUERY_FIELDS = ("documents", "metadatas", "distances", "embeddings")
+
+# Campos retornados por padrão: os embeddings armazenados só vêm quando pedidos explicitamente
+VECTOR_QUERY_INCLUDE = tuple(
+    field.strip() for field in os.getenv('VECTOR_QUERY_INCLUDE', 'documents,metadatas,distances').split(',') if field.strip()
+)
+
+def validate_include(include):
+    """
+    Valida os campos pedidos em uma consulta.
+
+    Args:
+        include (iterable of str): Campos pedidos (ver QUERY_FIELDS).
+
+    Returns:
+        tuple: Campos pedidos, sem repetição e na ordem recebida.
+    """
+    include = tuple(dict.fromkeys(include))
+
+    invalid_fields = [field for field in include if field not in QUERY_FIELDS]
+    if invalid_fields:
+        raise ValueError(f"Campos de consulta inválidos: {', '.join(invalid_fields)} (use {', '.join(QUERY_FIELDS)})")
+
+    return include
+
+class QueryResult(Mapping):
+    """
+    Resultado de uma consulta no formato do Chroma (`result["documents"][0]`, uma lista por consulta),
+    restrito aos campos pedidos em `include`. Cada campo é montado apenas no primeiro acesso:
+    campos não lidos pelo chamador (metadados, distâncias) não custam conversões.
+    """
+
+    def __init__(self, ids, loaders):
+        """
+        Args:
+            ids (list): IDs dos chunks encontrados (uma lista por consulta).
+            loaders (dict): Campo -> função sem argumentos que monta o campo (uma lista por consulta).
+        """
+        self.fields = {"ids": ids}
+        self.loaders = dict(loaders)
+        self.included = ("ids",) + tuple(self.loaders)
+
+    def __getitem__(self, field):
+        if field not in self.fields:
+            if field not in self.loaders:
+                raise KeyError(f"Campo não incluído na consulta: {field} (disponíveis: {', '.join(self.included)})")
+            self.fields[field] = self.loaders.pop(field)()
+
+        return self.fields[field]
+
+    def __iter__(self):
+        return iter(self.included)
+
+    def __len__(self):
+        return len(self.included)
+
+
+class VectorStore(ABC):
+    """
+    Interface comum dos bancos vetoriais (Chroma, FAISS e NumPy).
+    Os resultados de consulta seguem o formato do Chroma: uma lista de IDs e de cada campo
+    pedido (documentos, metadados, distâncias, embeddings) para cada embedding consultado.
+    """
+
+    @abstractmethod
+    def insert_batch(self, chunks, chunk_embeddings=None):
+        """
+        Adiciona um lote de chunks ainda não armazenados (ver `filter_new_chunks`).
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+            chunk_embeddings (list): Embeddings já calculados para os chunks (opcional).
+        """
+
+    @abstractmethod
+    def query_batch(self, query_embeddings, n_results=5, include=VECTOR_QUERY_INCLUDE):
+        """
+        Consulta vários embeddings de uma vez.
+
+        Args:
+            query_embeddings (list): Embeddings das consultas.
+            n_results (int): Número de resultados desejados por consulta.
+            include (iterable of str): Campos retornados além dos IDs (ver QUERY_FIELDS).
+
+        Returns:
+            QueryResult: IDs e campos pedidos (uma lista por consulta).
+        """
+
+    @abstractmethod
+    def filter_new_chunks(self, chunks):
+        """
+        Retorna apenas os chunks cujo ID ainda não existe no banco.
+        """
+
+    @abstractmethod
+    def delete_chunks(self, chunk_ids):
+        """
+        Remove chunks a partir de seus IDs.
+        """
+
+    @abstractmethod
+    def delete_by_source(self, source):
+        """
+        Remove todos os chunks de um documento (metadado `source`).
+
+        Args:
+            source (str): Caminho do documento de origem.
+        """
+
+    @abstractmethod
+    def count(self):
+        """
+        Retorna a quantidade de chunks armazenados.
+        """
+
+    @abstractmethod
+    def get_store_key(self):
+        """
+        Retorna o identificador do armazenamento (backend e caminho), usado como chave do manifesto de ingestão.
+        """
+
+    @abstractmethod
+    def get_collection_version(self):
+        """
+        Retorna a versão atual do banco (alterada sempre que chunks são inseridos ou removidos).
+        """
+
+    @abstractmethod
+    def get_embedding_signature(self):
+        """
+        Retorna o modelo e o formato dos embeddings armazenados (None quando não registrados).
+        """
+
+    @abstractmethod
+    def set_embedding_signature(self, embedding_signature):
+        """
+        Registra o modelo e o formato dos embeddings armazenados.
+        """
+
+    @abstractmethod
+    def clear(self):
+        """
+        Remove todos os chunks armazenados.
+        """
+
+    def ensure_embedding_signature(self, embedding_signature):
+        """
+        Garante que os vetores armazenados são do modelo e do formato de embeddings atuais.
+        Um banco populado com outra assinatura (ou sem assinatura, gravado por versões anteriores)
+        é apagado, para que a ingestão gere os embeddings novamente: consultas normalizadas
+        contra vetores não normalizados ordenariam os resultados de forma incorreta.
+
+        Args:
+            embedding_signature (str): Assinatura atual (ver `get_embedding_signature` do modelo).
+
+        Returns:
+            bool: True quando o banco foi apagado.
+        """
+        if self.get_embedding_signature() == embedding_signature:
+            return False
+
+        cleared = self.count() > 0
+        if cleared:
+            print(f"⚠️ Banco vetorial com embeddings de outro modelo ou formato: apagando {self.count()} chunks para reprocessá-los.")
+            self.clear()
+
+        self.set_embedding_signature(embedding_signature)
+        return cleared
+
+    def embed_chunks(self, chunks):
+        """
+        Gera os embeddings dos chunks em lote (uma requisição por lote em vez de uma por chunk).
+        O modelo de embeddings é carregado apenas no primeiro uso.
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+
+        Returns:
+            list: Embeddings na mesma ordem dos chunks.
+        """
+        from llama_models.embedding_model import get_shared_embedding_model
+
+        return get_shared_embedding_model().generate_embeddings([chunk.page_content for chunk in chunks])
+
+    def query(self, query_embedding, n_results=5, include=VECTOR_QUERY_INCLUDE):
+        """
+        Consulta um único embedding.
+
+        Args:
+            query_embedding (list): Embedding da consulta.
+            n_results (int): Número de resultados desejados.
+            include (iterable of str): Campos retornados além dos IDs (ver QUERY_FIELDS).
+
+        Returns:
+            QueryResult: Resultados no formato do Chroma (com uma única lista por campo).
+        """
+        return self.query_batch([query_embedding], n_results, include)
+
+    def insert_chunks(self, chunks):
+        """
+        Insere apenas chunks únicos no banco vetorial.
+
+        Args:
+            chunks (list): Lista de chunks de texto com metadados.
+        """
+        # Filtra chunks que ainda não estão no banco de dados
+        new_chunks = self.filter_new_chunks(chunks)
+
+        if new_chunks:
+            print(f"👉 Adicionando novos documentos: {len(new_chunks)}")
+            self.insert_batch(new_chunks)
+            return print("✅ Documentos adicionados com sucesso.")
+
+        return print("✅ Nenhum novo documento para adicionar.")
+
+def create_vector_database(backend=VECTOR_DATABASE, **kwargs):
+    """
+    Cria o banco vetorial configurado. Os backends são importados sob demanda,
+    de modo que apenas as dependências do backend escolhido precisam estar instaladas.
+
+    Args:
+        backend (str): "chroma", "faiss" ou "numpy".
+        **kwargs: Argumentos repassados ao construtor do backend.
+
+    Returns:
+        VectorStore: Instância do banco vetorial.
+    """
+    if backend == "chroma":
+        from knowledge_base.vector_database.chroma_database import VectorDatabaseChroma
+        return VectorDatabaseChroma(**kwargs)
+
+    if backend == "faiss":
+        from knowledge_base.vector_database.faiss_database import VectorDatabaseFAISS
+        return VectorDatabaseFAISS(**kwargs)
+
+    if backend == "numpy":
+        from knowledge_base.vector_database.numpy_database import VectorDatabaseNumpy
+        return VectorDatabaseNumpy(**kwargs)
+
+    raise ValueError(f"Banco vetorial inválido: {backend} (use chroma, faiss ou numpy)")
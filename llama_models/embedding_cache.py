@@ -0,0 +1,209 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import time
+from array import array
+from dotenv import load_dotenv
+from utils.file_manipulation import create_directory
+
+load_dotenv()
+
+# Caminho do arquivo SQLite que armazena o cache de embeddings
+EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', './database/embedding_cache/embeddings.sqlite3')
+
+# Quantidade máxima de embeddings mantidos no cache antes da remoção LRU
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '200000'))
+
+def hash_text(text):
+    """
+    Calcula o hash SHA-256 de um texto, usado como chave do cache.
+
+    Args:
+        text (str): Texto de entrada.
+
+    Returns:
+        str: Hash hexadecimal do texto.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Cache persistente de embeddings em SQLite, endereçado por (modelo, hash do texto).
+    Mantém no máximo `max_entries` vetores, removendo os menos usados recentemente (LRU).
+    """
+
+    def __init__(self, model_name, cache_path=EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES):
+        """
+        Inicializa o cache e descarta entradas geradas por outro modelo de embedding ou em outro formato.
+
+        Args:
+            model_name (str): Modelo e formato dos embeddings (ver `get_embedding_signature`).
+            cache_path (str): Caminho do arquivo SQLite do cache.
+            max_entries (int): Quantidade máxima de embeddings armazenados.
+        """
+        self.model_name = model_name or ""
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+
+        # Contadores de uso do cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Garante que o diretório do cache existe
+        create_directory(os.path.dirname(os.path.abspath(cache_path)))
+
+        # A conexão é compartilhada entre threads e protegida por um lock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access INTEGER NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+                """
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)"
+            )
+
+            # Troca de modelo (ou de formato dos vetores) invalida todo o conteúdo gerado anteriormente
+            self.connection.execute("DELETE FROM embeddings WHERE model != ?", (self.model_name,))
+
+            self.entry_count = self.connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, texts):
+        """
+        Recupera embeddings do cache para uma lista de textos.
+
+        Args:
+            texts (list of str): Textos a serem consultados.
+
+        Returns:
+            list: Embedding de cada texto, ou None quando o texto não está no cache.
+        """
+        text_hashes = [hash_text(text) for text in texts]
+        found = {}
+
+        with self.lock:
+            # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+            unique_hashes = list(dict.fromkeys(text_hashes))
+            for start in range(0, len(unique_hashes), 500):
+                block = unique_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(block))
+                rows = self.connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *block]
+                ).fetchall()
+
+                for text_hash, vector in rows:
+                    found[text_hash] = array("f", vector).tolist()
+
+            # Atualiza o último acesso das entradas encontradas (política LRU)
+            if found:
+                now = time.time_ns()
+                with self.connection:
+                    self.connection.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                        [(now, self.model_name, text_hash) for text_hash in found]
+                    )
+
+            results = [found.get(text_hash) for text_hash in text_hashes]
+            hit_count = sum(result is not None for result in results)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def get(self, text):
+        """
+        Recupera o embedding de um único texto.
+
+        Args:
+            text (str): Texto a ser consultado.
+
+        Returns:
+            list or None: Embedding armazenado ou None se não estiver no cache.
+        """
+        return self.get_many([text])[0]
+
+    def put_many(self, texts, embeddings):
+        """
+        Armazena embeddings no cache e aplica a remoção LRU se o limite for excedido.
+
+        Args:
+            texts (list of str): Textos de origem.
+            embeddings (list): Embeddings correspondentes a cada texto.
+        """
+        now = time.time_ns()
+        rows = [
+            (self.model_name, hash_text(text), array("f", embedding).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+        with self.lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self.entry_count += self.connection.total_changes - before
+
+            # Remove as entradas menos usadas recentemente quando o limite é excedido
+            overflow = self.entry_count - self.max_entries
+            if overflow > 0:
+                self.connection.execute(
+                    """
+                    DELETE FROM embeddings WHERE rowid IN (
+                        SELECT rowid FROM embeddings ORDER BY last_access ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,)
+                )
+                self.entry_count -= overflow
+                self.evictions += overflow
+
+    def put(self, text, embedding):
+        """
+        Armazena o embedding de um único texto.
+
+        Args:
+            text (str): Texto de origem.
+            embedding (list): Embedding do texto.
+        """
+        self.put_many([text], [embedding])
+
+    def clear(self):
+        """
+        Remove todas as entradas do cache.
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM embeddings")
+            self.entry_count = 0
+
+    def get_stats(self):
+        """
+        Retorna os contadores de uso do cache.
+
+        Returns:
+            dict: Acertos, falhas, remoções, entradas armazenadas e taxa de acerto.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": self.entry_count,
+            "max_entries": self.max_entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,18 +1,66 @@
 import os
+import asyncio
+import threading
 from dotenv import load_dotenv
-from langchain_ollama import OllamaEmbeddings
-import ollama
+from llama_models.embedding_cache import EmbeddingCache
+from llama_models.ollama_clients import get_ollama_client, get_async_ollama_client, get_embeddings_model, track_latency
+from utils.metrics import metrics
 
 load_dotenv()
 
 LLAMA_MODEL_EMBEDDING = os.getenv('LLAMA_MODEL_EMBEDDING')
 LLAMA_URL = os.getenv('LLAMA_URL')
 
+# Quantidade padrão de textos enviados por requisição de embedding
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '32'))
+
+# Habilita o cache persistente de embeddings
+EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Formato dos embeddings gerados (endpoint /api/embed do Ollama, vetores normalizados), registrado no cache
+# e nos bancos vetoriais: vetores do endpoint antigo /api/embeddings (sem normalização) não se comparam às consultas
+EMBEDDING_FORMAT = "ollama-embed-normalized"
+
+# Modelo de embeddings compartilhado pelos bancos vetoriais, criado sob demanda
+shared_embedding_model = None
+shared_embedding_model_lock = threading.Lock()
+
+def get_shared_embedding_model():
+    """
+    Obtém a instância de LLAMAEmbeddingModel compartilhada pelo processo,
+    criando-a (e abrindo o cache de embeddings) apenas no primeiro uso.
+
+    Returns:
+        LLAMAEmbeddingModel: Modelo de embeddings compartilhado.
+    """
+    global shared_embedding_model
+
+    with shared_embedding_model_lock:
+        if shared_embedding_model is None:
+            shared_embedding_model = LLAMAEmbeddingModel()
+        return shared_embedding_model
+
+def get_embedding_signature(model_name=LLAMA_MODEL_EMBEDDING):
+    """
+    Identifica o modelo e o formato dos embeddings gerados.
+
+    Args:
+        model_name (str): Nome do modelo de embedding (padrão: LLAMA_MODEL_EMBEDDING).
+
+    Returns:
+        str: Assinatura "modelo:formato".
+    """
+    return f"{model_name or ''}:{EMBEDDING_FORMAT}"
+
 class LLAMAEmbeddingModel:
-    def __init__(self):
+    def __init__(self, batch_size=EMBEDDING_BATCH_SIZE, use_cache=EMBEDDING_CACHE_ENABLED):
         self.LLAMA_MODEL = LLAMA_MODEL_EMBEDDING
         self.LLAMA_URL = LLAMA_URL
-        
+        self.batch_size = batch_size
+
+        # Cache persistente de embeddings, endereçado por (modelo e formato, hash do texto)
+        self.embedding_cache = EmbeddingCache(get_embedding_signature(self.LLAMA_MODEL)) if use_cache else None
+
     def get_embedding_model(self):
         """
         Obtém o modelo de embeddings LLAMA.
@@ -20,25 +68,165 @@ class LLAMAEmbeddingModel:
         Returns:
             embedding_model: Modelo de embeddings LLAMA
         """
-        
-        embedding_model = OllamaEmbeddings(model=self.LLAMA_MODEL)
+
+        embedding_model = get_embeddings_model(self.LLAMA_MODEL, self.LLAMA_URL)
 
         return embedding_model
 
     def generate_embedding(self, text):
         """
-        Gera embedding para um texto fornecido. 
-        
+        Gera embedding para um texto fornecido.
+
         Args:
             text (str): Texto para o qual o embedding será gerado.
         Returns:
             embedding: Embedding gerado para o texto.
         """
-        response = ollama.embeddings(model=LLAMA_MODEL_EMBEDDING, prompt=text)
-        embedding = response["embedding"]
+        # Consulta o cache antes de chamar o modelo
+        if self.embedding_cache is not None:
+            cached_embedding = self.embedding_cache.get(text)
+            if cached_embedding is not None:
+                metrics.increment("embedding_cache_lookups_total", labels={"result": "hit"})
+                return cached_embedding
+            metrics.increment("embedding_cache_lookups_total", labels={"result": "miss"})
+
+        # Mesmo endpoint (/api/embed, vetores normalizados) das versões em lote e assíncrona,
+        # que compartilham as mesmas entradas do cache
+        with track_latency("embedding.embed"):
+            response = get_ollama_client(self.LLAMA_URL).embed(model=LLAMA_MODEL_EMBEDDING, input=text)
+        embedding = response["embeddings"][0]
+
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(text, embedding)
+
         return embedding
-    
+
+    async def agenerate_embedding(self, text, executor=None):
+        """
+        Gera embedding para um texto fornecido, de forma assíncrona.
+        As leituras e escritas no cache (SQLite, bloqueantes) são executadas fora do event loop.
+
+        Args:
+            text (str): Texto para o qual o embedding será gerado.
+            executor (Executor): Pool de threads do acesso ao cache (padrão: o executor padrão do event loop).
+        Returns:
+            embedding: Embedding gerado para o texto.
+        """
+        loop = asyncio.get_running_loop()
+
+        # Consulta o cache antes de chamar o modelo
+        if self.embedding_cache is not None:
+            cached_embedding = await loop.run_in_executor(executor, self.embedding_cache.get, text)
+            if cached_embedding is not None:
+                metrics.increment("embedding_cache_lookups_total", labels={"result": "hit"})
+                return cached_embedding
+            metrics.increment("embedding_cache_lookups_total", labels={"result": "miss"})
+
+        with track_latency("embedding.aembed"):
+            response = await get_async_ollama_client(self.LLAMA_URL).embed(model=LLAMA_MODEL_EMBEDDING, input=text)
+        embedding = response["embeddings"][0]
+
+        if self.embedding_cache is not None:
+            await loop.run_in_executor(executor, self.embedding_cache.put, text, embedding)
+
+        return embedding
+
+    def generate_embeddings(self, texts, batch_size=None):
+        """
+        Gera embeddings para vários textos, enviando-os em lotes para o Ollama.
+        Textos já presentes no cache não são reenviados ao modelo.
+
+        Args:
+            texts (list of str): Textos para os quais os embeddings serão gerados.
+            batch_size (int): Quantidade de textos por requisição (padrão: `self.batch_size`).
+
+        Returns:
+            list: Embeddings gerados, na mesma ordem dos textos de entrada.
+        """
+        texts = list(texts)
+
+        if self.embedding_cache is None:
+            return self.request_embeddings(texts, batch_size)
+
+        # Recupera do cache o que já foi calculado anteriormente
+        embeddings = self.embedding_cache.get_many(texts)
+
+        hit_count = sum(embedding is not None for embedding in embeddings)
+        metrics.increment("embedding_cache_lookups_total", hit_count, labels={"result": "hit"})
+        metrics.increment("embedding_cache_lookups_total", len(embeddings) - hit_count, labels={"result": "miss"})
+
+        # Textos ausentes no cache (sem repetição) são enviados ao modelo
+        missing_texts = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+
+        if missing_texts:
+            missing_embeddings = self.request_embeddings(missing_texts, batch_size)
+            self.embedding_cache.put_many(missing_texts, missing_embeddings)
+
+            # Preenche as posições ausentes mantendo a ordem de entrada
+            computed = dict(zip(missing_texts, missing_embeddings))
+            embeddings = [
+                embedding if embedding is not None else computed[text]
+                for text, embedding in zip(texts, embeddings)
+            ]
+
+        return embeddings
+
+    def request_embeddings(self, texts, batch_size=None):
+        """
+        Solicita embeddings ao Ollama em lotes, sem consultar o cache.
+
+        Args:
+            texts (list of str): Textos para os quais os embeddings serão gerados.
+            batch_size (int): Quantidade de textos por requisição (padrão: `self.batch_size`).
+
+        Returns:
+            list: Embeddings gerados, na mesma ordem dos textos de entrada.
+        """
+        batch_size = batch_size or self.batch_size
+        embeddings = []
+
+        # Cliente compartilhado, com conexões keep-alive reutilizadas entre os lotes
+        client = get_ollama_client(self.LLAMA_URL)
+
+        # Cada requisição ao endpoint /api/embed processa um lote inteiro de textos
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            with track_latency("embedding.embed"):
+                response = client.embed(model=LLAMA_MODEL_EMBEDDING, input=batch)
+            batch_embeddings = response["embeddings"]
+
+            # Garante que o servidor retornou um embedding para cada texto do lote
+            if len(batch_embeddings) != len(batch):
+                raise ValueError(
+                    f"Quantidade de embeddings ({len(batch_embeddings)}) difere do tamanho do lote ({len(batch)})."
+                )
+
+            embeddings.extend(batch_embeddings)
+
+        return embeddings
+
+    def get_cache_stats(self):
+        """
+        Retorna os contadores de acerto/falha do cache de embeddings.
+
+        Returns:
+            dict or None: Estatísticas do cache, ou None se o cache estiver desabilitado.
+        """
+        if self.embedding_cache is None:
+            return None
+
+        return self.embedding_cache.get_stats()
+
 if __name__ == "__main__":
     llama_embedding_model = LLAMAEmbeddingModel()
     embedding = llama_embedding_model.generate_embedding("Hello, world!")
-    print(embedding)
\ No newline at end of file
+    print(embedding)
+
+    # Gera embeddings em lote para vários textos
+    embeddings = llama_embedding_model.generate_embeddings(["Hello, world!", "Olá, mundo!"], batch_size=2)
+    print(len(embeddings))
+
+    # Exibe as estatísticas do cache de embeddings
+    print(llama_embedding_model.get_cache_stats())
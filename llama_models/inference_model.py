@@ -2,9 +2,7 @@ import os
 import time
 from dotenv import load_dotenv
 
-from langchain_ollama import ChatOllama 
-from langchain_ollama import OllamaLLM
-from langchain_core.prompts import PromptTemplate
+from llama_models.ollama_clients import get_chat_model, get_llm_model, get_async_llm_model, track_latency, get_latency_stats
 
 load_dotenv()
 
@@ -32,8 +30,10 @@ class LLAMAInferenceModel:
         Returns:
             response (str): A resposta do modelo de chat.
         """
-        model = ChatOllama(model=self.LLAMA_MODEL, base_url=self.LLAMA_URL)
-        response = model.invoke(prompt)
+        model = get_chat_model(self.LLAMA_MODEL, self.LLAMA_URL)
+
+        with track_latency("inference.chat"):
+            response = model.invoke(prompt)
 
         return response
     
@@ -46,8 +46,56 @@ class LLAMAInferenceModel:
         Returns:
             response (str): A resposta do modelo de chat.
         """
-        llm = OllamaLLM(model=self.LLAMA_MODEL)
-        response = llm.invoke(prompt)
+        llm = get_llm_model(self.LLAMA_MODEL, self.LLAMA_URL)
+
+        with track_latency("inference.llm"):
+            response = llm.invoke(prompt)
+        
+        return response
+
+    def stream_chat_model(self, prompt):
+        """
+        Faz uma chamada ao modelo de chat LLAMA, retornando os tokens à medida que são gerados.
+        
+        Args:
+            prompt (str): A entrada para o modelo de chat.
+        Yields:
+            token (str): Trecho da resposta gerado pelo modelo.
+        """
+        model = get_chat_model(self.LLAMA_MODEL, self.LLAMA_URL)
+
+        with track_latency("inference.chat_stream"):
+            for chunk in model.stream(prompt):
+                yield chunk.content
+
+    def stream_llm_model(self, prompt):
+        """
+        Faz uma chamada ao modelo de LLM LLAMA, retornando os tokens à medida que são gerados.
+        
+        Args:
+            prompt (str): A entrada para o modelo de chat.
+        Yields:
+            token (str): Trecho da resposta gerado pelo modelo.
+        """
+        llm = get_llm_model(self.LLAMA_MODEL, self.LLAMA_URL)
+
+        with track_latency("inference.llm_stream"):
+            for token in llm.stream(prompt):
+                yield token
+
+    async def ainvoke_llm_model(self, prompt):
+        """
+        Faz uma chamada assíncrona ao modelo de LLM LLAMA.
+        
+        Args:
+            prompt (str): A entrada para o modelo de chat.
+        Returns:
+            response (str): A resposta do modelo de chat.
+        """
+        llm = get_async_llm_model(self.LLAMA_MODEL, self.LLAMA_URL)
+
+        with track_latency("inference.allm"):
+            response = await llm.ainvoke(prompt)
         
         return response
 
@@ -58,7 +106,9 @@ if __name__ == "__main__":
     
     # Calcular o tempo dessa operaçao
     start = time.time()
+    response = model.invoke_chat_model("Qual o sentido da vida?")
     end = time.time()
     print(f"Tempo de execução: {end - start} segundos")
-    
-    response = model.invoke_chat_model("Qual o sentido da vida?")
\ No newline at end of file
+
+    # Exibe a latência registrada por operação
+    print(get_latency_stats())
\ No newline at end of file
@@ -0,0 +1,215 @@
+import os
+import time
+import asyncio
+import threading
+import weakref
+from contextlib import contextmanager
+
+import httpx
+import ollama
+from dotenv import load_dotenv
+from utils.metrics import metrics
+
+load_dotenv()
+
+LLAMA_URL = os.getenv('LLAMA_URL')
+
+# Conexões HTTP mantidas abertas (keep-alive) por cliente
+LLAMA_CLIENT_POOL_SIZE = int(os.getenv('LLAMA_CLIENT_POOL_SIZE', '10'))
+
+# Tempo máximo de espera por uma resposta do Ollama (segundos)
+LLAMA_CLIENT_TIMEOUT = float(os.getenv('LLAMA_CLIENT_TIMEOUT', '120'))
+
+# Tempo máximo para estabelecer a conexão com o Ollama (segundos)
+LLAMA_CLIENT_CONNECT_TIMEOUT = float(os.getenv('LLAMA_CLIENT_CONNECT_TIMEOUT', '10'))
+
+# Tempo que uma conexão ociosa permanece no pool (segundos)
+LLAMA_CLIENT_KEEPALIVE_EXPIRY = float(os.getenv('LLAMA_CLIENT_KEEPALIVE_EXPIRY', '60'))
+
+# Clientes compartilhados pelo processo, criados sob demanda
+clients_lock = threading.Lock()
+ollama_clients = {}
+async_ollama_clients = weakref.WeakKeyDictionary()
+langchain_models = {}
+
+def get_client_kwargs():
+    """
+    Monta os parâmetros HTTP (pool de conexões keep-alive e timeouts) repassados aos clientes do Ollama.
+
+    Returns:
+        dict: Argumentos aceitos por `ollama.Client`, `ollama.AsyncClient` e `client_kwargs` do LangChain.
+    """
+    return {
+        "timeout": httpx.Timeout(LLAMA_CLIENT_TIMEOUT, connect=LLAMA_CLIENT_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=LLAMA_CLIENT_POOL_SIZE,
+            max_keepalive_connections=LLAMA_CLIENT_POOL_SIZE,
+            keepalive_expiry=LLAMA_CLIENT_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+def get_ollama_client(host=LLAMA_URL):
+    """
+    Obtém o cliente síncrono do Ollama compartilhado para um host.
+
+    Args:
+        host (str): URL do servidor Ollama (None usa OLLAMA_HOST ou o padrão da biblioteca).
+
+    Returns:
+        ollama.Client: Cliente reutilizado, com pool de conexões keep-alive.
+    """
+    with clients_lock:
+        if host not in ollama_clients:
+            ollama_clients[host] = ollama.Client(host=host, **get_client_kwargs())
+        return ollama_clients[host]
+
+def get_async_ollama_client(host=LLAMA_URL):
+    """
+    Obtém o cliente assíncrono do Ollama compartilhado para o event loop em execução.
+    As conexões de um cliente assíncrono pertencem a um único event loop.
+
+    Args:
+        host (str): URL do servidor Ollama.
+
+    Returns:
+        ollama.AsyncClient: Cliente reutilizado dentro do event loop atual.
+    """
+    loop = asyncio.get_running_loop()
+
+    with clients_lock:
+        loop_clients = async_ollama_clients.setdefault(loop, {})
+        if host not in loop_clients:
+            loop_clients[host] = ollama.AsyncClient(host=host, **get_client_kwargs())
+        return loop_clients[host]
+
+def get_langchain_model(model_class, model, host=LLAMA_URL):
+    """
+    Obtém uma instância compartilhada de um modelo LangChain do Ollama (ChatOllama, OllamaLLM, OllamaEmbeddings).
+
+    Args:
+        model_class (type): Classe do modelo LangChain.
+        model (str): Nome do modelo no Ollama.
+        host (str): URL do servidor Ollama.
+
+    Returns:
+        object: Instância reutilizada entre chamadas.
+    """
+    key = (model_class.__name__, model, host)
+
+    with clients_lock:
+        if key not in langchain_models:
+            langchain_models[key] = model_class(model=model, base_url=host, client_kwargs=get_client_kwargs())
+        return langchain_models[key]
+
+def get_async_llm_model(model, host=LLAMA_URL):
+    """
+    Obtém o modelo de LLM (OllamaLLM) compartilhado para o event loop em execução.
+    O LangChain cria o cliente assíncrono na construção do modelo, por isso há uma instância por event loop.
+    """
+    from langchain_ollama import OllamaLLM
+
+    loop = asyncio.get_running_loop()
+    key = (OllamaLLM.__name__, model, host)
+
+    with clients_lock:
+        loop_clients = async_ollama_clients.setdefault(loop, {})
+        if key not in loop_clients:
+            loop_clients[key] = OllamaLLM(model=model, base_url=host, client_kwargs=get_client_kwargs())
+        return loop_clients[key]
+
+def get_chat_model(model, host=LLAMA_URL):
+    """
+    Obtém o modelo de chat (ChatOllama) compartilhado.
+    """
+    from langchain_ollama import ChatOllama
+
+    return get_langchain_model(ChatOllama, model, host)
+
+def get_llm_model(model, host=LLAMA_URL):
+    """
+    Obtém o modelo de LLM (OllamaLLM) compartilhado.
+    """
+    from langchain_ollama import OllamaLLM
+
+    return get_langchain_model(OllamaLLM, model, host)
+
+def get_embeddings_model(model, host=LLAMA_URL):
+    """
+    Obtém o modelo de embeddings do LangChain (OllamaEmbeddings) compartilhado.
+    """
+    from langchain_ollama import OllamaEmbeddings
+
+    return get_langchain_model(OllamaEmbeddings, model, host)
+
+class LatencyRecorder:
+    """
+    Registra a latência de cada chamada aos modelos, agrupada por operação.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.operations = {}
+
+    def record(self, operation, seconds):
+        """
+        Registra a duração de uma chamada.
+
+        Args:
+            operation (str): Nome da operação (ex.: "embedding.embed").
+            seconds (float): Duração da chamada em segundos.
+        """
+        with self.lock:
+            stats = self.operations.setdefault(operation, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            stats["count"] += 1
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["last_seconds"] = seconds
+
+    def get_stats(self):
+        """
+        Retorna as estatísticas de latência de cada operação.
+
+        Returns:
+            dict: Quantidade de chamadas, tempo total, médio, máximo e da última chamada por operação.
+        """
+        with self.lock:
+            return {
+                operation: {**stats, "mean_seconds": stats["total_seconds"] / stats["count"]}
+                for operation, stats in self.operations.items()
+            }
+
+    def reset(self):
+        """
+        Descarta as estatísticas registradas.
+        """
+        with self.lock:
+            self.operations.clear()
+
+# Registro de latência compartilhado pelos modelos do processo
+latency_recorder = LatencyRecorder()
+
+@contextmanager
+def track_latency(operation):
+    """
+    Mede a duração do bloco e a registra em `latency_recorder` e nas métricas
+    (histograma `ollama_request_seconds`, rotulado pela operação).
+
+    Args:
+        operation (str): Nome da operação medida.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.increment("ollama_request_errors_total", labels={"operation": operation})
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        latency_recorder.record(operation, seconds)
+        metrics.observe("ollama_request_seconds", seconds, {"operation": operation})
+
+def get_latency_stats():
+    """
+    Retorna as estatísticas de latência das chamadas aos modelos.
+    """
+    return latency_recorder.get_stats()
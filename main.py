@@ -1,10 +1,11 @@
-from controller.controller_ingestion_data import ControllerIngestionData
-from controller.controller_rag import ControllerRAG
+if '__main__' == __name__:
+    # Os controllers (e suas dependências) são importados somente na execução do script
+    from controller.controller_ingestion_data import ControllerIngestionData
+    from controller.controller_rag import ControllerRAG
 
-controller_ingestion = ControllerIngestionData()
-controller_rag = ControllerRAG()
+    controller_ingestion = ControllerIngestionData()
+    controller_rag = ControllerRAG()
 
-if '__main__' == __name__:
     # Exemplo de criação e salvamento de vetores usando Chroma
     controller_ingestion.ingestion_data_folder()
 
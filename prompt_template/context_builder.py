@@ -0,0 +1,138 @@
+import os
+from dotenv import load_dotenv
+from utils.tokenizer import count_tokens, truncate_to_tokens
+
+# Carregamento das variáveis de ambiente
+load_dotenv()
+
+# Máximo de tokens do contexto enviado ao modelo (0 = sem limite)
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '2000'))
+
+# Maior sobreposição procurada entre chunks vizinhos (deve cobrir o chunk_overlap do ChunkSplitter:
+# 200 caracteres, ou CHUNK_TOKEN_OVERLAP tokens no modo "tokens")
+CONTEXT_MAX_OVERLAP_CHARS = int(os.getenv('CONTEXT_MAX_OVERLAP_CHARS', '800'))
+
+# Menor sobreposição considerada (evita juntar chunks que só compartilham poucas palavras)
+CONTEXT_MIN_OVERLAP_CHARS = int(os.getenv('CONTEXT_MIN_OVERLAP_CHARS', '30'))
+
+def find_overlap(first, second, max_overlap=CONTEXT_MAX_OVERLAP_CHARS, min_overlap=CONTEXT_MIN_OVERLAP_CHARS):
+    """
+    Procura o maior trecho que termina `first` e inicia `second` (a sobreposição entre chunks consecutivos).
+
+    Args:
+        first (str): Texto que vem antes.
+        second (str): Texto que vem depois.
+        max_overlap (int): Maior sobreposição procurada, em caracteres.
+        min_overlap (int): Menor sobreposição considerada, em caracteres.
+
+    Returns:
+        int: Tamanho da sobreposição em caracteres (0 se não houver).
+    """
+    if len(first) < min_overlap or len(second) < min_overlap:
+        return 0
+
+    # Posições do final de `first` onde o início de `second` aparece (a primeira é a maior sobreposição)
+    prefix = second[:min_overlap]
+    position = first.find(prefix, max(0, len(first) - max_overlap))
+
+    while position != -1:
+        if second.startswith(first[position:]):
+            return len(first) - position
+        position = first.find(prefix, position + 1)
+
+    return 0
+
+def merge_documents(documents):
+    """
+    Remove chunks repetidos e junta chunks consecutivos que se sobrepõem, mantendo a ordem de relevância:
+    cada trecho fica na posição do documento mais relevante que o contém.
+
+    Args:
+        documents (list of str): Documentos do mais relevante para o menos relevante.
+
+    Returns:
+        tuple: Blocos de texto resultantes, quantidade de documentos repetidos e de documentos unidos a outro bloco.
+    """
+    blocks = []
+    duplicates_removed = 0
+    chunks_merged = 0
+
+    for document in documents:
+        document = document.strip()
+        if not document:
+            continue
+
+        for index, block in enumerate(blocks):
+            # Documento já contido em um bloco mais relevante
+            if document in block:
+                duplicates_removed += 1
+                break
+
+            # Documento que contém um bloco mais relevante
+            if block in document:
+                blocks[index] = document
+                duplicates_removed += 1
+                break
+
+            # Chunks vizinhos do mesmo texto: o final de um é o início do outro
+            overlap = find_overlap(block, document)
+            if overlap:
+                blocks[index] = block + document[overlap:]
+                chunks_merged += 1
+                break
+
+            overlap = find_overlap(document, block)
+            if overlap:
+                blocks[index] = document + block[overlap:]
+                chunks_merged += 1
+                break
+        else:
+            blocks.append(document)
+
+    return blocks, duplicates_removed, chunks_merged
+
+def build_context(documents, token_budget=CONTEXT_TOKEN_BUDGET):
+    """
+    Monta o contexto do prompt a partir dos documentos recuperados: remove repetições e sobreposições,
+    mantém a ordem de relevância e respeita o orçamento de tokens. Os blocos são numerados em vez
+    de interpolar a representação da lista (colchetes e aspas).
+
+    Args:
+        documents (list of str): Documentos recuperados, do mais relevante para o menos relevante.
+        token_budget (int): Máximo de tokens do contexto (0 = sem limite).
+
+    Returns:
+        dict: Texto do contexto e estatísticas (tokens, chunks usados, descartados, repetidos e unidos).
+    """
+    blocks, duplicates_removed, chunks_merged = merge_documents(documents)
+
+    selected_blocks = []
+    context_tokens = 0
+    chunks_dropped = 0
+
+    for block in blocks:
+        formatted_block = f"[{len(selected_blocks) + 1}] {block}"
+        block_tokens = count_tokens(formatted_block)
+
+        if token_budget <= 0 or context_tokens + block_tokens <= token_budget:
+            selected_blocks.append(formatted_block)
+            context_tokens += block_tokens
+
+        elif not selected_blocks:
+            # O documento mais relevante sempre entra, cortado ao orçamento
+            formatted_block = truncate_to_tokens(formatted_block, token_budget)
+            selected_blocks.append(formatted_block)
+            context_tokens += count_tokens(formatted_block)
+
+        else:
+            chunks_dropped += 1
+
+    return {
+        "text": "\n\n".join(selected_blocks),
+        "context_tokens": context_tokens,
+        "chunks_received": len(documents),
+        "chunks_used": len(selected_blocks),
+        "chunks_dropped": chunks_dropped,
+        "duplicates_removed": duplicates_removed,
+        "chunks_merged": chunks_merged,
+    }
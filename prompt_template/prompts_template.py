@@ -1,3 +1,5 @@
+from prompt_template.context_builder import build_context
+
 # --------------------------------------------------------------------
 # Função que constrói o template de prompt para o modelo de geração
 # --------------------------------------------------------------------
@@ -5,10 +7,14 @@ def create_prompt_template(query, contexts):
     """
     Constrói o prompt com base no contexto e na pergunta do usuário.
     
-    :param contexts: Textos recuperados dos documentos relevantes.
+    :param contexts: Contexto já montado (str) ou lista de documentos relevantes, montada com `build_context`.
     :param query: Pergunta do usuário.
     :return: String formatada como prompt para o modelo.
     """
+    # Listas de documentos passam pela deduplicação e pelo orçamento de tokens do contexto
+    if not isinstance(contexts, str):
+        contexts = build_context(contexts)["text"]
+
     prompt = f"""
     <task>
     Responda a pergunta do usuário, de acordo com o contexto disponivel. .
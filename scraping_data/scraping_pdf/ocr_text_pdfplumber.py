@@ -1,6 +1,48 @@
 import pdfplumber
-import pandas as pd
 from utils.file_manipulation import create_directory, create_markdown_path
+from utils.page_sharding import map_page_ranges
+
+def extract_page_range(pdf_file, start, end):
+    """
+    Extrai o texto e os metadados de uma faixa de páginas de um PDF (executada em um processo separado).
+
+    Args:
+        pdf_file (str): Caminho do arquivo PDF.
+        start (int): Índice da primeira página (a partir de 0).
+        end (int): Índice final (exclusivo).
+
+    Returns:
+        list[dict]: Texto e metadados de cada página da faixa.
+    """
+    pdf_extractor = PDFExtractorPlumber()
+    extract_metadata = []
+
+    # Abre apenas as páginas da faixa (o pdfplumber numera as páginas a partir de 1)
+    with pdfplumber.open(pdf_file, pages=list(range(start + 1, end + 1))) as pdf_document:
+        for page in pdf_document.pages:
+            page_text = page.extract_text() or ""
+            extract_metadata.append(pdf_extractor.set_pdf_metadata(page_text, pdf_file, page.page_number - 1, page))
+
+            # Libera os objetos de layout em cache da página
+            if hasattr(page, "close"):
+                page.close()
+            else:
+                page.flush_cache()
+
+    return extract_metadata
+
+def get_page_count(pdf_file):
+    """
+    Retorna a quantidade de páginas de um PDF.
+
+    Args:
+        pdf_file (str): Caminho do arquivo PDF.
+
+    Returns:
+        int: Total de páginas do documento.
+    """
+    with pdfplumber.open(pdf_file) as pdf_document:
+        return len(pdf_document.pages)
 
 class PDFExtractorPlumber:
     """
@@ -38,13 +80,14 @@ class PDFExtractorPlumber:
         
         return page_metadata
                             
-    def extract_text_with_metadata(self, pdf_file, output_directory='./outputs/ocr_documents/text_metadata'):
+    def extract_text_with_metadata(self, pdf_file, output_directory='./outputs/ocr_documents/text_metadata', workers=1):
         """
         Extrai o texto de um arquivo PDF, incluindo metadados de cada página, e salva em um arquivo.
 
         Args:
             pdf_file (str): Caminho do arquivo PDF.
             output_directory (str): Diretório onde o arquivo com metadados será salvo.
+            workers (int): Processos usados para extrair faixas de páginas em paralelo (1 = sequencial).
 
         Returns:
             dict: Dicionário contendo o texto e os metadados extraídos.
@@ -53,16 +96,20 @@ class PDFExtractorPlumber:
         pdf_metadata = []
 
         try:
-            # Abre o arquivo PDF usando pdfplumber
-            with pdfplumber.open(pdf_file) as pdf_document:
-                
-                # Itera por cada página do PDF
-                for i, page in enumerate(pdf_document.pages):
-                    # Extrai o texto da página
-                    page_text = page.extract_text()
-                    pdf_metadata.append(self.set_pdf_metadata(page_text, pdf_file, i, page))
-
-                pdf_text = "\n\n".join(page['page_content'] for page in pdf_metadata)
+            if workers > 1:
+                # Divide o documento em faixas de páginas processadas em paralelo
+                pdf_metadata = self.extract_pages_parallel(pdf_file, workers)
+            else:
+                # Abre o arquivo PDF usando pdfplumber
+                with pdfplumber.open(pdf_file) as pdf_document:
+                    
+                    # Itera por cada página do PDF
+                    for i, page in enumerate(pdf_document.pages):
+                        # Extrai o texto da página
+                        page_text = page.extract_text()
+                        pdf_metadata.append(self.set_pdf_metadata(page_text, pdf_file, i, page))
+
+            pdf_text = "\n\n".join(page['page_content'] or "" for page in pdf_metadata)
 
             return {"pdf_text": pdf_text, "pdf_metadata": pdf_metadata}
 
@@ -71,16 +118,17 @@ class PDFExtractorPlumber:
             print(f"Erro ao processar o arquivo {pdf_file}: {error}")
             raise error
 
-    def convert_pdf_to_markdown(self, pdf_file, output_markdown_path='./outputs/ocr_documents/markdown'):
+    def iter_pages(self, pdf_file, output_markdown_path='./outputs/ocr_documents/markdown'):
         """
-        Converte o conteúdo de um arquivo PDF para um arquivo Markdown.
+        Extrai o conteúdo de um arquivo PDF página a página (gerador), gravando o Markdown incrementalmente.
+        Os objetos de layout de cada página são liberados assim que a página é processada.
 
         Args:
             pdf_file (str): Caminho do arquivo PDF.
             output_markdown_path (str): Diretório onde o arquivo Markdown será salvo.
 
-        Returns:
-            dict: Dicionário contendo o caminho do arquivo Markdown e informações extraídas.
+        Yields:
+            dict: Texto e metadados de uma página do PDF.
         """
         # Garante que o diretório de saída existe
         create_directory(output_markdown_path)
@@ -89,24 +137,78 @@ class PDFExtractorPlumber:
             # Cria o caminho do arquivo Markdown
             markdown_path = create_markdown_path(pdf_file, output_markdown_path)
 
-            # Abre o arquivo PDF usando pdfplumber
-            with pdfplumber.open(pdf_file) as pdf_document:
-                markdown_content = []
-                extract_metadata = []
+            # Abre o arquivo PDF e o arquivo Markdown de saída
+            with pdfplumber.open(pdf_file) as pdf_document, \
+                    open(markdown_path, "w", encoding="utf-8") as markdown_file:
 
                 # Itera por cada página do PDF
                 for i, page in enumerate(pdf_document.pages):
-                    page_text = page.extract_text()
-                    extract_metadata.append(self.set_pdf_metadata(page_text, pdf_file, i, page))
-                    markdown_content.append(page_text if page_text else "")
+                    page_text = page.extract_text() or ""
+                    page_metadata = self.set_pdf_metadata(page_text, pdf_file, i, page)
+
+                    # Grava a página no Markdown à medida que é extraída
+                    if i > 0:
+                        markdown_file.write("\n\n")
+                    markdown_file.write(page_text)
 
-                # Salva o conteúdo extraído em um arquivo Markdown
-                with open(markdown_path, "w", encoding="utf-8") as markdown_file:
-                    markdown_file.write("\n\n".join(markdown_content))
+                    # Libera os objetos de layout em cache da página
+                    if hasattr(page, "close"):
+                        page.close()
+                    else:
+                        page.flush_cache()
+
+                    yield page_metadata
 
-            # Define o caminho do arquivo Markdown e as informações extraídas
             print(f"Markdown gerado em: {markdown_path}")
-            
+
+        except Exception as error:
+            print(f"Erro ao processar o arquivo {pdf_file}: {error}")
+            raise error
+
+    def extract_pages_parallel(self, pdf_file, workers=None):
+        """
+        Extrai as páginas de um único PDF em paralelo, dividindo-o em faixas de páginas.
+        Cada processo abre o arquivo de forma independente e as páginas são reunidas em ordem.
+
+        Args:
+            pdf_file (str): Caminho do arquivo PDF.
+            workers (int): Quantidade de processos (padrão: número de CPUs).
+
+        Returns:
+            list[dict]: Texto e metadados de cada página, na ordem do documento.
+        """
+        return map_page_ranges(extract_page_range, pdf_file, get_page_count(pdf_file), workers)
+
+    def convert_pdf_to_markdown(self, pdf_file, output_markdown_path='./outputs/ocr_documents/markdown', workers=1):
+        """
+        Converte o conteúdo de um arquivo PDF para um arquivo Markdown.
+
+        Args:
+            pdf_file (str): Caminho do arquivo PDF.
+            output_markdown_path (str): Diretório onde o arquivo Markdown será salvo.
+            workers (int): Processos usados para extrair faixas de páginas em paralelo (1 = sequencial).
+
+        Returns:
+            list[dict]: Texto e metadados de cada página do PDF.
+        """
+        if workers <= 1:
+            # Consome o gerador de páginas por completo
+            return list(self.iter_pages(pdf_file, output_markdown_path))
+
+        # Garante que o diretório de saída existe
+        create_directory(output_markdown_path)
+
+        try:
+            # Extrai as faixas de páginas em paralelo
+            extract_metadata = self.extract_pages_parallel(pdf_file, workers)
+
+            # Salva o conteúdo extraído em um arquivo Markdown
+            markdown_path = create_markdown_path(pdf_file, output_markdown_path)
+            with open(markdown_path, "w", encoding="utf-8") as markdown_file:
+                markdown_file.write("\n\n".join(page["page_content"] for page in extract_metadata))
+
+            print(f"Markdown gerado em: {markdown_path}")
+
             return extract_metadata
 
         except Exception as error:
@@ -185,6 +287,9 @@ class PDFExtractorPlumber:
         Returns:
             pd.DataFrame: Dados da tabela organizados em um DataFrame do Pandas.
         """
+        # O pandas só é carregado quando tabelas são extraídas
+        import pandas as pd
+
         if raw_table:
             return pd.DataFrame(raw_table[1:], columns=raw_table[0])
         return pd.DataFrame()
@@ -4,6 +4,28 @@ import fitz  # PyMuPDF
 import pymupdf4llm
 import pathlib
 from utils.file_manipulation import create_directory, create_markdown_path, create_image_path
+from utils.page_sharding import map_page_ranges
+
+def extract_page_range(pdf_file, start, end):
+    """
+    Extrai o texto e os metadados de uma faixa de páginas de um PDF (executada em um processo separado).
+
+    Args:
+        pdf_file (str): Caminho do arquivo PDF.
+        start (int): Índice da primeira página (a partir de 0).
+        end (int): Índice final (exclusivo).
+
+    Returns:
+        list[dict]: Texto e metadados de cada página da faixa.
+    """
+    pdf_extractor = PDFExtractor()
+
+    # Cada processo abre o documento de forma independente
+    with fitz.open(pdf_file) as doc:
+        return [
+            pdf_extractor.set_pdf_metadata(doc[page_num].get_text(), page_num, pdf_file)
+            for page_num in range(start, end)
+        ]
 
 class PDFExtractor:
     
@@ -36,12 +58,13 @@ class PDFExtractor:
         
         return page_metadata
     
-    def extract_text_with_metadata(self, pdf_file):
+    def extract_text_with_metadata(self, pdf_file, workers=1):
         """
         Extrai texto de um arquivo PDF usando a biblioteca PyMuPDF.
 
         Args:
             pdf_file (str): Caminho do arquivo PDF.
+            workers (int): Processos usados para extrair faixas de páginas em paralelo (1 = sequencial).
 
         Returns:
             str: Texto extraído do PDF ou mensagem de erro em caso de falha.
@@ -50,16 +73,23 @@ class PDFExtractor:
             # Abre o arquivo PDF usando PyMuPDF
             doc = fitz.open(pdf_file)
             extract_metadata = []  # Lista para armazenar as informações extraídas
-            all_text = ""
 
-            # Itera sobre cada página do PDF e extrai o texto
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-                all_text += page.get_text()
-                extract_metadata.append(self.set_pdf_metadata(page.get_text(), page_num, pdf_file))
-
-            # Fecha o arquivo PDF
-            doc.close()
+            if workers > 1:
+                # Divide o documento em faixas de páginas processadas em paralelo
+                page_count = doc.page_count
+                doc.close()
+                extract_metadata = map_page_ranges(extract_page_range, pdf_file, page_count, workers)
+            else:
+                # Itera sobre cada página do PDF e extrai o texto (uma única vez por página)
+                for page_num in range(doc.page_count):
+                    page_text = doc[page_num].get_text()
+                    extract_metadata.append(self.set_pdf_metadata(page_text, page_num, pdf_file))
+
+                # Fecha o arquivo PDF
+                doc.close()
+
+            # Junta o texto de todas as páginas de uma só vez
+            all_text = "".join(page["page_content"] for page in extract_metadata)
             return {"pdf_text" : all_text, "extract_metadata": extract_metadata}
         
         except fitz.EmptyFileError as e:
@@ -93,28 +123,7 @@ class PDFExtractor:
 
             # Itera sobre cada página do PDF
             for page_num in range(doc.page_count):
-                page = doc[page_num]
-                image_list = page.get_images(full=True)  # Obtém as imagens da página
-
-                # Itera sobre cada imagem encontrada na página
-                for image_index, img in enumerate(image_list):
-                    xref = img[0]  # Referência à imagem no PDF
-                    base_image = doc.extract_image(xref)  # Extrai a imagem
-                    image_bytes = base_image["image"]  # Conteúdo binário da imagem
-                    image_ext = base_image["ext"]  # Extensão do arquivo de imagem
-
-                    # Define o nome do arquivo de imagem baseado no PDF e na página
-                    image_filename = create_image_path(pdf_file, page_num, image_index, image_ext)
-
-                    # Define o caminho do arquivo de imagem
-                    path_image = os.path.join(output_image_path, image_filename)
-
-                    # Salva a imagem em um arquivo
-                    with open(path_image, "wb") as image_file:
-                        image_file.write(image_bytes)
-
-                    # Adiciona o nome da imagem à lista
-                    images.append(path_image)
+                images.extend(self.extract_page_images(doc, doc[page_num], page_num, pdf_file, output_image_path))
 
             # Fecha o arquivo PDF
             doc.close()
@@ -146,17 +155,7 @@ class PDFExtractor:
 
             # Itera sobre cada página do PDF
             for page_num in range(doc.page_count):
-                page = doc[page_num]
-                link_list = page.get_links()  # Obtém os links da página
-
-                # Itera sobre cada link encontrado na página
-                for link in link_list:
-                    link_url = link["uri"]  # URL do link
-                    link_rect = link["rect"]  # Coordenadas do link
-                    link_page = page_num + 1  # Página do link
-
-                    # Adiciona o link à lista
-                    links.append({"url": link_url, "page": link_page, "rect": link_rect})
+                links.extend(self.extract_page_links(doc[page_num], page_num))
 
             # Fecha o arquivo PDF
             doc.close()
@@ -185,12 +184,7 @@ class PDFExtractor:
 
             # Itera sobre cada página do PDF
             for page_num in range(doc.page_count):
-                page = doc[page_num]
-                table_list = page.find_tables()  # Obtém as tabelas da página
-
-                # Itera sobre cada tabela encontrada na página
-                for table in table_list:
-                    tables.append(table)
+                tables.extend(doc[page_num].find_tables())  # Obtém as tabelas da página
 
             # Fecha o arquivo PDF
             doc.close()
@@ -206,6 +200,102 @@ class PDFExtractor:
             print(f"Erro ao processar o arquivo {pdf_file}: {e}")
             raise
 
+    def extract_page_images(self, doc, page, page_num, pdf_file, output_image_path):
+        """
+        Extrai e salva as imagens embutidas em uma página do PDF.
+
+        Args:
+            doc (fitz.Document): Documento PDF aberto.
+            page (fitz.Page): Página do documento.
+            page_num (int): Índice da página (a partir de 0).
+            pdf_file (str): Caminho do arquivo PDF.
+            output_image_path (str): Diretório onde as imagens serão salvas.
+
+        Returns:
+            list: Caminhos das imagens salvas.
+        """
+        images = []
+
+        # Itera sobre cada imagem encontrada na página
+        for image_index, img in enumerate(page.get_images(full=True)):
+            xref = img[0]  # Referência à imagem no PDF
+            base_image = doc.extract_image(xref)  # Extrai a imagem
+            image_bytes = base_image["image"]  # Conteúdo binário da imagem
+            image_ext = base_image["ext"]  # Extensão do arquivo de imagem
+
+            # Define o nome do arquivo de imagem baseado no PDF e na página
+            image_filename = create_image_path(pdf_file, page_num, image_index, image_ext)
+
+            # Define o caminho do arquivo de imagem
+            path_image = os.path.join(output_image_path, image_filename)
+
+            # Salva a imagem em um arquivo
+            with open(path_image, "wb") as image_file:
+                image_file.write(image_bytes)
+
+            # Adiciona o nome da imagem à lista
+            images.append(path_image)
+
+        return images
+
+    def extract_page_links(self, page, page_num):
+        """
+        Extrai os links de uma página do PDF.
+
+        Args:
+            page (fitz.Page): Página do documento.
+            page_num (int): Índice da página (a partir de 0).
+
+        Returns:
+            list: Links da página com URL, número da página e coordenadas.
+        """
+        # Links internos (sem URI) são mantidos com URL None
+        return [
+            {"url": link.get("uri"), "page": page_num + 1, "rect": link["rect"]}
+            for link in page.get_links()
+        ]
+
+    def render_page_image(self, page, page_num, pdf_file, directory):
+        """
+        Gera uma imagem PNG de uma página do PDF.
+
+        Args:
+            page (fitz.Page): Página do documento.
+            page_num (int): Índice da página (a partir de 0).
+            pdf_file (str): Caminho do arquivo PDF.
+            directory (str): Diretório onde a imagem será salva.
+
+        Returns:
+            str: Caminho da imagem gerada.
+        """
+        # Define o nome do arquivo de imagem baseado no PDF e na página
+        image_filename = create_image_path(pdf_file, page_num, None, 'png')
+        image_path = os.path.join(directory, image_filename)
+
+        # Gera e salva a imagem da página
+        page.get_pixmap().save(image_path)
+
+        return image_path
+
+    def save_markdown(self, md_text, output_markdown_path):
+        """
+        Salva o texto Markdown extraído no diretório de saída.
+
+        Args:
+            md_text (str): Texto em Markdown.
+            output_markdown_path (str): Diretório onde o arquivo Markdown será salvo.
+
+        Returns:
+            pathlib.Path: Caminho do arquivo Markdown salvo.
+        """
+        # Define o caminho do arquivo Markdown de saída
+        markdown_path = pathlib.Path(output_markdown_path) / "document_pymupdf.md"
+
+        # Salva o conteúdo Markdown no arquivo
+        markdown_path.write_bytes(md_text.encode('utf-8'))
+
+        return markdown_path
+
     def convert_pdf_to_markdown(self, pdf_file, output_markdown_path='./outputs/ocr_documents/markdown'):
         """
         Converte um arquivo PDF em um arquivo Markdown.
@@ -224,11 +314,8 @@ class PDFExtractor:
             # Converte o PDF para Markdown usando pymupdf4llm
             md_text = pymupdf4llm.to_markdown(pdf_file)
 
-            # Define o caminho do arquivo Markdown de saída
-            markdown_path = pathlib.Path(output_markdown_path) / "document_pymupdf.md"
-
             # Salva o conteúdo Markdown no arquivo
-            markdown_path.write_bytes(md_text.encode('utf-8'))
+            self.save_markdown(md_text, output_markdown_path)
 
             return md_text
         
@@ -259,20 +346,7 @@ class PDFExtractor:
 
             # Itera sobre cada página do PDF
             for page_num in range(doc.page_count):
-                page = doc[page_num]
-
-                # Gera uma imagem da página
-                image = page.get_pixmap()
-
-                # Define o nome do arquivo de imagem baseado no PDF e na página
-                image_filename = create_image_path(pdf_file, page_num, None, 'png')
-                image_path = os.path.join(directory, image_filename)
-
-                # Salva a imagem em um arquivo
-                image.save(image_path)
-
-                # Adiciona o nome da imagem à lista
-                image_filenames.append(image_path)
+                image_filenames.append(self.render_page_image(doc[page_num], page_num, pdf_file, directory))
 
             # Fecha o arquivo PDF
             doc.close()
@@ -288,46 +362,93 @@ class PDFExtractor:
             print(f"Erro ao processar o arquivo {pdf_file}: {e}")
             raise e
 
-    def extract_all(self, pdf_file):
+    def extract_all(self, pdf_file, extract_text=True, extract_images=True, extract_links=True,
+                    extract_tables=True, convert_markdown=True, render_pages=True,
+                    output_image_path='./outputs/ocr_documents/images',
+                    output_markdown_path='./outputs/ocr_documents/markdown',
+                    page_image_directory='./data/images/'):
         """
-        Executa todas as funções de extração de um arquivo PDF e retorna um dicionário com os resultados.
+        Executa as extrações selecionadas de um arquivo PDF em uma única passada:
+        o documento é aberto uma vez e cada página é visitada uma única vez.
+        A exceção é o Markdown: o pymupdf4llm faz a própria análise de layout de todas as páginas,
+        uma segunda passada sobre o documento (desative `convert_markdown` quando ele não for usado).
 
         Args:
             pdf_file (str): Caminho do arquivo PDF.
+            extract_text (bool): Extrai o texto e os metadados de cada página.
+            extract_images (bool): Extrai as imagens embutidas nas páginas.
+            extract_links (bool): Extrai os links das páginas.
+            extract_tables (bool): Localiza as tabelas das páginas.
+            convert_markdown (bool): Converte o documento para Markdown (pymupdf4llm, em uma segunda passada).
+            render_pages (bool): Gera uma imagem PNG de cada página.
+            output_image_path (str): Diretório das imagens extraídas.
+            output_markdown_path (str): Diretório do arquivo Markdown.
+            page_image_directory (str): Diretório das imagens das páginas.
 
         Returns:
             dict: Dicionário com os resultados da extração.
         """
-        
+        # Garante que os diretórios de saída solicitados existem
+        if extract_images:
+            create_directory(output_image_path)
+        if convert_markdown:
+            create_directory(output_markdown_path)
+        if render_pages:
+            create_directory(page_image_directory)
+
+        text_metadata = []
+        extracted_images = []
+        links = []
+        tables = []
+        page_images = []
+        markdown_text = None
+
         try:
-            # Extrai o texto do PDF
-            text = self.extract_text_with_metadata(pdf_file)
+            # Abre o arquivo PDF uma única vez
+            with fitz.open(pdf_file) as doc:
+
+                # Visita cada página uma única vez, gerando apenas os artefatos solicitados
+                for page_num, page in enumerate(doc):
+                    if extract_text:
+                        text_metadata.append(self.set_pdf_metadata(page.get_text(), page_num, pdf_file))
+
+                    if extract_images:
+                        extracted_images.extend(self.extract_page_images(doc, page, page_num, pdf_file, output_image_path))
 
-            # Extrai imagens do PDF
-            images = self.extract_images_pdf(pdf_file)
+                    if extract_links:
+                        links.extend(self.extract_page_links(page, page_num))
 
-            # Extrai links do PDF
-            links = self.extract_links_pdf(pdf_file)
+                    if extract_tables:
+                        tables.extend(page.find_tables())
 
-            # Extrai tabelas do PDF
-            tables = self.extract_tables_pdf(pdf_file)
+                    if render_pages:
+                        page_images.append(self.render_page_image(page, page_num, pdf_file, page_image_directory))
 
-            # Converte o PDF para Markdown
-            markdown_text = self.convert_pdf_to_markdown(pdf_file)
-            
-            # Converte o PDF para imagens
-            images = self.convert_pdf_to_image(pdf_file)
+                # Converte o documento já aberto para Markdown (sem reabrir o arquivo). O pymupdf4llm
+                # percorre e analisa novamente todas as páginas: o texto extraído acima não tem a estrutura
+                # (títulos, listas, tabelas) necessária para montar o Markdown
+                if convert_markdown:
+                    markdown_text = pymupdf4llm.to_markdown(doc)
+                    self.save_markdown(markdown_text, output_markdown_path)
 
             # Retorna um dicionário com os resultados
             return {
-                'page_content': text["pdf_text"],
+                'page_content': "".join(page["page_content"] for page in text_metadata),
                 'metadata' : {
-                    "path_images": images,
+                    "path_images": page_images,
+                    "extracted_images": extracted_images,
                     "tables": tables,
                     "links": links,
-                    "markdown_text": markdown_text
+                    "markdown_text": markdown_text,
+                    "pages": text_metadata
                 } 
             }
+        
+        except fitz.EmptyFileError as e:
+            # Trata erro caso o arquivo esteja vazio ou corrompido
+            print(f"Erro: O arquivo {pdf_file} está vazio ou corrompido.")
+            raise e
+
         except Exception as e:
             # Trata erros durante a extração
             print(f"Erro ao processar o arquivo {pdf_file}: {e}")
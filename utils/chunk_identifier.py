@@ -0,0 +1,14 @@
+import uuid
+
+def create_chunk_id(page_content):
+    """
+    Gera um identificador determinístico (uuid5) a partir do conteúdo de um chunk.
+    Chunks com o mesmo texto sempre recebem o mesmo identificador.
+
+    Args:
+        page_content (str): Texto do chunk.
+
+    Returns:
+        str: Identificador do chunk.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, page_content))
@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import threading
+from bisect import bisect_left
+from dotenv import load_dotenv
+
+# Carregamento das variáveis de ambiente
+load_dotenv()
+
+# Ativa a coleta de métricas (desativada, cada chamada retorna imediatamente)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Limites dos buckets dos histogramas de quantidade de tokens
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+def format_labels(labels, extra=None):
+    """
+    Formata os rótulos no padrão do Prometheus: {chave="valor",...}.
+    """
+    items = list(labels) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{str(value)}"' for key, value in items) + "}"
+
+class Timer:
+    """
+    Context manager que mede a duração do bloco e a registra em um histograma.
+    """
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.observe(self.name, time.perf_counter() - self.start, self.labels)
+        if exc_type is not None:
+            self.registry.increment(f"{self.name}_errors_total", 1, self.labels)
+        return False
+
+class NullTimer:
+    """
+    Timer sem efeito, usado quando as métricas estão desativadas.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+# Instância única reutilizada por todas as medições desativadas
+NULL_TIMER = NullTimer()
+
+class MetricsRegistry:
+    """
+    Registro de métricas do processo: contadores, histogramas e timers (histogramas de duração).
+    Exporta no formato de texto do Prometheus ou em JSON lines.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED, buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            enabled (bool): Ativa a coleta das métricas.
+            buckets (tuple): Limites superiores dos buckets dos histogramas.
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name, amount=1, labels=None):
+        """
+        Incrementa um contador.
+
+        Args:
+            name (str): Nome da métrica (ex.: "rag_requests_total").
+            amount (float): Valor somado ao contador.
+            labels (dict): Rótulos da série (opcional).
+        """
+        if not self.enabled:
+            return
+
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, labels=None, buckets=None):
+        """
+        Registra um valor em um histograma.
+
+        Args:
+            name (str): Nome da métrica (ex.: "rag_retrieve_seconds").
+            value (float): Valor observado.
+            labels (dict): Rótulos da série (opcional).
+            buckets (tuple): Limites dos buckets, usados na criação da série (padrão: os do registro).
+        """
+        if not self.enabled:
+            return
+
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                bounds = tuple(buckets or self.buckets)
+                histogram = self.histograms[key] = {"bounds": bounds, "buckets": [0] * (len(bounds) + 1), "sum": 0.0, "count": 0}
+
+            histogram["buckets"][bisect_left(histogram["bounds"], value)] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def timer(self, name, labels=None):
+        """
+        Mede a duração de um bloco (em segundos) e a registra no histograma `name`.
+        Exceções dentro do bloco também incrementam `<name>_errors_total`.
+
+            with metrics.timer("rag_retrieve_seconds"):
+                ...
+
+        Args:
+            name (str): Nome do histograma.
+            labels (dict): Rótulos da série (opcional).
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name, labels)
+
+    def export_prometheus(self):
+        """
+        Exporta as métricas no formato de texto do Prometheus.
+
+        Returns:
+            str: Métricas no formato de exposição do Prometheus.
+        """
+        lines = []
+        declared = set()
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in declared:
+                    lines.append(f"# TYPE {name} counter")
+                    declared.add(name)
+                lines.append(f"{name}{format_labels(labels)} {value}")
+
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in declared:
+                    lines.append(f"# TYPE {name} histogram")
+                    declared.add(name)
+
+                # Os buckets do Prometheus são cumulativos
+                cumulative = 0
+                for upper_bound, bucket_count in zip(histogram["bounds"] + ("+Inf",), histogram["buckets"]):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{format_labels(labels, {'le': upper_bound})} {cumulative}")
+
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram['sum']}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def export_json_lines(self):
+        """
+        Exporta as métricas em JSON lines (um objeto por série), prontas para ingestão em logs.
+
+        Returns:
+            str: Uma linha JSON por contador ou histograma.
+        """
+        timestamp = time.time()
+        lines = []
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(json.dumps({
+                    "timestamp": timestamp, "metric": name, "type": "counter", "labels": dict(labels), "value": value,
+                }))
+
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                lines.append(json.dumps({
+                    "timestamp": timestamp,
+                    "metric": name,
+                    "type": "histogram",
+                    "labels": dict(labels),
+                    "count": histogram["count"],
+                    "sum": histogram["sum"],
+                    "mean": histogram["sum"] / histogram["count"],
+                    "buckets": dict(zip([str(bound) for bound in histogram["bounds"]] + ["+Inf"], histogram["buckets"])),
+                }))
+
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def write_prometheus(self, path):
+        """
+        Grava as métricas no formato do Prometheus (ex.: para o textfile collector do node_exporter).
+        """
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.export_prometheus())
+        os.replace(temporary_path, path)
+
+    def write_json_lines(self, path):
+        """
+        Acrescenta um retrato das métricas a um arquivo JSON lines.
+        """
+        with open(path, "a", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.export_json_lines())
+
+    def reset(self):
+        """
+        Descarta todas as métricas registradas.
+        """
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+# Registro de métricas compartilhado pelo processo
+metrics = MetricsRegistry()
@@ -0,0 +1,227 @@
+import argparse
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Dimensão padrão dos embeddings gerados pelo servidor de teste
+STUB_EMBEDDING_DIMENSION = 256
+
+def stub_embedding(text, dimension=STUB_EMBEDDING_DIMENSION):
+    """
+    Gera um embedding determinístico para um texto (bag-of-words com hashing).
+    Textos com palavras em comum geram vetores próximos, o que permite testar buscas.
+
+    Args:
+        text (str): Texto de entrada.
+        dimension (int): Dimensão do vetor gerado.
+
+    Returns:
+        list: Vetor normalizado de tamanho `dimension`.
+    """
+    vector = [0.0] * dimension
+
+    # Cada palavra contribui para uma posição do vetor definida pelo seu hash
+    for token in re.findall(r"\w+", text.lower()):
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % dimension
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[index] += sign
+
+    # Normaliza o vetor (textos vazios recebem um vetor unitário fixo)
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        vector[0] = 1.0
+        return vector
+
+    return [value / norm for value in vector]
+
+def stub_completion_tokens(prompt):
+    """
+    Gera a resposta determinística do servidor de teste, dividida em tokens.
+
+    Args:
+        prompt (str): Texto de entrada do modelo.
+
+    Returns:
+        list: Tokens da resposta (palavras seguidas de espaço).
+    """
+    question = " ".join(prompt.split())[:60]
+    return [f"{word} " for word in f"Resposta simulada para: {question}".split()]
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+    """
+    Handler HTTP que imita os endpoints de embedding e geração da API do Ollama.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Silencia o log padrão de cada requisição
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b"{}"
+        return json.loads(body or b"{}")
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, messages):
+        """
+        Envia uma resposta NDJSON em streaming (transfer-encoding chunked), como o Ollama.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for message in messages:
+            body = json.dumps(message).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(body):X}\r\n".encode("ascii") + body + b"\r\n")
+            self.wfile.flush()
+
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _generate_messages(self, payload, build_message):
+        """
+        Gera as mensagens de uma resposta de geração, aplicando a latência entre tokens.
+        """
+        server = self.server
+        created_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        start = time.perf_counter_ns()
+
+        for index, token in enumerate(self.completion_tokens):
+            if index and server.token_latency:
+                time.sleep(server.token_latency)
+            yield {"model": payload.get("model"), "created_at": created_at, **build_message(token), "done": False}
+
+        yield {
+            "model": payload.get("model"),
+            "created_at": created_at,
+            **build_message(""),
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": time.perf_counter_ns() - start,
+            "eval_count": len(self.completion_tokens),
+        }
+
+    def _send_generation(self, payload, build_message):
+        """
+        Responde a uma requisição de geração em streaming ou em uma única mensagem.
+        """
+        messages = self._generate_messages(payload, build_message)
+
+        if payload.get("stream", True):
+            return self._send_stream(messages)
+
+        # Sem streaming: agrega os tokens em uma única resposta
+        messages = list(messages)
+        final_message = messages[-1]
+        content = "".join(self.completion_tokens)
+        final_message.update(build_message(content))
+        return self._send_json(final_message)
+
+    def do_GET(self):
+        if self.path == "/api/version":
+            return self._send_json({"version": "stub"})
+
+        if self.path == "/api/tags":
+            return self._send_json({"models": []})
+
+        return self._send_json({"error": f"rota não encontrada: {self.path}"}, status=404)
+
+    def do_POST(self):
+        payload = self._read_json()
+        server = self.server
+
+        # Simula a latência de rede/modelo configurada no servidor
+        if server.latency:
+            time.sleep(server.latency)
+
+        with server.stats_lock:
+            server.request_count += 1
+
+        # Endpoint em lote (/api/embed), aceita string ou lista de strings
+        if self.path == "/api/embed":
+            texts = payload.get("input", [])
+            if isinstance(texts, str):
+                texts = [texts]
+
+            embeddings = [stub_embedding(text, server.dimension) for text in texts]
+            return self._send_json({"model": payload.get("model"), "embeddings": embeddings})
+
+        # Endpoint legado (/api/embeddings), um texto por requisição
+        if self.path == "/api/embeddings":
+            embedding = stub_embedding(payload.get("prompt", ""), server.dimension)
+            return self._send_json({"embedding": embedding})
+
+        # Geração de texto (/api/generate), com ou sem streaming
+        if self.path == "/api/generate":
+            self.completion_tokens = stub_completion_tokens(payload.get("prompt", ""))
+            return self._send_generation(payload, lambda content: {"response": content})
+
+        # Chat (/api/chat), com ou sem streaming
+        if self.path == "/api/chat":
+            messages = payload.get("messages") or [{}]
+            self.completion_tokens = stub_completion_tokens(messages[-1].get("content", ""))
+            return self._send_generation(
+                payload, lambda content: {"message": {"role": "assistant", "content": content}}
+            )
+
+        return self._send_json({"error": f"rota não encontrada: {self.path}"}, status=404)
+
+def start_stub_server(host="127.0.0.1", port=0, latency=0.0, dimension=STUB_EMBEDDING_DIMENSION, token_latency=0.0):
+    """
+    Inicia o servidor de teste em uma thread em segundo plano.
+
+    Args:
+        host (str): Endereço de escuta.
+        port (int): Porta de escuta (0 escolhe uma porta livre).
+        latency (float): Latência artificial, em segundos, aplicada a cada requisição.
+        dimension (int): Dimensão dos embeddings gerados.
+        token_latency (float): Intervalo, em segundos, entre os tokens gerados.
+
+    Returns:
+        ThreadingHTTPServer: Servidor em execução (use `server.url` como host do Ollama).
+    """
+    server = ThreadingHTTPServer((host, port), OllamaStubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.dimension = dimension
+    server.token_latency = token_latency
+    server.request_count = 0
+    server.stats_lock = threading.Lock()
+    server.url = f"http://{host}:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API de embeddings e geração do Ollama.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--dimension", type=int, default=STUB_EMBEDDING_DIMENSION)
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stub_server = start_stub_server(args.host, args.port, args.latency, args.dimension, args.token_latency)
+    print(f"Servidor de teste do Ollama em execução: {stub_server.url}")
+    print(f"Use OLLAMA_HOST={stub_server.url} para apontar o cliente para ele.")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub_server.shutdown()
@@ -0,0 +1,89 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Quantidade de faixas de páginas criadas por processo (melhora o balanceamento de carga)
+SHARDS_PER_WORKER = 4
+
+# Quantidade mínima de páginas por faixa
+MIN_PAGES_PER_SHARD = 8
+
+def split_page_ranges(page_count, shard_count):
+    """
+    Divide as páginas de um documento em faixas contíguas de tamanho semelhante.
+
+    Args:
+        page_count (int): Total de páginas do documento.
+        shard_count (int): Quantidade desejada de faixas.
+
+    Returns:
+        list of tuple: Faixas (início, fim) com índices a partir de 0, fim exclusivo.
+    """
+    shard_count = max(1, min(shard_count, page_count))
+    shard_size, remainder = divmod(page_count, shard_count)
+
+    page_ranges = []
+    start = 0
+    for shard_index in range(shard_count):
+        end = start + shard_size + (1 if shard_index < remainder else 0)
+        if end > start:
+            page_ranges.append((start, end))
+        start = end
+
+    return page_ranges
+
+def submit_page_ranges(executor, worker_function, pdf_file, page_count, pages_per_shard=MIN_PAGES_PER_SHARD):
+    """
+    Envia as faixas de páginas de um PDF a um pool de processos já criado, sem esperar os resultados:
+    quem consome os futures em ordem recebe as páginas à medida que cada faixa termina.
+
+    Args:
+        executor (ProcessPoolExecutor): Pool de processos que extrai as faixas.
+        worker_function (callable): Função de nível de módulo `(pdf_file, start, end) -> resultado`.
+        pdf_file (str): Caminho do arquivo PDF.
+        page_count (int): Total de páginas do documento.
+        pages_per_shard (int): Quantidade aproximada de páginas por faixa.
+
+    Returns:
+        list of Future: Um future por faixa, na ordem das páginas.
+    """
+    if page_count == 0:
+        return []
+
+    page_ranges = split_page_ranges(page_count, max(1, page_count // pages_per_shard))
+    return [executor.submit(worker_function, pdf_file, start, end) for start, end in page_ranges]
+
+def map_page_ranges(worker_function, pdf_file, page_count, workers=None):
+    """
+    Processa um PDF em paralelo, por faixas de páginas, em um pool de processos.
+    Cada processo abre o arquivo de forma independente; os resultados são reunidos na ordem das páginas.
+
+    Args:
+        worker_function (callable): Função de nível de módulo `(pdf_file, start, end) -> list`.
+        pdf_file (str): Caminho do arquivo PDF.
+        page_count (int): Total de páginas do documento.
+        workers (int): Quantidade de processos (padrão: número de CPUs).
+
+    Returns:
+        list: Resultados de todas as páginas, na ordem original.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if page_count == 0:
+        return []
+
+    # Faixas suficientes para balancear a carga sem criar faixas pequenas demais
+    shard_count = min(workers * SHARDS_PER_WORKER, max(1, page_count // MIN_PAGES_PER_SHARD))
+    page_ranges = split_page_ranges(page_count, shard_count)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(page_ranges))) as executor:
+        # `map` preserva a ordem das faixas, mantendo as páginas em ordem
+        for shard_result in executor.map(
+            worker_function,
+            [pdf_file] * len(page_ranges),
+            [start for start, _ in page_ranges],
+            [end for _, end in page_ranges],
+        ):
+            results.extend(shard_result)
+
+    return results
@@ -1,7 +1,4 @@
 import os
-from scraping_data.scraping_pdf.ocr_text_pdfplumber import PDFExtractorPlumber
-
-pdf_extractor = PDFExtractorPlumber()
 
 def each_pdf_in_folder(path):
     """
@@ -13,6 +10,10 @@ def each_pdf_in_folder(path):
     Returns:
         dict: Um dicionário com o nome do PDF como chave e o texto extraído como valor.
     """
+    # O extrator (e o pdfplumber) só é carregado quando PDFs são convertidos
+    from scraping_data.scraping_pdf.ocr_text_pdfplumber import PDFExtractorPlumber
+
+    pdf_extractor = PDFExtractorPlumber()
     pdf_texts = {}
 
     if os.path.isfile(path):  # Caso seja um arquivo único
@@ -0,0 +1,176 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+def empty_stage_stats():
+    """
+    Cria o registro vazio de uma etapa.
+    """
+    return {"calls": 0, "items": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_memory_bytes": 0}
+
+class StageProfiler:
+    """
+    Mede cada etapa de um processamento (tempo real, tempo de CPU, itens processados
+    e pico de memória alocada pelo Python), agrupando por arquivo.
+    Quando desativado, as medições não fazem nada.
+    """
+
+    def __init__(self, enabled=True):
+        """
+        Args:
+            enabled (bool): Ativa as medições (o pico de memória usa o tracemalloc, que deixa o Python mais lento).
+        """
+        self.enabled = enabled
+        self.files = {}
+        self.active_stages = []
+        self.started_tracemalloc = False
+
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+
+    def get_stage_stats(self, file_path, stage_name):
+        """
+        Retorna (criando se necessário) o registro de uma etapa de um arquivo.
+        """
+        file_stats = self.files.setdefault(file_path, {"stages": {}})
+        return file_stats["stages"].setdefault(stage_name, empty_stage_stats())
+
+    def start_measure(self):
+        """
+        Inicia uma medição, preservando o pico de memória das etapas externas em andamento.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+
+        # O pico é global: antes de reiniciá-lo, repassa o valor às etapas que ainda estão abertas
+        for stage_stats, baseline in self.active_stages:
+            stage_stats["peak_memory_bytes"] = max(stage_stats["peak_memory_bytes"], peak - baseline)
+
+        tracemalloc.reset_peak()
+        return time.perf_counter(), time.process_time(), current
+
+    def finish_measure(self, stage_stats, start, items, calls=1):
+        """
+        Encerra uma medição e acumula os valores no registro da etapa.
+        """
+        wall_start, cpu_start, memory_start = start
+        _, peak = tracemalloc.get_traced_memory()
+
+        stage_stats["calls"] += calls
+        stage_stats["items"] += items
+        stage_stats["wall_seconds"] += time.perf_counter() - wall_start
+        stage_stats["cpu_seconds"] += time.process_time() - cpu_start
+        stage_stats["peak_memory_bytes"] = max(stage_stats["peak_memory_bytes"], peak - memory_start)
+
+    @contextmanager
+    def stage(self, stage_name, file_path=None):
+        """
+        Mede um bloco como uma etapa. O registro retornado aceita a contagem de itens:
+
+            with profiler.stage("chunking", pdf_file) as stage:
+                chunks = split(pages)
+                stage["items"] = len(chunks)
+
+        Args:
+            stage_name (str): Nome da etapa.
+            file_path (str): Arquivo processado (None agrupa em "total").
+        """
+        measured = {"items": 0}
+        if not self.enabled:
+            yield measured
+            return
+
+        stage_stats = self.get_stage_stats(file_path or "total", stage_name)
+        start = self.start_measure()
+        self.active_stages.append((stage_stats, start[2]))
+        try:
+            yield measured
+        finally:
+            self.active_stages.pop()
+            self.finish_measure(stage_stats, start, measured["items"])
+
+    def iterate(self, iterable, stage_name, file_path=None):
+        """
+        Mede o tempo gasto para produzir cada item de um iterável (ex.: páginas de um gerador),
+        atribuindo à etapa apenas o tempo dentro do iterável, e não o de quem consome os itens.
+
+        Args:
+            iterable (iterable): Iterável a ser medido.
+            stage_name (str): Nome da etapa.
+            file_path (str): Arquivo processado.
+
+        Yields:
+            object: Os itens do iterável, sem alteração.
+        """
+        if not self.enabled:
+            yield from iterable
+            return
+
+        stage_stats = self.get_stage_stats(file_path or "total", stage_name)
+        iterator = iter(iterable)
+
+        while True:
+            start = self.start_measure()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                # Uma passada completa pelo iterável conta como uma chamada
+                self.finish_measure(stage_stats, start, 0)
+                return
+
+            self.finish_measure(stage_stats, start, 1, calls=0)
+            yield item
+
+    def set_file_wall_seconds(self, file_path, wall_seconds):
+        """
+        Registra o tempo total de processamento de um arquivo.
+        """
+        if self.enabled:
+            self.files.setdefault(file_path, {"stages": {}})["wall_seconds"] = wall_seconds
+
+    def get_report(self):
+        """
+        Monta o relatório estruturado: etapas por arquivo e o total de cada etapa.
+
+        Returns:
+            dict: Relatório com as chaves "files" e "totals".
+        """
+        totals = {}
+        for file_stats in self.files.values():
+            for stage_name, stage_stats in file_stats["stages"].items():
+                total = totals.setdefault(stage_name, empty_stage_stats())
+                for key in ("calls", "items", "wall_seconds", "cpu_seconds"):
+                    total[key] += stage_stats[key]
+                total["peak_memory_bytes"] = max(total["peak_memory_bytes"], stage_stats["peak_memory_bytes"])
+
+        for stage_stats in totals.values():
+            stage_stats["items_per_second"] = (
+                stage_stats["items"] / stage_stats["wall_seconds"] if stage_stats["wall_seconds"] else 0.0
+            )
+
+        return {"files": self.files, "totals": totals}
+
+    def save_report(self, report_path):
+        """
+        Salva o relatório em JSON.
+
+        Args:
+            report_path (str): Caminho do arquivo JSON.
+        """
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            json.dump(self.get_report(), report_file, indent=2, ensure_ascii=False)
+
+    def reset(self):
+        """
+        Descarta as medições registradas.
+        """
+        self.files = {}
+
+    def close(self):
+        """
+        Encerra o tracemalloc, se foi iniciado por este profiler.
+        """
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
@@ -0,0 +1,120 @@
+import os
+import re
+import math
+from functools import lru_cache
+from dotenv import load_dotenv
+
+# Carregamento das variáveis de ambiente
+load_dotenv()
+
+# Tokenizer do Hugging Face usado na contagem (ex.: "meta-llama/Llama-3.2-1B"); vazio usa a estimativa
+TOKENIZER_NAME = os.getenv('TOKENIZER_NAME', '')
+
+# Tokenizer do modelo de embeddings (ex.: "nomic-ai/nomic-embed-text-v1.5"), usado no tamanho dos chunks;
+# não herda TOKENIZER_NAME: o tokenizer do LLM divide o texto de forma diferente do modelo de embeddings
+EMBEDDING_TOKENIZER_NAME = os.getenv('EMBEDDING_TOKENIZER_NAME', '')
+
+# Textos cuja contagem de tokens fica em memória (o splitter mede os mesmos trechos várias vezes)
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv('TOKEN_COUNT_CACHE_SIZE', '16384'))
+
+# Caracteres por token de uma palavra na estimativa (média dos tokenizers BPE em português)
+ESTIMATED_CHARS_PER_TOKEN = 4
+
+# Palavras e sinais de pontuação, na ordem em que aparecem
+TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+@lru_cache(maxsize=None)
+def get_tokenizer(tokenizer_name=TOKENIZER_NAME):
+    """
+    Carrega o tokenizer uma única vez por processo.
+
+    Args:
+        tokenizer_name (str): Nome ou caminho do tokenizer no Hugging Face.
+
+    Returns:
+        PreTrainedTokenizer or None: Tokenizer carregado, ou None quando não configurado ou sem `transformers`.
+    """
+    if not tokenizer_name:
+        return None
+
+    try:
+        from transformers import AutoTokenizer
+    except ImportError:
+        print("⚠️ Pacote transformers não instalado: usando a estimativa de tokens.")
+        return None
+
+    return AutoTokenizer.from_pretrained(tokenizer_name, use_fast=True)
+
+def estimate_piece_tokens(piece):
+    """
+    Estima os tokens de uma palavra (um a cada ESTIMATED_CHARS_PER_TOKEN caracteres) ou de um sinal de pontuação (um token).
+    """
+    return math.ceil(len(piece) / ESTIMATED_CHARS_PER_TOKEN)
+
+def count_tokens(text, tokenizer_name=TOKENIZER_NAME):
+    """
+    Conta os tokens de um texto com o tokenizer configurado ou, sem ele, por estimativa.
+
+    Args:
+        text (str): Texto a ser medido.
+        tokenizer_name (str): Nome do tokenizer (padrão: TOKENIZER_NAME).
+
+    Returns:
+        int: Quantidade de tokens.
+    """
+    tokenizer = get_tokenizer(tokenizer_name)
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    return sum(estimate_piece_tokens(piece) for piece in TOKEN_PIECES.findall(text))
+
+@lru_cache(maxsize=None)
+def get_token_counter(tokenizer_name=EMBEDDING_TOKENIZER_NAME, cache_size=TOKEN_COUNT_CACHE_SIZE):
+    """
+    Retorna uma função de contagem de tokens (para `length_function` dos splitters) que memoriza
+    os textos já medidos. A mesma função é compartilhada por todos os splitters do processo.
+
+    Args:
+        tokenizer_name (str): Nome do tokenizer (padrão: EMBEDDING_TOKENIZER_NAME).
+        cache_size (int): Quantidade de textos memorizados (0 = sem memoização).
+
+    Returns:
+        callable: Função que recebe um texto e retorna sua quantidade de tokens.
+    """
+    def count_text_tokens(text):
+        return count_tokens(text, tokenizer_name)
+
+    return lru_cache(maxsize=cache_size)(count_text_tokens) if cache_size else count_text_tokens
+
+def truncate_to_tokens(text, max_tokens, tokenizer_name=TOKENIZER_NAME):
+    """
+    Corta um texto para que ele tenha no máximo `max_tokens` tokens.
+
+    Args:
+        text (str): Texto a ser cortado.
+        max_tokens (int): Quantidade máxima de tokens.
+        tokenizer_name (str): Nome do tokenizer (padrão: TOKENIZER_NAME).
+
+    Returns:
+        str: Início do texto dentro do limite.
+    """
+    if max_tokens <= 0:
+        return ""
+
+    tokenizer = get_tokenizer(tokenizer_name)
+    if tokenizer is not None:
+        token_ids = tokenizer.encode(text, add_special_tokens=False)
+        return text if len(token_ids) <= max_tokens else tokenizer.decode(token_ids[:max_tokens])
+
+    # Avança palavra a palavra até esgotar o limite
+    used_tokens = 0
+    end = 0
+    for match in TOKEN_PIECES.finditer(text):
+        used_tokens += estimate_piece_tokens(match.group())
+        if used_tokens > max_tokens:
+            break
+        end = match.end()
+    else:
+        return text
+
+    return text[:end]